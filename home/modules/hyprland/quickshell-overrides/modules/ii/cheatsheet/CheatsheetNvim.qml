@@ -70,29 +70,53 @@ Item {
                             Repeater {
                                 model: {
                                     var result = [];
-                                    for (var i = 0; i < modelData.keybinds.length; i++) {
-                                        const keybind = modelData.keybinds[i];
-                                        result.push({
-                                            "type": "keys",
-                                            "mods": keybind.mods,
-                                            "key": keybind.key,
-                                        });
+                                    function pushKeybinds(keybinds) {
+                                        for (var i = 0; i < keybinds.length; i++) {
+                                            const keybind = keybinds[i];
+                                            result.push({
+                                                "type": "keys",
+                                                "mods": keybind.mods,
+                                                "key": keybind.key,
+                                            });
+                                            result.push({
+                                                "type": "comment",
+                                                "comment": keybind.comment,
+                                            });
+                                        }
+                                    }
+                                    pushKeybinds(modelData.keybinds);
+                                    // Plugin keymaps (e.g. cmp, telescope) follow under their own heading
+                                    const plugins = modelData.children || [];
+                                    for (var j = 0; j < plugins.length; j++) {
                                         result.push({
-                                            "type": "comment",
-                                            "comment": keybind.comment,
+                                            "type": "heading",
+                                            "name": plugins[j].name,
                                         });
+                                        pushKeybinds(plugins[j].keybinds);
                                     }
                                     return result;
                                 }
 
                                 delegate: Item {
                                     required property var modelData
+                                    Layout.columnSpan: (modelData.type === "heading") ? 2 : 1
                                     implicitWidth: keybindLoader.implicitWidth
                                     implicitHeight: keybindLoader.implicitHeight
 
                                     Loader {
                                         id: keybindLoader
-                                        sourceComponent: (modelData.type === "keys") ? keysComponent : commentComponent
+                                        sourceComponent: (modelData.type === "keys") ? keysComponent
+                                            : (modelData.type === "heading") ? headingComponent : commentComponent
+                                    }
+
+                                    Component {
+                                        id: headingComponent
+                                        StyledText {
+                                            topPadding: root.titleSpacing
+                                            font.pixelSize: Appearance.font.pixelSize.small
+                                            color: Appearance.colors.colSubtext
+                                            text: modelData.name
+                                        }
                                     }
 
                                     Component {
@@ -0,0 +1,42 @@
+pragma Singleton
+pragma ComponentBehavior: Bound
+
+import qs.modules.common
+import qs.modules.common.functions
+import QtQuick
+import Quickshell
+import Quickshell.Io
+
+/**
+ * Parses the Neovim and Terminal cheatsheet tabs from the Nix configs in a
+ * single `get_all_keybinds.py` process (one interpreter instead of one per tab).
+ * NvimKeybinds and TerminalKeybinds expose the individual trees.
+ */
+Singleton {
+    id: root
+    property string keybindParserPath: FileUtils.trimFileProtocol(`${Directories.scriptPath}/hyprland/get_all_keybinds.py`)
+    property var tabs: {"nvim": {"children": []}, "terminal": {"children": []}}
+
+    Component.onCompleted: {
+        getNixKeybinds.running = true
+    }
+
+    Process {
+        id: getNixKeybinds
+        running: true
+        // Prints the build-time snapshot once. With KEYBINDS_LIVE=1, --watch
+        // keeps the parser running and emits a new JSON line on every
+        // (debounced) edit of the source files, so the cheatsheet stays live
+        command: [root.keybindParserPath, "--tabs", "nvim,terminal", "--watch"]
+
+        stdout: SplitParser {
+            onRead: data => {
+                try {
+                    root.tabs = JSON.parse(data)
+                } catch (e) {
+                    console.error("[NixKeybinds] Error parsing keybinds:", e)
+                }
+            }
+        }
+    }
+}
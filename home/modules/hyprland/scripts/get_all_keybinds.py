@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Combined cheatsheet keybind parser.
+Emits the Hyprland, Neovim and Terminal trees as one JSON document
+({"hyprland": ..., "nvim": ..., "terminal": ...}) from a single interpreter.
+Use --tabs to select a subset, e.g. --tabs nvim,terminal.
+"""
+import sys
+
+from keybinds.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
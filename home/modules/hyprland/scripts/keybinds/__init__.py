@@ -0,0 +1,6 @@
+"""
+Shared support code for the quickshell cheatsheet keybind parsers.
+"""
+
+# First, so that profiling (KEYBINDS_PROFILE) also covers the other imports
+from keybinds import profiling  # noqa: F401
@@ -0,0 +1,600 @@
+"""
+Benchmarks for the cheatsheet keybind parsers.
+
+Every parser stage is run against large synthetic configs: a keybinds.nix
+with ~10k binds in deeply nested ##! sections, a nixvim.nix with thousands
+of keymaps in mixed layouts, a kitty.nix with many maps and a large
+shellAliases set. The fixtures are generated deterministically into a
+temporary config root, so the suite runs offline and never reads
+/etc/nixos.
+
+Each stage runs in its own interpreter, so peak RSS is per stage. Reported:
+    wall_ms         best wall time of --repeat runs
+    peak_rss_kib    peak resident set size of the stage's process
+    alloc_peak_kib  peak memory traced by tracemalloc during one run
+    alloc_blocks    memory blocks still held by the stage's result
+
+Results are compared with bench_baseline.json next to this file; a stage
+that got slower or bigger than the baseline allows (TOLERANCE) fails the run
+with exit status 1. Baselines are machine-specific; re-record them with
+--update-baseline after an intended change or on a new machine.
+
+--imports checks startup instead: the scripts as the cheatsheet runs them
+(no arguments, streaming a build-time snapshot of the fixtures) are run
+under `python -X importtime`, and every module imported beyond interpreter
+startup counts. Reported:
+    import_ms       best total self time of those imports over --repeat runs
+    modules         number of those modules
+Importing a module in STARTUP_FORBIDDEN fails the check on any machine;
+import_ms and modules are compared with the baseline like the stages.
+
+    python3 -m keybinds.bench
+    python3 -m keybinds.bench --stage parse_keys --repeat 10
+    python3 -m keybinds.bench --imports
+    python3 -m keybinds.bench --update-baseline
+    python3 -m keybinds.bench --write-fixtures DIR
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from keybinds.common import CONFIG_ROOT_ENV
+from keybinds.profiling import PROFILE_ENV
+from keybinds.snapshot import LIVE_ENV
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+BASELINE_VERSION = 1
+
+# Fixture sizes at --scale 1
+SIZES = {
+    "hyprland_binds": 10000,
+    "hyprland_depth": 12,
+    "nvim_keymaps": 3000,
+    "kitty_maps": 2000,
+    "grab_maps": 500,
+    "aliases": 2000,
+}
+
+# Allowed growth over the baseline before a stage counts as a regression,
+# as a fraction, plus an absolute slack so tiny stages do not flap
+TOLERANCE = {
+    "wall_ms": (0.5, 2.0),
+    "peak_rss_kib": (0.25, 2048),
+    "alloc_peak_kib": (0.2, 64),
+    "alloc_blocks": (0.2, 100),
+    "import_ms": (0.5, 3.0),
+    "modules": (0.0, 1),
+}
+
+# --imports: check name -> tab passed to cli.main() (None: get_all_keybinds.py)
+STARTUP_CHECKS = {
+    "startup_all": None,
+    "startup_tab": "hyprland",
+}
+
+# Modules a snapshot-backed run must not import: argument parsing, decoding,
+# sockets and the parsers are only needed off the default path
+STARTUP_FORBIDDEN = [
+    "argparse", "json", "re", "typing", "socket", "tempfile", "ctypes", "hashlib",
+    "keybinds.cache", "keybinds.daemon", "keybinds.watch", "keybinds.records", "keybinds.flat",
+    "keybinds.search", "keybinds.hyprland", "keybinds.nvim", "keybinds.terminal", "keybinds.hosts",
+    "keybinds.variables", "keybinds.ingest", "keybinds.golden", "keybinds.reference",
+]
+
+# Runs one cheatsheet script's main() against the snapshot in argv[1]
+_STARTUP_CODE = (
+    "import sys\n"
+    "from keybinds import cli, snapshot\n"
+    "snapshot.DEFAULT_SNAPSHOT_BASE = sys.argv[1]\n"
+    "sys.exit(cli.main([], sys.argv[2] or None))\n"
+)
+
+HYPRLAND_FILE = "home/modules/hyprland/keybinds.nix"
+NIXVIM_FILE = "home/modules/nixvim.nix"
+KITTY_FILE = "home/modules/kitty.nix"
+ALIAS_FILE = "home/modules/zsh/default.nix"
+
+_MODS = ["", "SUPER", "SUPER SHIFT", "SUPER CTRL", "SUPER ALT", "CTRL ALT", "SUPER+SHIFT", "ALT"]
+_KEYS = [chr(c) for c in range(ord("A"), ord("Z") + 1)] + [str(n) for n in range(10)] + [
+    "Return", "Space", "Tab", "Escape", "left", "right", "up", "down", "mouse:272",
+    "XF86AudioRaiseVolume", "XF86MonBrightnessUp", "Print", "comma", "period",
+]
+_DISPATCHERS = [
+    ("exec", "kitty"), ("exec", "${terminal} -e btop"), ("workspace", "3"),
+    ("movetoworkspace", "+1"), ("movefocus", "l"), ("killactive", ""), ("togglefloating", ""),
+    ("fullscreen", "0"), ("resizeactive", "10 0"), ("global", "quickshell:overviewToggle"),
+    ("pin", ""), ("togglesplit", ""), ("cyclenext", ""), ("pseudo", ""),
+]
+
+
+def gen_hyprland(binds: int, depth: int, seed: int = 1) -> str:
+    """A keybinds.nix with `binds` binds spread over sections nested up to `depth`."""
+    rng = random.Random(seed)
+    lines = []
+    current = 0
+    section = 0
+    while binds > 0:
+        # Open a heading at most one level deeper than the current one
+        current = rng.randint(1, min(current + 1, depth))
+        section += 1
+        lines.append("#" * current + f"! Section {section}")
+        for _ in range(min(binds, rng.randint(1, 25))):
+            binds -= 1
+            mods = rng.choice(_MODS)
+            key = rng.choice(_KEYS)
+            dispatcher, params = rng.choice(_DISPATCHERS)
+            kind = rng.random()
+            if kind < 0.1:
+                lines.append(f"bindd = {mods}, {key}, Described action, {dispatcher}, {params}")
+            elif kind < 0.2:
+                lines.append(f"#/# bind = {mods}, {key},, # Documented-only bind")
+            elif kind < 0.25:
+                lines.append(f"bind = {mods}, {key}, {dispatcher}, {params} # [hidden]")
+            elif kind < 0.6:
+                lines.append(f"bind = {mods}, {key}, {dispatcher}, {params} # Comment {binds}")
+            else:
+                bind_type = rng.choice(["bind", "bindl", "binde", "bindle", "bindm"])
+                lines.append(f"{bind_type} = {mods}, {key}, {dispatcher}, {params}")
+        lines.append("")
+
+    body = "\n".join("    " + line if line else "" for line in lines)
+    return (
+        "{ host, username, ... }:\n"
+        "let\n"
+        "  inherit (import ../../../hosts/${host}/variables.nix) terminal;\n"
+        "in\n"
+        "{\n"
+        "  # Keybinds defined in extraConfig for cheatsheet parsing\n"
+        "  wayland.windowManager.hyprland.extraConfig = ''\n"
+        f"{body}\n"
+        "  '';\n"
+        "}\n"
+    )
+
+
+def gen_hyprctl_binds(config: str) -> str:
+    """`hyprctl binds -j` output for the binds of Hyprland config text, as the
+    compositor reports them once it has read it."""
+    from keybinds import hyprland, ingest
+    bits = {name.lower(): bit for bit, name in ingest.MODMASK_NAMES}
+    entries = []
+    for line in config.splitlines():
+        line = line.strip()
+        keybind = hyprland.parse_bind_line(line, keep_hidden=True) if line.startswith("bind") else None
+        if keybind is None:
+            continue
+        modmask = 0
+        for name in keybind.mods:
+            modmask |= bits.get(name.lower(), 0)
+        entries.append({"modmask": modmask, "submap": "", "key": keybind.key, "keycode": 0,
+                        "has_description": False, "description": "",
+                        "dispatcher": keybind.dispatcher, "arg": keybind.params})
+    return json.dumps(entries)
+
+
+def gen_nixvim(keymaps: int, seed: int = 2) -> str:
+    """A nixvim.nix with `keymaps` top-level keymaps in mixed layouts, plus plugin keymaps."""
+    rng = random.Random(seed)
+    keys = ["<leader>{}{}", "<C-{}>", "<S-{}>", "g{}", "<leader>{}", "]{}", "<A-{}>"]
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    entries = []
+    for index in range(keymaps):
+        key = rng.choice(keys).format(rng.choice(letters), rng.choice(letters))
+        desc = f"Action number {index}"
+        layout = index % 6
+        if layout == 0:
+            entries.append(f'{{ mode = "n"; key = "{key}"; action = "<cmd>Cmd{index}<CR>"; options.desc = "{desc}"; }}')
+        elif layout == 1:
+            entries.append(f'{{ key = "{key}"; options.desc = "{desc}"; action = "<cmd>Cmd{index}<CR>"; mode = "i"; }}')
+        elif layout == 2:
+            entries.append(f'{{ mode = [ "n" "v" ]; key = "{key}"; action = "<cmd>Cmd{index}<CR>";'
+                           f' options = {{ desc = "{desc}"; silent = true; }}; }}')
+        elif layout == 3:
+            entries.append("{\n"
+                           '        mode = "n";\n'
+                           f'        key = "{key}";\n'
+                           f'        action.__raw = "function() require(\'m{index}\').run() end";\n'
+                           f'        options.desc = "{desc}";\n'
+                           "      }")
+        elif layout == 4:
+            entries.append(f'{{ mode = "t"; key = "{key}"; action = "<C-\\\\><C-n>"; options.desc = "{desc}"; }}')
+        else:
+            entries.append("{\n"
+                           f"        action = ''\n"
+                           f"          <cmd>lua vim.cmd('{index}')<CR>\n"
+                           "        '';\n"
+                           f'        key = "{key}";\n'
+                           "      }")
+
+    plugin_maps = "\n".join(f'        "<leader>p{letters[i % 26]}{i}" = {{ action = "picker_{i}"; options.desc = "Picker {i}"; }};'
+                            for i in range(max(keymaps // 20, 1)))
+    body = "\n".join("      " + entry for entry in entries)
+    return (
+        "{ pkgs, ... }:\n"
+        "{\n"
+        "  programs.nixvim = {\n"
+        "    enable = true;\n"
+        "    opts = { number = true; shiftwidth = 2; };\n"
+        "    plugins.telescope = {\n"
+        "      enable = true;\n"
+        "      keymaps = {\n"
+        f"{plugin_maps}\n"
+        "      };\n"
+        "    };\n"
+        "    plugins.cmp.settings.mapping = {\n"
+        '      "<C-Space>" = "cmp.mapping.complete()";\n'
+        '      "<CR>" = "cmp.mapping.confirm({ select = true })";\n'
+        "    };\n"
+        "    keymaps = [\n"
+        f"{body}\n"
+        "    ];\n"
+        "  };\n"
+        "}\n"
+    )
+
+
+def gen_kitty(maps: int, grab_maps: int, seed: int = 3) -> str:
+    """A kitty.nix with `maps` maps in extraConfig and `grab_maps` in grab.conf."""
+    rng = random.Random(seed)
+    mods = ["ctrl+shift", "ctrl+alt", "alt", "ctrl", "kitty_mod", "shift"]
+    actions = ["new_tab", "close_tab", "next_window", "launch --cwd=current", "scroll_line_up",
+               "paste_from_selection", "kitten kitty_grab/grab.py", "goto_tab 3", "change_font_size all +2.0"]
+    extra = []
+    for index in range(maps):
+        if index % 40 == 0:
+            extra.append("")
+            extra.append(f"# Group {index // 40}")
+        key = f"{rng.choice(mods)}+{rng.choice('abcdefghijklmnopqrstuvwxyz0123456789')}"
+        comment = f" # Map {index}" if index % 3 == 0 else ""
+        extra.append(f"map {key} {rng.choice(actions)}{comment}")
+    grab = []
+    grab_actions = ["move left", "move right", "select stream word", "quit", "confirm", "move first"]
+    for index in range(grab_maps):
+        if index % 25 == 0:
+            grab.append("")
+            grab.append(f"# Grab group {index // 25}")
+        grab.append(f"map {rng.choice(['', 'shift+', 'ctrl+'])}{rng.choice('hjklwbe0')} {rng.choice(grab_actions)}")
+
+    extra_body = "\n".join("      " + line if line else "" for line in extra)
+    grab_body = "\n".join("    " + line if line else "" for line in grab)
+    return (
+        "{ pkgs, ... }:\n"
+        "{\n"
+        "  home.file.\".config/kitty/grab.conf\".text = ''\n"
+        "    selection_foreground #${termConfig.colors.selectionForeground}\n"
+        f"{grab_body}\n"
+        "  '';\n"
+        "\n"
+        "  programs.kitty = {\n"
+        "    enable = true;\n"
+        "    extraConfig = ''\n"
+        f"{extra_body}\n"
+        "    '';\n"
+        "  };\n"
+        "}\n"
+    )
+
+
+def gen_aliases(aliases: int, seed: int = 4) -> str:
+    """A zsh/default.nix with a shellAliases set of `aliases` entries."""
+    rng = random.Random(seed)
+    commands = ["eza --tree", "git status", "nvim", "sudo nixos-rebuild switch --flake .", "cd ..", "kitty +kitten ssh"]
+    body = "\n".join(f'      a{index}-{rng.choice("xyz")} = "{rng.choice(commands)} {index}";' for index in range(aliases))
+    return (
+        "{ pkgs, ... }:\n"
+        "{\n"
+        "  programs.zsh = {\n"
+        "    enable = true;\n"
+        "    shellAliases = {\n"
+        f"{body}\n"
+        "    };\n"
+        "  };\n"
+        "}\n"
+    )
+
+
+def write_fixtures(root: str, scale: float = 1.0) -> Dict[str, int]:
+    """Generate the synthetic config root under `root`; return the sizes used."""
+    sizes = {name: max(int(value * scale), 1) for name, value in SIZES.items()}
+    sizes["hyprland_depth"] = SIZES["hyprland_depth"]
+    files = {
+        HYPRLAND_FILE: gen_hyprland(sizes["hyprland_binds"], sizes["hyprland_depth"]),
+        NIXVIM_FILE: gen_nixvim(sizes["nvim_keymaps"]),
+        KITTY_FILE: gen_kitty(sizes["kitty_maps"], sizes["grab_maps"]),
+        ALIAS_FILE: gen_aliases(sizes["aliases"]),
+    }
+    for relative, text in files.items():
+        path = os.path.join(root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(text)
+    return sizes
+
+
+def _reset_caches() -> None:
+    """Forget in-process parse results so every run parses from scratch."""
+    from keybinds import hyprland, nixlex, nvim, tabs, variables
+    for tab in tabs.ALL_TABS:
+        module = tabs.load(tab)
+        module._memo.invalidate(module.sources())
+    # Last: listing the sources above fills them again
+    nixlex.bindings.cache_clear()
+    hyprland._sections.clear()
+    hyprland._definitions.clear()
+    variables._files.clear()
+    nvim._groups.clear()
+
+
+def _stages(root: str) -> Dict[str, Callable[[], object]]:
+    """Stage name -> zero-argument callable running that stage on the fixtures."""
+    from keybinds import diff, hyprland, nvim, tabs, terminal
+
+    def text(relative: str) -> str:
+        with open(os.path.join(root, relative), "r") as file:
+            return file.read()
+
+    # Two versions of the Hyprland config (the fixture's one config text,
+    # its extraConfig) that differ in one bind's comment; each run re-parses
+    # the other one against its own section cache
+    hyprland_texts = hyprland.read_nix_blocks(os.path.join(root, HYPRLAND_FILE))
+    hyprland_texts.append(hyprland_texts[0].replace("# Comment", "# Edited comment", 1))
+    sections = hyprland.SectionCache()
+    state = {"turn": 0, "tree": sections.parse(hyprland_texts[0])}
+
+    def reparse_diff() -> object:
+        state["turn"] ^= 1
+        tree = sections.parse(hyprland_texts[state["turn"]])
+        ops = diff.diff(state["tree"], tree)
+        state["tree"] = tree
+        return ops
+
+    def ingest_hyprctl() -> object:
+        # The `hyprctl binds -j` fixture is only generated for this stage, so
+        # it adds nothing to the other stages' peak RSS
+        from keybinds import ingest
+        if "hyprctl" not in state:
+            state["hyprctl"] = gen_hyprctl_binds(hyprland_texts[0])
+        return ingest.build_tree(ingest.parse(state["hyprctl"]))
+
+    nixvim_text = text(NIXVIM_FILE)
+    kitty_text = text(KITTY_FILE)
+    alias_text = text(ALIAS_FILE)
+    return {
+        "parse_keys": lambda: hyprland.parse_keys(os.path.join(root, HYPRLAND_FILE)),
+        "parse_nixvim_keybinds": lambda: nvim.parse_nixvim_keybinds(nixvim_text),
+        "parse_kitty_keybinds": lambda: terminal.parse_kitty_keybinds(kitty_text),
+        "parse_kitty_grab_keybinds": lambda: terminal.parse_kitty_grab_keybinds(kitty_text),
+        "parse_shell_aliases": lambda: terminal.parse_shell_aliases(alias_text, "ZSH"),
+        "produce_all": lambda: tabs.produce(tabs.ALL_TABS),
+        "stream_all": lambda: sum(len(chunk) for chunk in tabs.stream(tabs.ALL_TABS)),
+        "reparse_diff_one_bind": reparse_diff,
+        "ingest_hyprctl": ingest_hyprctl,
+    }
+
+
+STAGES = [
+    "parse_keys",
+    "parse_nixvim_keybinds",
+    "parse_kitty_keybinds",
+    "parse_kitty_grab_keybinds",
+    "parse_shell_aliases",
+    "produce_all",
+    "stream_all",
+    "reparse_diff_one_bind",
+    "ingest_hyprctl",
+]
+
+
+def measure_stage(stage: str, root: str, repeat: int) -> Dict[str, float]:
+    """Run one stage in this process and measure it (see module docstring)."""
+    os.environ[CONFIG_ROOT_ENV] = root
+    run = _stages(root)[stage]
+
+    # Warm up imports and lazily compiled regexes
+    _reset_caches()
+    run()
+
+    timings = []
+    for _ in range(repeat):
+        _reset_caches()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    _reset_caches()
+    gc.collect()
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    result = run()
+    # Read before the reset, which lists (and so re-reads) the sources
+    _, traced_peak = tracemalloc.get_traced_memory()
+    _reset_caches()
+    gc.collect()
+    blocks_held = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+    del result
+
+    return {
+        "wall_ms": round(min(timings), 3),
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "alloc_peak_kib": round(traced_peak / 1024, 1),
+        "alloc_blocks": max(blocks_held, 0),
+    }
+
+
+def _run_isolated(stage: str, root: str, repeat: int) -> Dict[str, float]:
+    """Measure `stage` in a fresh interpreter so its peak RSS is its own."""
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-m", "keybinds.bench", "--child", stage, "--root", root, "--repeat", str(repeat)],
+        cwd=package_parent, check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def _imported(command: List[str], env: Dict[str, str]) -> Dict[str, int]:
+    """Module -> self import time in microseconds, from `python -X importtime`."""
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime"] + command, cwd=package_parent, env=env,
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    ).stderr
+    modules = {}
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[0].startswith("import time:") and fields[0][12:].strip().isdigit():
+            modules[fields[2].strip()] = int(fields[0][12:])
+    return modules
+
+
+def measure_startup(tab: Optional[str], base: str, repeat: int) -> Tuple[Dict[str, float], List[str]]:
+    """Import cost of a snapshot-backed run of `tab`'s script, and the forbidden
+    modules it imported."""
+    env = {name: value for name, value in os.environ.items()
+           if name not in (LIVE_ENV, PROFILE_ENV)}
+    interpreter = set(_imported(["-c", "pass"], env))
+    best = None
+    for _ in range(max(repeat, 1)):
+        modules = _imported(["-c", _STARTUP_CODE, base, tab or ""], env)
+        added = {name: micros for name, micros in modules.items() if name not in interpreter}
+        if best is None or sum(added.values()) < sum(best.values()):
+            best = added
+    forbidden = [name for name in STARTUP_FORBIDDEN if name in best]
+    return {"import_ms": round(sum(best.values()) / 1000, 3), "modules": len(best)}, forbidden
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Dict:
+    try:
+        with open(path, "r") as file:
+            baseline = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if baseline.get("version") != BASELINE_VERSION:
+        return {}
+    return baseline
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict) -> List[str]:
+    """Regressions of `results` against `baseline`, as human-readable lines."""
+    regressions = []
+    for stage, metrics in results.items():
+        reference = baseline.get("stages", {}).get(stage)
+        if reference is None:
+            continue
+        for metric, value in metrics.items():
+            if metric not in reference:
+                continue
+            fraction, slack = TOLERANCE[metric]
+            limit = reference[metric] * (1 + fraction) + slack
+            if value > limit:
+                regressions.append(f"{stage}: {metric} {value} > {limit:.1f} "
+                                   f"(baseline {reference[metric]}, +{fraction:.0%} +{slack})")
+    return regressions
+
+
+def _print_table(results: Dict[str, Dict[str, float]], baseline: Dict) -> None:
+    metrics = [metric for metric in TOLERANCE if any(metric in values for values in results.values())]
+    print(f"{'stage':<28}" + "".join(f"{m:>16}" for m in metrics))
+    for stage, values in results.items():
+        reference = baseline.get("stages", {}).get(stage, {})
+        cells = []
+        for metric in metrics:
+            cell = f"{values[metric]:g}"
+            if reference.get(metric):
+                cell += f" ({values[metric] / reference[metric]:.2f}x)"
+            cells.append(f"{cell:>16}")
+        print(f"{stage:<28}" + "".join(cells))
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the cheatsheet keybind parsers on synthetic configs')
+    parser.add_argument('--stage', action='append', choices=STAGES,
+                        help='stage to run (repeatable; default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per stage (default: %(default)s)')
+    parser.add_argument('--scale', type=float, default=1.0, help='fixture size multiplier (default: %(default)s)')
+    parser.add_argument('--baseline', type=str, default=BASELINE_FILE, help='baseline file (default: %(default)s)')
+    parser.add_argument('--update-baseline', action='store_true', help='record the results as the new baseline')
+    parser.add_argument('--json', action='store_true', help='print results as JSON instead of a table')
+    parser.add_argument('--imports', action='store_true',
+                        help='check the import time of snapshot-backed startup instead of the parser stages')
+    parser.add_argument('--write-fixtures', type=str, metavar='DIR', help='only generate the fixture config root in DIR')
+    parser.add_argument('--child', type=str, help=argparse.SUPPRESS)
+    parser.add_argument('--root', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_stage(args.child, args.root, args.repeat)))
+        return 0
+
+    if args.write_fixtures:
+        print(json.dumps(write_fixtures(args.write_fixtures, args.scale)))
+        return 0
+
+    stages = args.stage or STAGES
+    forbidden = {}
+    with tempfile.TemporaryDirectory(prefix="keybinds-bench-") as root:
+        sizes = write_fixtures(root, args.scale)
+        if args.imports:
+            from keybinds import snapshot, tabs
+            os.environ[CONFIG_ROOT_ENV] = root
+            base = os.path.join(root, "snapshot")
+            snapshot.write(base, tabs.ALL_TABS)
+            results = {}
+            for check, tab in STARTUP_CHECKS.items():
+                results[check], forbidden[check] = measure_startup(tab, base, args.repeat)
+        else:
+            results = {stage: _run_isolated(stage, root, args.repeat) for stage in stages}
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        stored = baseline if baseline.get("sizes") == sizes else {"stages": {}}
+        stored.update({"version": BASELINE_VERSION, "sizes": sizes})
+        stored["stages"].update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(stored, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        baseline = stored
+
+    if args.json:
+        print(json.dumps({"sizes": sizes, "stages": results}))
+    else:
+        _print_table(results, baseline)
+
+    imported = [f"{check}: imports {', '.join(names)}" for check, names in forbidden.items() if names]
+    if imported:
+        print("\nSTARTUP IMPORTS", file=sys.stderr)
+        for line in imported:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+
+    if not baseline:
+        print("No baseline recorded; run with --update-baseline", file=sys.stderr)
+        return 0
+    if baseline.get("sizes") != sizes:
+        print(f"Baseline was recorded with different fixture sizes ({baseline.get('sizes')}); "
+              "not comparing", file=sys.stderr)
+        return 0
+
+    regressions = compare(results, baseline)
+    if regressions:
+        print("\nPERFORMANCE REGRESSION", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
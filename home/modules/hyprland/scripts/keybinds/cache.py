@@ -0,0 +1,347 @@
+"""
+Persistent parse cache for the cheatsheet keybind parsers.
+
+Each parser stores its JSON output under $XDG_CACHE_HOME/quickshell-keybinds,
+together with the fingerprint (path, mtime, size, sha256) of every source file
+it read. On the next run the output is reused as long as all fingerprints still
+match, so an unchanged config is printed without being parsed again.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from keybinds import profiling
+
+CACHE_VERSION = 1
+CACHE_SUBDIR = "quickshell-keybinds"
+MAX_ENTRIES = 32
+MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+# In-process parse results kept by FileMemo; a few per tab and config root
+MEMO_MAX_ENTRIES = 32
+
+
+def cache_dir() -> str:
+    """Return the cache directory, honoring $XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, CACHE_SUBDIR)
+
+
+def _hash_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def fingerprint(path: str) -> Dict:
+    """Fingerprint a source file. Missing files get a fingerprint too."""
+    expanded_path = os.path.expanduser(os.path.expandvars(path))
+    try:
+        st = os.stat(expanded_path)
+    except OSError:
+        return {"path": expanded_path, "mtime": None, "size": None, "sha256": None}
+    return {
+        "path": expanded_path,
+        "mtime": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": _hash_file(expanded_path),
+    }
+
+
+def _still_valid(stored: Dict) -> bool:
+    """Check a stored fingerprint against the file on disk.
+
+    mtime and size are compared first so that the common case needs a single
+    stat(). Only when the mtime moved but the size did not is the content
+    re-hashed (e.g. a `touch` or a checkout that rewrote identical content).
+    """
+    path = stored["path"]
+    try:
+        st = os.stat(path)
+    except OSError:
+        return stored["size"] is None
+    if stored["size"] != st.st_size:
+        return False
+    if stored["mtime"] == st.st_mtime_ns:
+        return True
+    return _hash_file(path) == stored["sha256"]
+
+
+def _entry_path(name: str, sources: List[str]) -> str:
+    key = "\0".join([name] + [os.path.abspath(os.path.expanduser(os.path.expandvars(p))) for p in sources])
+    digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+    return os.path.join(cache_dir(), f"{name}-{digest}.json")
+
+
+def _discard(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+@profiling.timed("cache.load")
+def load(name: str, sources: List[str]) -> Optional[str]:
+    """Return the cached output for `name`, or None if missing or stale.
+
+    Entries are a one-line JSON header followed by the raw parser output, so a
+    hit never has to decode the cached document itself.
+    """
+    entry = _entry_path(name, sources)
+    try:
+        with open(entry, "r") as file:
+            header_line = file.readline()
+            output = file.read()
+        header = json.loads(header_line)
+        valid = (
+            header["version"] == CACHE_VERSION
+            and header["name"] == name
+            and len(header["inputs"]) == len(sources)
+            and all(_still_valid(fp) for fp in header["inputs"])
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        # Corrupt or truncated entry
+        _discard(entry)
+        return None
+
+    if not valid:
+        _discard(entry)
+        return None
+
+    try:
+        os.utime(entry)  # Mark as recently used for eviction
+    except OSError:
+        pass
+    return output
+
+
+def store(name: str, sources: List[str], output: str) -> None:
+    """Write `output` for `name` and evict old entries. Failures are ignored."""
+    import tempfile  # Only on a miss; a hit never writes
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w") as file:
+            file.write(_header(name, sources))
+            file.write(output)
+        os.replace(tmp_path, _entry_path(name, sources))
+    except OSError:
+        return
+    evict()
+
+
+def _header(name: str, sources: List[str]) -> str:
+    header = {
+        "version": CACHE_VERSION,
+        "name": name,
+        "inputs": [fingerprint(p) for p in sources],
+    }
+    return json.dumps(header) + "\n"
+
+
+def _state_path(name: str, key: str) -> str:
+    digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+    return os.path.join(cache_dir(), f"{name}-{digest}.state")
+
+
+def load_state(name: str, key: str) -> Optional[Dict]:
+    """Return the state a parser kept between runs with store_state(), or None.
+
+    Unlike entries, states are not checked against source files; the parser
+    revalidates what it stored itself (e.g. terminal's alias scan).
+    """
+    try:
+        with open(_state_path(name, key), "r") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != CACHE_VERSION:
+        return None
+    return state
+
+
+def store_state(name: str, key: str, state: Dict) -> None:
+    """Keep `state` for load_state(). Failures are ignored."""
+    import tempfile
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w") as file:
+            json.dump(dict(state, version=CACHE_VERSION), file)
+        os.replace(tmp_path, _state_path(name, key))
+    except OSError:
+        return
+
+
+def evict(max_entries: int = MAX_ENTRIES, max_age: float = MAX_AGE_SECONDS) -> None:
+    """Drop entries older than `max_age` and keep at most `max_entries`.
+
+    States (store_state()) only age out; they are rewritten when they change.
+    """
+    directory = cache_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+
+    now = time.time()
+    entries = []
+    for entry_name in names:
+        path = os.path.join(directory, entry_name)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        if now - mtime > max_age:
+            _discard(path)
+        elif entry_name.endswith(".json"):
+            # Skip in-flight temp files of concurrent writers
+            entries.append((mtime, path))
+
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        _discard(path)
+
+
+def cached(name: str, sources: List[str], produce: Callable[[], str]) -> str:
+    """Return cached output for `sources`, calling `produce` on a miss."""
+    output = load(name, sources)
+    if output is None:
+        output = produce()
+        store(name, sources, output)
+    elif profiling.ENABLED:
+        profiling.note("source", "cache")
+    return output
+
+
+def cached_stream(name: str, sources: List[str], produce: Callable[[], Iterable[str]],
+                  write: Callable[[str], object]) -> None:
+    """Like cached(), but passes the output to `write` in chunks.
+
+    On a miss, every chunk `produce` yields is written out and appended to
+    the new cache entry at once, so the complete output is never held in
+    memory. Sources are fingerprinted before parsing, so an edit made while
+    parsing invalidates the entry.
+    """
+    output = load(name, sources)
+    if output is not None:
+        if profiling.ENABLED:
+            profiling.note("source", "cache")
+        write(output)
+        return
+
+    import tempfile
+    file = tmp_path = None
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir(), prefix=".tmp-")
+        file = os.fdopen(fd, "w")
+        file.write(_header(name, sources))
+    except OSError:
+        file = _abandon(file, tmp_path)
+
+    try:
+        for chunk in produce():
+            write(chunk)
+            if file is not None:
+                try:
+                    file.write(chunk)
+                except OSError:
+                    file = _abandon(file, tmp_path)
+    except BaseException:
+        _abandon(file, tmp_path)
+        raise
+
+    if file is None:
+        return
+    try:
+        file.close()
+        os.replace(tmp_path, _entry_path(name, sources))
+    except OSError:
+        _discard(tmp_path)
+        return
+    evict()
+
+
+def _abandon(file, tmp_path: Optional[str]) -> None:
+    """Close and delete a partly written cache entry."""
+    if file is not None:
+        try:
+            file.close()
+        except OSError:
+            pass
+    if tmp_path is not None:
+        _discard(tmp_path)
+    return None
+
+
+class FileMemo:
+    """In-process memo of per-file parse results.
+
+    Used by long-running modes (daemon, watch) so that a change to one source
+    file only re-parses that file. Entries are keyed by path and parse step
+    name and revalidated with a stat() of the file. Paths include the config
+    root, so the daemon can switch between checkouts (--path) without
+    re-parsing; the least recently used entries beyond `max_entries` are
+    dropped. `depends(path)`, if given, lists the other files a result for
+    `path` is read from (e.g. an imported variables.nix); they are
+    revalidated with it.
+    """
+
+    def __init__(self, max_entries: int = MEMO_MAX_ENTRIES,
+                 depends: Optional[Callable[[str], List[str]]] = None) -> None:
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.max_entries = max_entries
+        self.depends = depends
+
+    @staticmethod
+    def _stat(path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _signature(self, path: str) -> Optional[tuple]:
+        signature = self._stat(path)
+        if self.depends is None:
+            return signature
+        return (signature,) + tuple((other, self._stat(other)) for other in self.depends(path))
+
+    def get(self, step: str, path: str, parse: Callable[[str], object]):
+        """Return `parse(path)`, reusing the previous result if unchanged."""
+        key = (step, path)
+        signature = self._signature(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self._entries.move_to_end(key)
+            return entry[1]
+        value = parse(path)
+        self.put(step, path, value, signature)
+        return value
+
+    def put(self, step: str, path: str, value: object, signature: Optional[tuple] = None) -> None:
+        """Store `value` as the result of parse step `step` on `path`, e.g. one
+        parsed in another process (keybinds.hosts)."""
+        key = (step, path)
+        self._entries[key] = (self._signature(path) if signature is None else signature, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, paths) -> None:
+        """Forget results for `paths` (e.g. reported changed by inotify)."""
+        changed = {os.path.abspath(p) for p in paths}
+        for key in [k for k in self._entries if os.path.abspath(k[1]) in changed]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,198 @@
+"""
+Canonical chord encoding shared by the Hyprland, kitty and Neovim parsers.
+
+The three tools spell the same chord differently ("Super+Alt, Q",
+"ctrl+shift+x", "<C-S-x>"). A Chord is the tool-independent form: a bitmask
+of modifiers plus a normalized keysym (lowercase, with aliases such as
+"Enter"/"<CR>"/"return" folded to one name), so equal chords compare and
+hash equal across tools.
+
+Neovim maps can be sequences ("gr", "<C-w>h", "<leader>ff"). Their keysym
+is the space-separated list of the keys after the first chord's modifiers,
+each key spelled like a chord ("ctrl+w h"); see first_chord().
+"""
+import re
+from typing import Iterable, NamedTuple, Tuple
+
+SHIFT = 1
+CTRL = 2
+ALT = 4
+SUPER = 8
+# Neovim's <leader>: a prefix key, not a modifier, but it separates layers
+# of maps the same way
+LEADER = 16
+
+# Canonical spelling order of the modifier bits
+MOD_ORDER = [(LEADER, "leader"), (SUPER, "super"), (CTRL, "ctrl"), (ALT, "alt"), (SHIFT, "shift")]
+
+MOD_BITS = {
+    "shift": SHIFT,
+    "ctrl": CTRL,
+    "control": CTRL,
+    "alt": ALT,
+    "meta": ALT,
+    "opt": ALT,
+    "option": ALT,
+    "mod1": ALT,
+    "super": SUPER,
+    "win": SUPER,
+    "logo": SUPER,
+    "mod4": SUPER,
+    "cmd": SUPER,
+    "command": SUPER,
+    "leader": LEADER,
+    # kitty's default kitty_mod
+    "kitty_mod": CTRL | SHIFT,
+}
+
+KEY_ALIASES = {
+    "enter": "return",
+    "cr": "return",
+    "kp_enter": "return",
+    "esc": "escape",
+    "bs": "backspace",
+    "del": "delete",
+    "ins": "insert",
+    "pgup": "page_up",
+    "pageup": "page_up",
+    "prior": "page_up",
+    "pgdn": "page_down",
+    "pagedown": "page_down",
+    "next": "page_down",
+    " ": "space",
+    "-": "minus",
+    "=": "equal",
+    "+": "plus",
+    ",": "comma",
+    ".": "period",
+    "/": "slash",
+    "\\": "backslash",
+    ";": "semicolon",
+    "'": "apostrophe",
+    "`": "grave",
+    "[": "bracketleft",
+    "]": "bracketright",
+    "lt": "less",
+    "<": "less",
+    "|": "bar",
+}
+
+# One Neovim key: <...> notation or a single character
+_VIM_TOKEN = re.compile(r"<[^<>]+>|.")
+_VIM_MOD = re.compile(r"^([CSAMD])-(.+)$", re.IGNORECASE)
+_VIM_MOD_NAMES = {"c": "ctrl", "s": "shift", "a": "alt", "m": "meta", "d": "super"}
+
+
+class Chord(NamedTuple):
+    mask: int
+    keysym: str
+
+    def __str__(self) -> str:
+        names = [name for bit, name in MOD_ORDER if self.mask & bit]
+        return "+".join(names + [self.keysym])
+
+    @property
+    def is_sequence(self) -> bool:
+        return " " in self.keysym
+
+
+def normalize_key(key: str) -> str:
+    lowered = key.lower()
+    return KEY_ALIASES.get(lowered, lowered)
+
+
+def _fold_mods(names: Iterable[str]) -> Tuple[int, list]:
+    """Bitmask of known modifier names, and the unknown ones (lowercased)."""
+    mask = 0
+    unknown = []
+    for name in names:
+        lowered = name.lower()
+        bit = MOD_BITS.get(lowered)
+        if bit is None:
+            unknown.append(lowered)
+        else:
+            mask |= bit
+    return mask, unknown
+
+
+def _chord(names: Iterable[str], keysym: str) -> Chord:
+    mask, unknown = _fold_mods(names)
+    # Unresolved modifiers (e.g. a Hyprland $mainMod) stay part of the key,
+    # so they never collide with a known chord by accident
+    return Chord(mask, "+".join(sorted(unknown) + [keysym]))
+
+
+def hyprland(mods: Iterable[str], key: str) -> Chord:
+    """Chord of a Hyprland bind; keysyms are case-insensitive."""
+    return _chord(mods, normalize_key(key))
+
+
+def kitty(mods: Iterable[str], key: str) -> Chord:
+    """Chord of a kitty map (mods as split by terminal.parse_kitty_key).
+
+    As in kitty_grab's vim-style maps, an uppercase letter is Shift+letter.
+    """
+    chord = _chord(mods, normalize_key(key))
+    if len(key) == 1 and key.isalpha() and key.isupper():
+        chord = Chord(chord.mask | SHIFT, chord.keysym)
+    return chord
+
+
+# Multi-letter key names parse_vim_key leaves without brackets ("Enter", "Up")
+_KEY_NAMES = {
+    "tab", "return", "escape", "space", "backspace", "delete", "insert", "home", "end",
+    "page_up", "page_down", "up", "down", "left", "right", "less", "bar", "backslash",
+} | {f"f{number}" for number in range(1, 25)}
+
+
+def _vim_key(token: str) -> Tuple[int, str]:
+    """(modifier bits, keysym) of one Neovim key: "K", "<CR>", "<C-S-x>"."""
+    mask = 0
+    if len(token) > 2 and token.startswith("<") and token.endswith(">"):
+        inner = token[1:-1]
+        match = _VIM_MOD.match(inner)
+        while match:
+            mask |= MOD_BITS[_VIM_MOD_NAMES[match.group(1).lower()]]
+            inner = match.group(2)
+            match = _VIM_MOD.match(inner)
+        if inner.lower() == "leader":
+            return mask | LEADER, ""
+        token = inner
+    if len(token) == 1 and token.isalpha():
+        # Ctrl chords ignore case; otherwise an uppercase letter is Shift+letter
+        if token.isupper() and not mask & CTRL:
+            mask |= SHIFT
+        return mask, token.lower()
+    return mask, normalize_key(token)
+
+
+def vim(mods: Iterable[str], key: str) -> Chord:
+    """Chord of a Neovim map (mods and key as split by nvim.parse_vim_key).
+
+    parse_vim_key turns "<CR>" into "Enter" and strips the brackets of other
+    single special keys, so `key` is either a key name or raw notation
+    ("K", "gr", "<C-w>h").
+    """
+    mask, unknown = _fold_mods(mods)
+    if normalize_key(key) in _KEY_NAMES:
+        keys = [normalize_key(key)]
+    else:
+        keys = []
+        for token in _VIM_TOKEN.findall(key):
+            step_mask, step_key = _vim_key(token)
+            if not keys:
+                # The first key's modifiers are the chord's
+                mask |= step_mask
+                if step_key:
+                    keys.append(step_key)
+            else:
+                keys.append(str(Chord(step_mask, step_key or "leader")))
+    return Chord(mask, "+".join(sorted(unknown) + [" ".join(keys)]))
+
+
+def first_chord(chord: Chord) -> Chord:
+    """The chord a sequence starts with (a plain chord is its own first chord)."""
+    if not chord.is_sequence:
+        return chord
+    first = chord.keysym.split(" ", 1)[0]
+    return Chord(chord.mask, first)
@@ -0,0 +1,250 @@
+"""
+Command line entry point shared by all cheatsheet keybind scripts.
+
+get_all_keybinds.py emits several tabs as one JSON document
+({"hyprland": ..., "nvim": ..., "terminal": ...}); the per-tab scripts
+(get_keybinds.py, get_nvim_keybinds.py, get_terminal_keybinds.py) are thin
+wrappers that call main() with a fixed tab and print that tab's bare tree.
+
+Output comes from, in order: the build-time snapshot (unless live parsing or
+another checkout with --path is requested), the keybind daemon, the on-disk
+cache, and finally the parsers. With --binds, the Hyprland tab comes from a
+bind dump instead (see keybinds.ingest).
+"""
+import os
+import sys
+
+from keybinds import profiling, snapshot, tabs
+
+DESCRIPTIONS = {
+    None: 'Cheatsheet keybind reader for all Nix sources',
+    "hyprland": 'Hyprland keybind reader for Nix files',
+    "nvim": 'Neovim keybind reader for nixvim.nix',
+    "terminal": 'Terminal keybind reader for Nix files',
+}
+
+# (flag, argparse keyword arguments, only in get_all_keybinds.py)
+OPTIONS = [
+    ('--path', dict(type=str, default=None,
+                    help='checkout to read: its root directory, or any file under its home/modules; '
+                         'other files are ignored (default: the config root; parses instead of reading '
+                         'the snapshot)'), False),
+    ('--tabs', dict(type=str, default=",".join(tabs.ALL_TABS),
+                    help='comma-separated tabs to emit (default: %(default)s)'), True),
+    ('--no-cache', dict(action='store_true',
+                        help='always parse, bypassing the on-disk cache'), False),
+    ('--no-daemon', dict(action='store_true',
+                         help='parse in this process even if the keybind daemon is running'), False),
+    ('--watch', dict(action='store_true',
+                     help='keep running and print a new JSON line whenever a source file changes '
+                          '(with --live; a snapshot never changes, so it is printed once)'), False),
+    ('--diff', dict(action='store_true',
+                    help='with --watch, print patches of the changed bindings after the first tree '
+                         '(see keybinds.diff)'), False),
+    ('--live', dict(action='store_true',
+                    help='parse the Nix sources instead of streaming the build-time snapshot '
+                         f'(same as {snapshot.LIVE_ENV}=1)'), False),
+    ('--format', dict(choices=tabs.FORMATS, default="tree",
+                      help='nested tree, or a string table plus parallel arrays (default: %(default)s)'), False),
+    ('--search', dict(type=str, metavar='QUERY',
+                      help='print the keybinds matching QUERY as a JSON list, best match first'), False),
+    ('--conflicts', dict(action='store_true',
+                         help='parse the Nix sources and print duplicate and shadowed bindings as JSON'), False),
+    ('--snapshot', dict(type=str, metavar='DIR',
+                        help='parse the selected tabs and write versioned snapshot files to DIR'), True),
+    ('--binds', dict(type=str, metavar='FILE',
+                     help='read the Hyprland binds from `hyprctl binds -j` output or a rendered hyprland.conf '
+                          'in FILE ("-": stdin) instead of the Nix sources, keeping their sections and '
+                          '[hidden] marks (see keybinds.ingest)'), False),
+    ('--hosts', dict(type=str, metavar='DIR',
+                     help='write DIR/<host>.json for every host in hosts/, with the tabs and sources that '
+                          'host imports, parsing on all cores (see keybinds.hosts)'), True),
+]
+
+
+class _Defaults:
+    """The parsed options of an empty command line, without argparse."""
+
+    def __init__(self, tab: str | None) -> None:
+        for flag, kwargs, all_tabs_only in OPTIONS:
+            if all_tabs_only and tab is not None:
+                continue
+            default = kwargs.get('default', False if kwargs.get('action') == 'store_true' else None)
+            setattr(self, flag[2:].replace('-', '_'), default)
+
+
+def _parse_args(argv: list[str], tab: str | None):
+    """(options, selected tabs) for `argv`; exits with usage on bad arguments.
+
+    The cheatsheet runs the scripts without arguments on every open, so an
+    empty command line skips building the argparse parser (and importing it).
+    So does a lone --path that selects no checkout (see _ignored_path()).
+    """
+    if not argv or _ignored_path(argv):
+        args = _Defaults(tab)
+        return args, [tab] if tab is not None else tabs.parse_tab_list(args.tabs)
+
+    import argparse
+    parser = argparse.ArgumentParser(description=DESCRIPTIONS[tab])
+    for flag, kwargs, all_tabs_only in OPTIONS:
+        if tab is None or not all_tabs_only:
+            parser.add_argument(flag, **kwargs)
+    args = parser.parse_args(argv)
+    if args.diff and not (args.watch and args.format == "tree"):
+        parser.error("--diff needs --watch and the tree format")
+    if tab is not None:
+        selected = [tab]
+    else:
+        try:
+            selected = tabs.parse_tab_list(args.tabs)
+        except ValueError as error:
+            parser.error(str(error))
+        if not selected:
+            parser.error("--tabs needs at least one tab")
+    if args.binds is not None and "hyprland" not in selected:
+        parser.error("--binds needs the hyprland tab")
+    return args, selected
+
+
+def _ignored_path(argv: list[str]) -> bool:
+    """Whether `argv` is only a --path naming a file outside any checkout's
+    home/modules, as the upstream Hyprland cheatsheet service passes its
+    keybinds.conf. The scripts have always ignored that; checked without
+    importing keybinds.common (see common.resolve_root())."""
+    if len(argv) == 2 and argv[0] == "--path":
+        path = argv[1]
+    elif len(argv) == 1 and argv[0].startswith("--path="):
+        path = argv[0][len("--path="):]
+    else:
+        return False
+    resolved = os.path.realpath(os.path.expanduser(path))
+    marker = os.sep + os.path.join("home", "modules") + os.sep
+    return not os.path.isdir(resolved) and resolved.rfind(marker) <= 0
+
+
+def _select_root(path: str) -> str | None:
+    """Read from the checkout --path selects; returns its root, or None if the
+    default root is kept.
+
+    A --path that is a file outside a checkout is ignored silently (see
+    _ignored_path()); only a directory that is not a checkout is reported.
+    """
+    from keybinds import common
+    root = common.resolve_root(path)
+    if root is not None:
+        common.set_config_root(root)
+    elif os.path.isdir(path):
+        print(f"[keybinds.cli] --path {path}: no {common.MODULES_DIR} in this directory; "
+              f"reading {common.config_root()}", file=sys.stderr)
+    return root
+
+
+def _search(args, selected: list[str], root: str | None) -> str:
+    """Ranked hits for --search, from the same sources as the trees."""
+    from keybinds import daemon, search
+    query = " ".join(args.search.split())
+    if root is None and not (args.live or snapshot.live_requested()):
+        indexes = snapshot.load_indexes(selected)
+        if indexes is not None:
+            return search.dumps(search.search(indexes, query))
+    request = daemon.with_root(f"search {','.join(selected)} {query}", root)
+    if not args.no_daemon and request is not None:
+        payload = daemon.query(request)
+        if payload is not None:
+            return payload.decode().rstrip("\n")
+    indexes = [tabs.search_index(tab, use_cache=not args.no_cache) for tab in selected]
+    return search.dumps(search.search(indexes, query))
+
+
+def _ingest(args, selected: list[str], single: bool) -> int:
+    """Print the trees with the Hyprland binds read from --binds."""
+    from keybinds import ingest
+    try:
+        tree = ingest.load(args.binds)
+    except (OSError, ValueError) as error:
+        print(f"[keybinds.cli] --binds {args.binds}: {error}", file=sys.stderr)
+        return 1
+    parts = {name: tabs.encode(tree if name == "hyprland" else tabs.build(name), args.format)
+             for name in selected}
+    print(parts[selected[0]] if single else tabs.combine(parts))
+    return 0
+
+
+def main(argv: list[str], tab: str | None = None) -> int:
+    profiling.started_main()
+    args, selected = _parse_args(argv, tab)
+    single = tab is not None
+    # The snapshot is of the default root; another checkout is always parsed
+    root = _select_root(args.path) if args.path is not None else None
+
+    def produce() -> str:
+        return tabs.produce(selected, single, args.format)
+
+    if tab is None and args.snapshot:
+        snapshot.write(args.snapshot, selected)
+        return 0
+
+    if tab is None and args.hosts:
+        from keybinds import hosts
+        for path in hosts.write(args.hosts, selected, args.format):
+            print(path)
+        return 0
+
+    if args.binds is not None:
+        return _ingest(args, selected, single)
+
+    if args.search is not None:
+        print(_search(args, selected, root))
+        return 0
+
+    if args.conflicts:
+        if args.no_cache:
+            print(tabs.conflict_report(selected))
+        else:
+            from keybinds import conflicts
+            from keybinds.cache import cached
+            inputs = tabs.sources(selected) + tabs.code_files(selected) + [conflicts.__file__]
+            print(cached("conflicts-" + "-".join(selected), inputs, lambda: tabs.conflict_report(selected)))
+        return 0
+
+    if root is None and not (args.live or snapshot.live_requested()):
+        prebuilt = snapshot.load(selected, single, fmt=args.format)
+        if prebuilt is not None:
+            profiling.note("source", "snapshot")
+            print(prebuilt)
+            return 0
+
+    if args.watch:
+        from keybinds import common, diff, watch
+        # Sources are discovered under home/modules, so a new module counts too
+        watch.run(tabs.sources(selected), diff.producer(selected, single) if args.diff else produce,
+                  on_change=lambda paths: tabs.invalidate(selected, paths),
+                  trees=[common.config_path(common.MODULES_DIR)])
+        return 0
+
+    request = selected[0] if single else "tabs " + ",".join(selected)
+    if args.format != "tree":
+        request = f"{args.format} {request}"
+    if not args.no_daemon:
+        from keybinds import daemon
+        request = daemon.with_root(request, root)
+        if request is not None and daemon.forward(request):
+            profiling.note("source", "daemon")
+            return 0
+
+    # Written while parsing, so Quickshell gets the first sections early
+    def stream():
+        return tabs.stream(selected, single, args.format)
+
+    profiling.note("source", "parse")  # Unless the cache has it
+    if args.no_cache:
+        for chunk in stream():
+            sys.stdout.write(chunk)
+    else:
+        from keybinds.cache import cached_stream
+        name = selected[0] if single else "all-" + "-".join(selected)
+        if args.format != "tree":
+            name += "-" + args.format
+        cached_stream(name, tabs.sources(selected) + tabs.code_files(selected), stream, sys.stdout.write)
+    sys.stdout.write("\n")
+    return 0
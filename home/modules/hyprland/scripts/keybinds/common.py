@@ -0,0 +1,118 @@
+"""
+Helpers shared by the cheatsheet keybind parsers.
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from keybinds import profiling
+
+# Checkout the Nix sources are read from. Overridable so the parsers can run
+# against a store copy at build time (see keybinds.snapshot), and per run or
+# daemon request with --path (see set_config_root()).
+DEFAULT_CONFIG_ROOT = "/etc/nixos"
+CONFIG_ROOT_ENV = "KEYBINDS_CONFIG_ROOT"
+
+# Directory of the parsed files inside a checkout
+MODULES_DIR = os.path.join("home", "modules")
+
+_root_override: Optional[str] = None
+
+
+def config_root() -> str:
+    return _root_override or os.environ.get(CONFIG_ROOT_ENV) or DEFAULT_CONFIG_ROOT
+
+
+def set_config_root(root: Optional[str]) -> None:
+    """Read from `root` instead of the default root (None: back to the default)."""
+    global _root_override
+    _root_override = root
+
+
+@contextmanager
+def using_root(root: Optional[str]) -> Iterator[None]:
+    """Read from `root` inside the block (e.g. for one daemon request)."""
+    previous = _root_override
+    set_config_root(root)
+    try:
+        yield
+    finally:
+        set_config_root(previous)
+
+
+def resolve_root(path: str) -> Optional[str]:
+    """The config root --path selects, or None to use the default.
+
+    A directory with a home/modules is the root itself; a file inside a
+    checkout's home/modules (e.g. keybinds.nix in a worktree) selects that
+    checkout. Symlinks are resolved, so a root has one name in caches and
+    the daemon.
+    """
+    resolved = os.path.realpath(os.path.expanduser(path))
+    if os.path.isdir(resolved):
+        return resolved if os.path.isdir(os.path.join(resolved, MODULES_DIR)) else None
+    if os.path.isfile(resolved):
+        marker = os.sep + MODULES_DIR + os.sep
+        index = resolved.rfind(marker)
+        if index > 0:
+            return resolved[:index]
+    return None
+
+
+def config_path(relative: str) -> str:
+    """Absolute path of a file given relative to the config root."""
+    return os.path.join(config_root(), relative)
+
+
+@profiling.timed("read")
+def read_file(path: str) -> str:
+    """Read a file and return its content, or "" if it is not readable."""
+    expanded_path = os.path.expanduser(os.path.expandvars(path))
+    if not os.access(expanded_path, os.R_OK):
+        return ""
+    with open(expanded_path, "r") as file:
+        if profiling.ENABLED:
+            profiling.count("files_read")
+            profiling.count("bytes_read", os.fstat(file.fileno()).st_size)
+        return file.read()
+
+
+# Threads read_files() uses at most; reads mostly wait for the disk
+READ_THREADS = 8
+
+
+def read_files(paths: List[str]) -> List[str]:
+    """read_file() of every path, in order, on up to READ_THREADS threads.
+
+    With one CPU the files are read in turn; threads would only add their
+    startup cost. (concurrent.futures is not used: importing it takes
+    longer than reading a module tree.)
+    """
+    threads = min(READ_THREADS, os.cpu_count() or 1, len(paths))
+    if threads < 2:
+        return [read_file(path) for path in paths]
+    import threading
+    texts = [""] * len(paths)
+    pending = iter(range(len(paths)))
+    lock = threading.Lock()
+    errors: List[BaseException] = []
+
+    def work() -> None:
+        while not errors:
+            with lock:
+                index = next(pending, None)
+            if index is None:
+                return
+            try:
+                texts[index] = read_file(paths[index])
+            except BaseException as error:  # Raised in the caller's thread below
+                errors.append(error)
+
+    workers = [threading.Thread(target=work, daemon=True) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return texts
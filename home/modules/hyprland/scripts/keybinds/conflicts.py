@@ -0,0 +1,127 @@
+"""
+Duplicate and shadowed bindings across Hyprland, kitty and Neovim (--conflicts).
+
+Every parser module yields its bindings with a layer (see iter_chords() in
+hyprland.py, terminal.py and nvim.py), and every binding knows its canonical
+Chord (keybinds.chords). Bindings are hashed by chord, so the report takes
+one pass over them instead of comparing every pair:
+
+    duplicate  the same chord twice in one layer (e.g. two Normal mode maps)
+    shadowed   a chord an earlier layer takes first; Hyprland grabs chords
+               before any window sees them, and kitty before the kitty_grab
+               overlay and the programs running in it (Neovim)
+    prefix     a Neovim map that is the start of a longer sequence in the same
+               mode, so the longer one waits for 'timeoutlen'
+
+Neovim layers are single modes ("nvim:n", "nvim:x", ...); a map that
+applies in several modes is indexed in each of them, and a conflict found in
+several modes is reported once with all of them.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+
+from keybinds.chords import LEADER, Chord, first_chord
+from keybinds.records import SECTION_SEPARATOR
+
+# Layer family -> families whose chords it takes first
+SHADOWS = {
+    "hyprland": ("kitty", "kitty-grab", "nvim"),
+    "kitty": ("kitty-grab", "nvim"),
+}
+
+KINDS = ["duplicate", "shadowed", "prefix"]
+
+
+def _family(layer: str) -> str:
+    return layer.split(":", 1)[0]
+
+
+def _single_layers(layer: str) -> List[str]:
+    """"nvim:nxso" -> ["nvim:n", "nvim:x", "nvim:s", "nvim:o"]; others as is."""
+    family, _, modes = layer.partition(":")
+    if not modes:
+        return [layer]
+    return [f"{family}:{mode}" for mode in modes]
+
+
+class _Report:
+    """Conflicts keyed by kind, chord and bindings, merging their layers."""
+
+    def __init__(self) -> None:
+        self.conflicts: Dict[Tuple, Dict[str, Any]] = {}
+
+    def add(self, kind: str, chord: Chord, layer: str, **groups: List[int]) -> None:
+        key = (kind, chord) + tuple(tuple(ids) for ids in groups.values())
+        conflict = self.conflicts.get(key)
+        if conflict is None:
+            conflict = self.conflicts[key] = {"kind": kind, "chord": str(chord), "layers": [], **groups}
+        if layer not in conflict["layers"]:
+            conflict["layers"].append(layer)
+
+
+def find_conflicts(entries: Iterable[Tuple[str, Tuple[str, ...], Any]]) -> Dict[str, Any]:
+    """Build the --conflicts report from (layer, section path, binding) entries."""
+    bindings: List[Dict[str, Any]] = []
+    # chord -> single layer -> binding ids
+    by_chord: Dict[Chord, Dict[str, List[int]]] = {}
+    # first chord -> layer family -> binding ids, for shadowing
+    by_first: Dict[Chord, Dict[str, List[int]]] = {}
+    # (single layer, chord) of every Neovim sequence, for prefixes
+    sequences: List[Tuple[str, Chord, int]] = []
+
+    for layer, path, binding in entries:
+        chord = binding.chord()
+        index = len(bindings)
+        bindings.append({
+            "layer": layer,
+            "section": SECTION_SEPARATOR.join(path),
+            "mods": list(binding.mods),
+            "key": binding.key,
+            "comment": binding.comment,
+            "chord": str(chord),
+        })
+        for single in _single_layers(layer):
+            by_chord.setdefault(chord, {}).setdefault(single, []).append(index)
+            if chord.is_sequence:
+                sequences.append((single, chord, index))
+        # Which key <leader> is depends on the Neovim config; leave it out
+        if not chord.mask & LEADER:
+            ids = by_first.setdefault(first_chord(chord), {}).setdefault(_family(layer), [])
+            if not ids or ids[-1] != index:
+                ids.append(index)
+
+    report = _Report()
+    for chord, layers in by_chord.items():
+        for layer, ids in layers.items():
+            if len(ids) > 1:
+                report.add("duplicate", chord, layer, bindings=ids)
+
+    for chord, families in by_first.items():
+        for family, shadowed_families in SHADOWS.items():
+            if family not in families:
+                continue
+            for shadowed_family in shadowed_families:
+                if shadowed_family in families:
+                    report.add("shadowed", chord, shadowed_family,
+                               by=families[family], bindings=families[shadowed_family])
+
+    for layer, chord, index in sequences:
+        keys = chord.keysym.split(" ")
+        for length in range(1, len(keys)):
+            prefix = Chord(chord.mask, " ".join(keys[:length]))
+            ids = by_chord.get(prefix, {}).get(layer)
+            if ids:
+                report.add("prefix", prefix, layer, bindings=ids + [index])
+
+    conflicts = sorted(report.conflicts.values(), key=lambda conflict: KINDS.index(conflict["kind"]))
+    counts = {kind: 0 for kind in KINDS}
+    for conflict in conflicts:
+        counts[conflict["kind"]] += 1
+        for group in ("by", "bindings"):
+            if group in conflict:
+                conflict[group] = [bindings[index] for index in conflict[group]]
+    return {"bindings": len(bindings), "counts": counts, "conflicts": conflicts}
+
+
+def dumps(report: Dict[str, Any]) -> str:
+    return json.dumps(report)
@@ -0,0 +1,279 @@
+"""
+Resident keybind daemon for the quickshell cheatsheet.
+
+Keeps the parsed Hyprland, Neovim and Terminal trees in memory and answers
+queries over a Unix socket, so a cheatsheet refresh does not have to start a
+parser from scratch. The protocol is one request line, either a tab name
+("hyprland", "nvim" or "terminal") for that tab's bare tree, or
+"tabs <tab>,<tab>,..." for the combined document printed by get_all_keybinds.py.
+Either form may be prefixed with "flat " for the --format flat output.
+"search <tab>,<tab>,... <query>" answers with the ranked hits of --search.
+Any request may start with "root=<dir> " to read the checkout at <dir>
+instead of the default config root (--path); the parsed trees of the
+MAX_ROOTS most recently used roots are kept. The reply is the JSON followed by a newline, and the connection is closed. An
+empty reply means "parse it yourself".
+
+The keybind scripts act as the client (see forward()), so the QML `Process`
+commands keep working whether or not the daemon is running.
+
+Run with `python3 -m keybinds.daemon` from the scripts directory. Systemd
+socket activation (LISTEN_FDS) is supported.
+"""
+import os
+import signal
+import socket
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from keybinds import common, flat, profiling, records, search, tabs
+
+SOCKET_NAME = "quickshell-keybinds.sock"
+CLIENT_TIMEOUT = 2.0
+MAX_REQUEST = 4096
+MAX_ROOTS = 4
+ROOT_PARAM = "root="
+
+
+def socket_path() -> Optional[str]:
+    """Socket location under $XDG_RUNTIME_DIR, or None if it is not set."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        return None
+    return os.path.join(runtime_dir, SOCKET_NAME)
+
+
+@profiling.timed("daemon.query")
+def query(request: str, path: Optional[str] = None, timeout: float = CLIENT_TIMEOUT) -> Optional[bytes]:
+    """Send `request` to a running daemon. Returns None if no usable answer."""
+    path = path or socket_path()
+    if path is None:
+        return None
+    chunks = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(request.encode() + b"\n")
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+    payload = b"".join(chunks)
+    return payload or None
+
+
+def with_root(request: str, root: Optional[str]) -> Optional[str]:
+    """`request` for the checkout at `root` (None: the default root).
+
+    None if `root` cannot be sent (the request line is split at spaces).
+    """
+    if root is None:
+        return request
+    if any(char.isspace() for char in root):
+        return None
+    return f"{ROOT_PARAM}{root} {request}"
+
+
+def forward(request: str) -> bool:
+    """Write the daemon's answer for `request` to stdout. False if unavailable."""
+    payload = query(request)
+    if payload is None:
+        return False
+    sys.stdout.buffer.write(payload)
+    sys.stdout.flush()
+    return True
+
+
+class TabState:
+    """Parsed tree and its serialized form for one tab of one config root
+    (None: the default root), refreshed on change."""
+
+    def __init__(self, tab: str, root: Optional[str] = None) -> None:
+        self.tab = tab
+        self.root = root
+        self.module = tabs.load(tab)
+        self.signature: Optional[Tuple] = None
+        self.tree: Optional[Dict] = None
+        self.text = ""
+        self.payload = b""
+        self._flat_text: Optional[str] = None
+        self._index: Optional[search.SearchIndex] = None
+
+    def _stat_signature(self) -> Tuple:
+        signature = []
+        for path in self.module.sources():
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self) -> None:
+        """Re-parse if a source file changed since the last call."""
+        with common.using_root(self.root):
+            self._refresh()
+
+    def _refresh(self) -> None:
+        signature = self._stat_signature()
+        if signature != self.signature:
+            self.tree = self.module.build_tree()
+            self.text = records.dumps(self.tree)
+            self.payload = (self.text + "\n").encode()
+            self._flat_text = None
+            self._index = None
+            self.signature = signature
+
+    def encoded(self, fmt: str) -> str:
+        """The tree's JSON in output format `fmt`; flat is built on first use."""
+        if fmt != "flat":
+            return self.text
+        if self._flat_text is None:
+            self._flat_text = flat.dumps(self.tree)
+        return self._flat_text
+
+    def search_index(self) -> search.SearchIndex:
+        """Search index of the current tree, built on first use."""
+        if self._index is None:
+            self._index = search.build(self.tab, self.tree)
+        return self._index
+
+
+class RootStates:
+    """TabStates of each config root; the least recently used root goes first."""
+
+    def __init__(self, max_roots: int = MAX_ROOTS) -> None:
+        self._roots: "OrderedDict[Optional[str], Dict[str, TabState]]" = OrderedDict()
+        self.max_roots = max_roots
+
+    def get(self, root: Optional[str] = None) -> Dict[str, TabState]:
+        states = self._roots.get(root)
+        if states is None:
+            states = self._roots[root] = {tab: TabState(tab, root) for tab in tabs.ALL_TABS}
+            while len(self._roots) > self.max_roots:
+                self._roots.popitem(last=False)
+        self._roots.move_to_end(root)
+        return states
+
+
+def _listening_socket(path: Optional[str]) -> Tuple[socket.socket, Optional[str]]:
+    """Return the socket to serve on and the path to unlink on exit (if ours)."""
+    if os.environ.get("LISTEN_PID") == str(os.getpid()) and os.environ.get("LISTEN_FDS"):
+        # Socket activation: systemd passes the listening socket as fd 3
+        return socket.socket(fileno=3), None
+
+    path = path or socket_path()
+    if path is None:
+        raise SystemExit("XDG_RUNTIME_DIR is not set; pass a socket path")
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            if probe.connect_ex(path) == 0:
+                raise SystemExit(f"keybind daemon already running on {path}")
+        os.unlink(path)  # Stale socket from a previous run
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(16)
+    return server, path
+
+
+def _reply(request: str, roots: RootStates) -> bytes:
+    root = None
+    if request.startswith(ROOT_PARAM):
+        param, _, request = request.partition(" ")
+        root = os.path.realpath(param[len(ROOT_PARAM):])
+        if not os.path.isdir(root):
+            return b""
+    states = roots.get(root)
+
+    if request.startswith("search "):
+        selection, _, query = request[len("search "):].partition(" ")
+        try:
+            selected = tabs.parse_tab_list(selection)
+        except ValueError:
+            return b""
+        indexes = []
+        for tab in selected:
+            states[tab].refresh()
+            indexes.append(states[tab].search_index())
+        return (search.dumps(search.search(indexes, query)) + "\n").encode()
+
+    fmt = "tree"
+    if request.startswith("flat "):
+        fmt, request = "flat", request[len("flat "):]
+
+    if request.startswith("tabs "):
+        try:
+            selected = tabs.parse_tab_list(request[len("tabs "):])
+        except ValueError:
+            return b""
+        for tab in selected:
+            states[tab].refresh()
+        return (tabs.combine({tab: states[tab].encoded(fmt) for tab in selected}) + "\n").encode()
+
+    state = states.get(request)
+    if state is None:
+        return b""
+    state.refresh()
+    if fmt == "flat":
+        return (state.encoded(fmt) + "\n").encode()
+    return state.payload
+
+
+def _handle(conn: socket.socket, roots: RootStates) -> None:
+    conn.settimeout(1.0)
+    request = b""
+    while b"\n" not in request and len(request) < MAX_REQUEST:
+        chunk = conn.recv(MAX_REQUEST)
+        if not chunk:
+            break
+        request += chunk
+
+    text = request.decode(errors="replace").strip()
+    try:
+        payload = _reply(text, roots)
+    except Exception as error:  # Parser bug: let the client parse instead
+        print(f"[keybinds.daemon] {text}: {error!r}", file=sys.stderr)
+        return
+    if payload:
+        conn.sendall(payload)
+
+
+def serve(path: Optional[str] = None) -> None:
+    roots = RootStates()
+    for state in roots.get().values():
+        try:
+            state.refresh()  # Warm up so the first query is already fast
+        except Exception as error:
+            print(f"[keybinds.daemon] {state.tab}: {error!r}", file=sys.stderr)
+
+    server, owned_path = _listening_socket(path)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    _handle(conn, roots)
+                except OSError:
+                    pass  # Client went away
+    finally:
+        server.close()
+        if owned_path:
+            try:
+                os.unlink(owned_path)
+            except OSError:
+                pass
+
+
+def main(argv: List[str]) -> None:
+    serve(argv[0] if argv else None)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,184 @@
+"""
+Binding-level diffs between two trees of a tab (--watch --diff).
+
+A live cheatsheet gets the full tree once; after that, every change to a
+source file is one patch document it can apply to its models in place:
+
+    {"format": "patch", "version": 1, "ops": [...]}                 per-tab scripts
+    {"format": "patch", "version": 1, "tabs": {"nvim": [...], ...}}  get_all_keybinds.py
+
+(tabs without changes are left out). Sections and bindings are addressed by
+stable ids derived from their content, not their position, so an edit only
+touches what it changed:
+
+    section id  the section names from the root, joined by SECTION_SEPARATOR
+                ("" is the root)
+    binding id  "<section id> | <mods+key>"
+
+A repeated name or chord gets "#2", "#3", ... in document order. Ops are
+listed removals first, then in document order of the new tree, so every
+"after" refers to an id that exists once the preceding ops are applied:
+
+    {"op": "remove-section", "id"}            the section and everything in it
+    {"op": "add-section", "id", "parent", "after", "name"}
+    {"op": "remove", "id"}
+    {"op": "add", "id", "section", "after", "value"}
+    {"op": "replace", "id", "value"}
+
+"after" is the previous sibling's id, or null for the first one; "value" is
+the binding's serialized fields. Sections that were reordered among their
+siblings are removed and added again, as are reordered bindings.
+"""
+import json
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from keybinds import tabs
+from keybinds.records import SECTION_SEPARATOR, binding_items, node_parts
+
+PATCH_VERSION = 1
+
+
+def _unique(name: str, seen: Dict[str, int]) -> str:
+    count = seen[name] = seen.get(name, 0) + 1
+    return name if count == 1 else f"{name}#{count}"
+
+
+def _value(binding: Any) -> Dict[str, Any]:
+    return {field: list(value) if field == "mods" else value for field, value in binding_items(binding)}
+
+
+class _Index:
+    """Sections of one tree by id, in document order."""
+
+    def __init__(self, tree: Any) -> None:
+        # section id -> (node, parent id, name, child ids, bindings)
+        self.sections: Dict[str, Tuple[Any, Optional[str], str, List[str], list]] = {}
+        stack: List[Tuple[Any, Optional[str], str, str]] = [(tree, None, "", "")]
+        while stack:
+            node, parent, section_id, name = stack.pop()
+            _, children, keybinds = node_parts(node)
+            child_ids: List[str] = []
+            # An unnamed section at the top must not get the root's id
+            names: Dict[str, int] = {"": 1} if section_id == "" else {}
+            entries = []
+            for child in children:
+                child_name = node_parts(child)[0]
+                label = _unique(child_name, names)
+                child_id = label if section_id == "" else section_id + SECTION_SEPARATOR + label
+                child_ids.append(child_id)
+                entries.append((child, section_id, child_id, child_name))
+            self.sections[section_id] = (node, parent, name, child_ids, keybinds)
+            stack.extend(reversed(entries))
+
+
+def _binding_ids(section_id: str, keybinds: list) -> List[str]:
+    ids = []
+    seen: Dict[str, int] = {}
+    for binding in keybinds:
+        fields = dict(binding_items(binding))
+        chord = "+".join([*fields.get("mods", ()), fields.get("key", "")])
+        ids.append(_unique(f"{section_id} | {chord}", seen))
+    return ids
+
+
+def _moved(old_ids: List[str], new_ids: List[str], kept: set) -> set:
+    """Ids kept in both lists whose relative order changed (all of them, if any did)."""
+    old_order = [item for item in old_ids if item in kept]
+    new_order = [item for item in new_ids if item in kept]
+    return set() if old_order == new_order else set(new_order)
+
+
+def diff(old: Any, new: Any) -> List[Dict[str, Any]]:
+    """Ops turning tree `old` into tree `new` (see the module docstring).
+
+    Sections whose bindings are the same objects as before (an unchanged
+    keybinds.hyprland section or nvim mode group) are skipped unread.
+    """
+    if old is new:
+        return []
+    before, after = _Index(old), _Index(new)
+    removals: List[Dict[str, Any]] = []
+    changes: List[Dict[str, Any]] = []
+
+    # Sections to re-add: new ones, and kept ones that moved among their siblings
+    readded = set(after.sections) - set(before.sections)
+    for section_id, (_, _, _, child_ids, _) in after.sections.items():
+        if section_id in before.sections and section_id not in readded:
+            old_children = before.sections[section_id][3]
+            kept = set(old_children) & set(child_ids)
+            readded |= _moved(old_children, child_ids, kept)
+    for section_id, (_, _, _, child_ids, _) in after.sections.items():
+        if section_id in readded:
+            # A moved section's subtree comes back with it
+            readded.update(child_ids)
+
+    gone = [section_id for section_id in before.sections
+            if section_id not in after.sections or section_id in readded]
+    gone_set = set(gone)
+    for section_id in gone:
+        parent = before.sections[section_id][1]
+        if parent not in gone_set:
+            removals.append({"op": "remove-section", "id": section_id})
+
+    for section_id, (node, parent, name, child_ids, keybinds) in after.sections.items():
+        if section_id in readded:
+            siblings = after.sections[parent][3]
+            position = siblings.index(section_id)
+            changes.append({"op": "add-section", "id": section_id, "parent": parent,
+                            "after": siblings[position - 1] if position else None, "name": name})
+            old_keybinds: list = []
+        else:
+            old_node, _, _, _, old_keybinds = before.sections[section_id]
+            if old_node is node or (len(old_keybinds) == len(keybinds)
+                                    and all(map(operator.is_, old_keybinds, keybinds))):
+                continue
+        old_ids = _binding_ids(section_id, old_keybinds)
+        binding_ids = _binding_ids(section_id, keybinds)
+        old_bindings = dict(zip(old_ids, old_keybinds))
+        kept = set(old_ids) & set(binding_ids)
+        moved = _moved(old_ids, binding_ids, kept)
+        for binding_id in old_ids:
+            if binding_id not in kept or binding_id in moved:
+                removals.append({"op": "remove", "id": binding_id})
+        previous = None
+        for binding_id, binding in zip(binding_ids, keybinds):
+            if binding_id not in kept or binding_id in moved:
+                changes.append({"op": "add", "id": binding_id, "section": section_id,
+                                "after": previous, "value": _value(binding)})
+            else:
+                old_binding = old_bindings[binding_id]
+                if old_binding is not binding and _value(old_binding) != _value(binding):
+                    changes.append({"op": "replace", "id": binding_id, "value": _value(binding)})
+            previous = binding_id
+    return removals + changes
+
+
+def dumps(ops: Dict[str, List[Dict[str, Any]]], single: bool = False) -> Optional[str]:
+    """The patch document for per-tab `ops`, or None if nothing changed."""
+    changed = {tab: tab_ops for tab, tab_ops in ops.items() if tab_ops}
+    if not changed:
+        return None
+    document: Dict[str, Any] = {"format": "patch", "version": PATCH_VERSION}
+    if single:
+        document["ops"] = next(iter(changed.values()))
+    else:
+        document["tabs"] = changed
+    return json.dumps(document)
+
+
+def producer(selected: List[str], single: bool = False) -> Callable[[], Optional[str]]:
+    """produce() for watch.run(): the full tree output on the first call, then
+    the patch document from the previous call's trees (None if unchanged)."""
+    previous: Dict[str, Any] = {}
+
+    def produce() -> Optional[str]:
+        trees = {tab: tabs.build(tab) for tab in selected}
+        if previous:
+            text = dumps({tab: diff(previous[tab], tree) for tab, tree in trees.items()}, single)
+        else:
+            encoded = {tab: tabs.encode(tree) for tab, tree in trees.items()}
+            text = encoded[selected[0]] if single else tabs.combine(encoded)
+        previous.update(trees)
+        return text
+    return produce
@@ -0,0 +1,101 @@
+"""
+Flat, columnar encoding of keybind trees (--format flat).
+
+Instead of nested children/keybinds objects, a tree is written as a string
+table plus parallel arrays, so a consumer can fill its models with plain
+indexed loops:
+
+    {
+      "format": "flat", "version": 1,
+      "strings":  every distinct string, once
+      "mods":     every distinct modifier combination, once, as string indices
+      "sections": {"name": [string], "parent": [section]}
+      "keybinds": {"section": [section], "mods": [mods], "key": [string],
+                   "comment": [string], ...}
+    }
+
+Section 0 is the root (parent -1, name "" if the tree has none); sections
+are listed in document order (pre-order), and keybinds in document order
+within each section. Besides section and mods, keybinds get one string
+column per field of the tab's records (dispatcher/params for Hyprland,
+action for Neovim); a value a binding does not have is -1.
+"""
+import json
+from typing import Any, Dict, List
+
+from keybinds import profiling
+from keybinds.records import binding_items, node_parts
+
+FLAT_VERSION = 1
+
+
+class _Table:
+    """Assigns each distinct value a stable index, in order of first use."""
+
+    def __init__(self) -> None:
+        self.index: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def add(self, value: Any) -> int:
+        found = self.index.get(value)
+        if found is None:
+            found = self.index[value] = len(self.values)
+            self.values.append(value)
+        return found
+
+
+def flatten(tree: Any) -> Dict[str, Any]:
+    """Flatten a tree of records or plain dicts (e.g. a decoded snapshot)."""
+    strings = _Table()
+    mods = _Table()
+    section_name: List[int] = []
+    section_parent: List[int] = []
+    columns: Dict[str, List[int]] = {"section": [], "mods": []}
+    count = 0
+
+    # Explicit stack; children are pushed reversed so they pop in order
+    stack = [(tree, -1)]
+    while stack:
+        node, parent = stack.pop()
+        section = len(section_name)
+        name, children, keybinds = node_parts(node)
+        section_name.append(strings.add(name))
+        section_parent.append(parent)
+
+        for binding in keybinds:
+            columns["section"].append(section)
+            for field, value in binding_items(binding):
+                if field == "mods":
+                    columns["mods"].append(mods.add(tuple(strings.add(m) for m in value)))
+                    continue
+                column = columns.get(field)
+                if column is None:
+                    # First binding with this field; earlier ones lack it
+                    column = columns[field] = [-1] * count
+                column.append(strings.add(value))
+            count += 1
+            for column in columns.values():
+                if len(column) < count:
+                    column.append(-1)
+
+        stack.extend((child, section) for child in reversed(children))
+
+    return {
+        "format": "flat",
+        "version": FLAT_VERSION,
+        "strings": strings.values,
+        "mods": [list(combo) for combo in mods.values],
+        "sections": {"name": section_name, "parent": section_parent},
+        "keybinds": columns,
+    }
+
+
+@profiling.timed("encode_flat")
+def dumps(tree: Any) -> str:
+    """Flat JSON for `tree`, without insignificant whitespace."""
+    return json.dumps(flatten(tree), separators=(",", ":"))
+
+
+def convert(text: str) -> str:
+    """Flat JSON for the JSON text of a tree (e.g. a build-time snapshot)."""
+    return dumps(json.loads(text))
@@ -0,0 +1,786 @@
+"""
+Golden outputs, latency budgets and differential fuzzing for the cheatsheet
+keybind parsers.
+
+The reference is the parsers of the original get_*_keybinds.py scripts,
+kept in keybinds.reference. Every faster or more tolerant parser since has
+to agree with them, except where a change was intended:
+
+golden outputs  Every tab is produced from the real sources of this
+                checkout and diffed (keybinds.diff) against the tab the
+                original script produces from them. The ops have to be
+                exactly the reviewed deltas in golden.json, each with the
+                reason for the change. An op that is not listed, or a
+                listed one that no longer happens, fails; the unlisted
+                ones are printed as a delta to review and add.
+
+budgets         Each parser and its original in keybinds.reference are
+                timed in the same process on the same real sources (every
+                hyprland/*.nix module, nixvim.nix, kitty.nix and every
+                file setting shellAliases). Budgets are ratios to the
+                original, so they hold on any machine: the best wall time
+                of --repeat runs may not exceed the recorded ratio of the
+                original's best time. A case that is new, or whose input
+                files changed since it was recorded, is only re-measured;
+                --update records the ratios anew and keeps the deltas as
+                they are.
+
+fuzzing         Seeded random inputs are parsed by the reference and by
+                the current parsers, and any difference fails:
+                hyprland  config texts (bind lines of every kind and mod
+                          spelling, params with commas, ##! headings nested
+                          with arbitrary depth jumps, #/# comment binds,
+                          [hidden] markers, blank and unrelated lines) for
+                          every implementation in candidates(); some texts
+                          are edits of the previous one, so incremental
+                          parsers reuse sections
+                kitty     kitty.nix files (map lines with and without args
+                          and comments, section comments of any length,
+                          unrelated options) for parse_kitty_keybinds() and
+                          parse_kitty_grab_keybinds()
+                aliases   files with flat shellAliases sets, under any of
+                          their attribute paths, for parse_shell_aliases();
+                          compared as the tab lists them, first alias of
+                          each name
+                Inputs stay in the grammar the reference regexes read
+                correctly (no antiquotations, string escapes or nested
+                sets). A failing input is reduced to the lines needed to
+                reproduce the difference.
+
+antiquotes      A Hyprland module binding Nix names and Hyprland variables,
+                and escaping antiquotes (''${name}, "\\${name}") in both
+                its settings and extraConfig, has to give the config texts
+                in ANTIQUOTE_TEXTS: the escaped ones are kept as written.
+
+fixture         fixtures/hyprctl_binds.json is `hyprctl binds -j` of this
+                checkout's Hyprland config. Ingested (keybinds.ingest),
+                it has to give the tree of the Nix sources, but for the
+                Hyprland variables the sources do not define
+                (FIXTURE_VARIABLES), which Hyprland evaluated.
+
+layout          The cheatsheetSources linkFarm in quickshell.nix is the
+                root the bundled cheatsheet is produced from. A root of
+                symlinks with only its entries has to give every tab and
+                every host (--hosts) exactly as the checkout does.
+
+Exit status 1 if any check fails.
+
+    python3 -m keybinds.golden
+    python3 -m keybinds.golden --parser parse_keys --repeat 10
+    python3 -m keybinds.golden --fuzz 2000 --seed 7
+    python3 -m keybinds.golden --update
+"""
+import argparse
+import difflib
+import gc
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from keybinds import bench, diff, hosts, hyprland, ingest, nvim, records, reference, tabs, terminal, variables
+from keybinds.common import (MODULES_DIR, config_path, config_root, read_file, resolve_root, set_config_root,
+                             using_root)
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden.json")
+GOLDEN_VERSION = 3
+
+# Recorded budget: the measured ratio to the original parser, with the
+# benchmarks' tolerance (the fraction on the ratio, the slack in ms)
+BUDGET_TOLERANCE = bench.TOLERANCE["wall_ms"]
+
+# Lines of a mismatching output's diff printed
+DIFF_LINES = 40
+
+# (parser, input files relative to the config root, zero-argument callables
+# running the parser and its original in keybinds.reference on them)
+Case = Tuple[str, List[str], Callable[[], object], Callable[[], object]]
+
+PARSERS = [
+    "parse_keys",
+    "parse_nixvim_keybinds",
+    "parse_kitty_keybinds",
+    "parse_kitty_grab_keybinds",
+    "parse_shell_aliases",
+]
+
+# The linkFarm of the sources the bundled cheatsheet is produced from
+SOURCES_MODULE = os.path.join(MODULES_DIR, "quickshell.nix")
+LINK_FARM_PATTERN = re.compile(r'cheatsheetSources\s*=\s*pkgs\.linkFarm\s+"[^"]*"\s*\[(.*?)\];', re.DOTALL)
+LINK_FARM_ENTRY_PATTERN = re.compile(r'\{\s*name\s*=\s*"([^"]+)";\s*path\s*=\s*([^;\s]+);\s*\}')
+
+# A `hyprctl binds -j` dump of this checkout's Hyprland config, and the
+# Hyprland variables it was evaluated with that the Nix sources leave as written
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "hyprctl_binds.json")
+FIXTURE_VARIABLES = {"qsConfig": "ii"}
+
+# A Hyprland module (written as keybinds.nix of an empty root) and the config
+# texts read_nix_blocks() has to give for it
+ANTIQUOTE_MODULE = r"""{ ... }:
+let
+  terminal = "kitty";
+  shell = "\${terminal}";
+in {
+  wayland.windowManager.hyprland.settings = {
+    "$qsConfig" = "ii";
+    bind = [
+      "SUPER, T, exec, ${terminal}"
+      "SUPER SHIFT, T, exec, \${terminal} -e btop"
+    ];
+  };
+  wayland.windowManager.hyprland.extraConfig = ''
+    bind = SUPER, Return, exec, ${terminal} # Terminal
+    bind = SUPER, E, exec, ''${terminal} -e yazi # Runs ''${terminal}
+    bind = SUPER, Q, exec, qs -c ''$qsConfig
+    bind = SUPER, S, exec, ${shell}
+  '';
+}
+"""
+ANTIQUOTE_TEXTS = [
+    "bind = SUPER, T, exec, kitty\n"
+    "bind = SUPER SHIFT, T, exec, ${terminal} -e btop",
+    "bind = SUPER, Return, exec, kitty # Terminal\n"
+    "bind = SUPER, E, exec, ${terminal} -e yazi # Runs ${terminal}\n"
+    "bind = SUPER, Q, exec, qs -c ii\n"
+    "bind = SUPER, S, exec, ${terminal}\n",
+]
+
+_BIND_KINDS = ["bind", "bindl", "binde", "bindm", "bindr", "bindle", "bindn"]
+_DESCRIBED_KINDS = ["bindd", "bindld", "bindde", "binddle", "bindrde"]
+_MODS = ["", "SUPER", "SUPER SHIFT", "SUPER+SHIFT", "SUPER + CTRL", "CTRL ALT", "$mainMod", "ALT_L", " SUPER  "]
+_KEYS = ["A", "Q", "1", "Return", "Space", "mouse:272", "XF86AudioMute", "code:10", "comma", "Print", ""]
+_ACTIONS = [
+    ("exec", "kitty"), ("exec", "notify-send Title, body text"), ("exec", "${terminal} -e btop"),
+    ("workspace", "3"), ("movetoworkspace", "special, silent"), ("movefocus", "l"), ("killactive", ""),
+    ("fullscreen", "0"), ("resizeactive", "10 0"), ("global", "quickshell:overviewToggle"),
+    ("togglespecialworkspace", ""), ("exec", "qs -c $qsConfig ipc call, TEST_ALIVE"), ("pass", "^(obs)$"),
+]
+_COMMENTS = ["", " # Open terminal", " #Focus left", " # [hidden]", " #[hidden] Secret", " # Reads [hidden] later",
+             " # with # inside", " #", " # Ünïcode ✓"]
+_NOISE = ["", "   ", "# plain comment", "# ! not a heading", "#", "general {", "    gaps_in = 5", "}",
+          "$mainMod = SUPER", "exec-once = waybar", "submap = resize", "binds {", "unbind = SUPER, Q",
+          "bindsomething", "#/#", "#/# not a bind"]
+
+_KITTY_KEYS = ["ctrl+shift+t", "kitty_mod+enter", "ctrl+alt+1", "super+Left", "f1", "alt+g", "Ctrl+Shift+Up",
+               "ctrl+shift+equal", "shift+page_up", "ctrl+shift+\\"]
+_KITTY_ACTIONS = [
+    ("new_tab", ""), ("close_window", ""), ("scroll_line_up", ""), ("launch", "--location=hsplit --cwd=current"),
+    ("launch", "--location=vsplit"), ("launch", "--type=overlay htop"), ("kitten", "kitty_grab/grab.py"),
+    ("kitten", "kitty_scrollback_nvim.py --nvim-args -n"), ("kitten", "hints --type url"),
+    ("kitty_scrollback_nvim", ""), ("change_font_size", "all +2.0"), ("goto_tab", "3"), ("send_text", "all \\x1b"),
+]
+_KITTY_COMMENTS = ["", " # Split below", " #Grab", " # ", " # with # inside", " # Ünïcode ✓"]
+_KITTY_HEADINGS = ["# Tabs", "## Windows", "#Scrolling", "# A comment that runs well past thirty characters",
+                   "# Twenty-nine character heading", "# Thirty characters long heading", "#", "# ", "###",
+                   "#map ctrl+x new_tab", "#mapping notes"]
+_KITTY_NOISE = ["", "   ", "font_size 12", "enable_audio_bell no", "mapx ctrl+a new_tab", "map", "map ctrl+a",
+                "kitty_mod ctrl+shift", "include theme.conf", "clear_all_shortcuts no"]
+_GRAB_ACTIONS = ["quit", "confirm", "move left", "move word_end left", "move page down", "set_mode visual",
+                 "select stream left first", "scroll up", "custom_action here", "move  left", "set_mode normal"]
+_GRAB_HEADINGS = ["# Movement", "#no space", "# A heading that is far longer than thirty", "# ", "#", "## Modes"]
+
+_ALIAS_PATHS = ["shellAliases", "home.shellAliases", "programs.zsh.shellAliases"]
+_ALIAS_NAMES = ["ll", "la", "l", "gs", "git-log", "nix-up", "v", "x_y", "ff-arch", "c2", "rebuild-all-hosts"]
+_ALIAS_COMMANDS = [
+    "eza -l", "git status", "sudo nixos-rebuild switch --flake /etc/nixos#$(hostname)", "nvim", "cd ..",
+    "echo 'quoted' ; ls", "a = b", "grep -E 'x|y'", "ls # not a comment", "$EDITOR", "Ünïcode ✓", " ls -a ",
+]
+_ALIAS_NOISE = ["programs.zsh.enable = true;", "home.packages = [ pkgs.eza ];", "programs.eza.enable = true;",
+                'home.sessionVariables = { EDITOR = "nvim"; };', "# Aliases below", "imports = [ ./other.nix ];"]
+
+
+def checkout_root() -> Optional[str]:
+    """The checkout these scripts live in, whose sources are the golden inputs."""
+    return resolve_root(os.path.abspath(__file__))
+
+
+def _sha256(relative: str) -> Optional[str]:
+    try:
+        with open(config_path(relative), "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def cases(parsers: List[str]) -> Dict[str, Case]:
+    """Golden case name -> case, for the sources of the current config root."""
+    found: Dict[str, Case] = {}
+    if "parse_keys" in parsers:
+        for relative in hyprland.module_files():
+            path = config_path(relative)
+            # The variables files and modules defining Hyprland variables
+            # change the output as well
+            inputs = [relative] + [os.path.relpath(other, config_root()) for other in hyprland._dependencies(path)]
+            found[f"parse_keys {relative}"] = ("parse_keys", inputs, lambda path=path: hyprland.parse_keys(path),
+                                               lambda path=path: reference.parse_keys(path))
+    nixvim_text = read_file(config_path(nvim.NIX_NIXVIM_FILE))
+    if "parse_nixvim_keybinds" in parsers:
+        found[f"parse_nixvim_keybinds {nvim.NIX_NIXVIM_FILE}"] = (
+            "parse_nixvim_keybinds", [nvim.NIX_NIXVIM_FILE], lambda: nvim.parse_nixvim_keybinds(nixvim_text),
+            lambda: reference.parse_nixvim_keybinds(nixvim_text))
+    kitty_text = read_file(config_path(terminal.KITTY_FILE))
+    if "parse_kitty_keybinds" in parsers:
+        found[f"parse_kitty_keybinds {terminal.KITTY_FILE}"] = (
+            "parse_kitty_keybinds", [terminal.KITTY_FILE], lambda: terminal.parse_kitty_keybinds(kitty_text),
+            lambda: reference.parse_kitty_keybinds(kitty_text))
+    if "parse_kitty_grab_keybinds" in parsers:
+        found[f"parse_kitty_grab_keybinds {terminal.KITTY_FILE}"] = (
+            "parse_kitty_grab_keybinds", [terminal.KITTY_FILE],
+            lambda: terminal.parse_kitty_grab_keybinds(kitty_text),
+            lambda: reference.parse_kitty_grab_keybinds(kitty_text))
+    if "parse_shell_aliases" in parsers:
+        for relative in terminal.alias_files():
+            text = read_file(config_path(relative))
+            source = terminal.alias_source_name(relative)
+            found[f"parse_shell_aliases {relative}"] = (
+                "parse_shell_aliases", [relative],
+                lambda text=text, source=source: terminal.parse_shell_aliases(text, source),
+                lambda text=text, source=source: reference.parse_shell_aliases(text, source))
+    return found
+
+
+def measure(run: Callable[[], object], repeat: int) -> float:
+    """The best wall time in ms of `run` over `repeat` runs, each parsing from scratch."""
+    bench._reset_caches()
+    run()
+    timings = []
+    for _ in range(max(repeat, 1)):
+        bench._reset_caches()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(min(timings), 3)
+
+
+def load_golden(path: str = GOLDEN_FILE) -> Dict:
+    try:
+        with open(path, "r") as file:
+            golden = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if golden.get("version") != GOLDEN_VERSION:
+        return {}
+    return golden
+
+
+def _diff(expected: str, actual: str) -> List[str]:
+    """The first DIFF_LINES lines of a unified diff of two JSON outputs."""
+    def lines(output: str) -> List[str]:
+        return json.dumps(json.loads(output), indent=1, ensure_ascii=False).splitlines()
+    found = list(difflib.unified_diff(lines(expected), lines(actual), "expected", "actual", lineterm=""))
+    return found[:DIFF_LINES] + ([f"... {len(found) - DIFF_LINES} more lines"] if len(found) > DIFF_LINES else [])
+
+
+def tab_ops(tab: str) -> List[Dict[str, Any]]:
+    """keybinds.diff ops turning the reference's `tab` into the current one."""
+    bench._reset_caches()
+    expected = reference.TABS[tab]()
+    actual = json.loads(tabs.encode(tabs.build(tab)))
+    return diff.diff(expected, actual)
+
+
+def _op_key(op: Dict[str, Any]) -> str:
+    return json.dumps(op, sort_keys=True, ensure_ascii=False)
+
+
+def check_deltas(golden: Dict) -> List[str]:
+    """Diff every tab against the reference; the ops have to be the recorded deltas."""
+    recorded = golden.get("deltas", {})
+    failures = []
+    for tab in tabs.ALL_TABS:
+        deltas = recorded.get(tab, [])
+        ops = tab_ops(tab)
+        expected = Counter(_op_key(op) for delta in deltas for op in delta["ops"])
+        unexpected = Counter(_op_key(op) for op in ops) - expected
+        missing = expected - Counter(_op_key(op) for op in ops)
+        print(f"{'reference ' + tab:<64}{len(ops):>7} ops  {len(deltas)} deltas")
+        if unexpected:
+            listed = []
+            for op in ops:
+                if unexpected[_op_key(op)]:
+                    unexpected[_op_key(op)] -= 1
+                    listed.append(op)
+            delta = {"reason": "", "ops": listed}
+            failures.append(f"{tab}: {len(listed)} ops against the reference in no reviewed delta; "
+                            "if intended, add to golden.json:\n    "
+                            + "\n    ".join(json.dumps(delta, indent=1, ensure_ascii=False).splitlines()))
+        for key in missing.elements():
+            reason = next(delta["reason"] for delta in deltas if key in map(_op_key, delta["ops"]))
+            failures.append(f"{tab}: delta no longer happens ({reason}): {key}")
+    return failures
+
+
+def check_budgets(found: Dict[str, Case], golden: Dict, repeat: int, update: bool) -> List[str]:
+    """Time every case and its original; record the ratio as its budget with
+    `update`, else compare it with `golden`. Returns the failures, as
+    human-readable lines."""
+    recorded = golden.setdefault("cases", {})
+    failures = []
+    fraction, slack = BUDGET_TOLERANCE
+    parsers = {case[0] for case in found.values()}
+    for name in [name for name in recorded if name not in found and name.split(" ", 1)[0] in parsers]:
+        if update:
+            del recorded[name]
+        else:
+            print(f"{name:<64}  gone (drop it with --update)")
+    for name, (_, inputs, run, original) in found.items():
+        wall_ms = measure(run, repeat)
+        original_ms = measure(original, repeat)
+        ratio = wall_ms / max(original_ms, 0.001)
+        hashes = {relative: _sha256(relative) for relative in inputs}
+        print(f"{name:<64}{wall_ms:>10g} ms {ratio:>7.2f}x", end="")
+        if update:
+            recorded[name] = {"inputs": hashes, "budget_ratio": round(ratio * (1 + fraction), 2)}
+            print(f"  budget {recorded[name]['budget_ratio']:g}x")
+            continue
+        case = recorded.get(name)
+        if case is None or case["inputs"] != hashes:
+            # The user's own config changed: nothing to hold it to yet
+            print(f"  {'new' if case is None else 'inputs changed'}, re-measured (record with --update)")
+            continue
+        print(f"  budget {case['budget_ratio']:g}x")
+        if wall_ms > case["budget_ratio"] * original_ms + slack:
+            failures.append(f"{name}: {wall_ms:g} ms, {ratio:.2f}x the original's {original_ms:g} ms, "
+                            f"over its budget of {case['budget_ratio']:g}x")
+    return failures
+
+
+def link_farm() -> List[Tuple[str, str]]:
+    """(name, target relative to the config root) of each cheatsheetSources entry."""
+    match = LINK_FARM_PATTERN.search(read_file(config_path(SOURCES_MODULE)))
+    if match is None:
+        return []
+    base = os.path.dirname(SOURCES_MODULE)
+    return [(name, os.path.normpath(os.path.join(base, path)))
+            for name, path in LINK_FARM_ENTRY_PATTERN.findall(match.group(1))]
+
+
+def _layout_outputs(root: str) -> Dict[str, object]:
+    """Every tab, and the files each host's tabs read, with `root` as the config root."""
+    with using_root(root):
+        bench._reset_caches()
+        found: Dict[str, object] = {"tabs": json.loads(tabs.produce(tabs.ALL_TABS))}
+        steps = {tab: tabs.load(tab).file_steps() for tab in tabs.ALL_TABS}
+        found["hosts"] = {host: {tab: [relative for _, relative, _ in tab_steps]
+                                 for tab, tab_steps in host_tabs.items()}
+                          for host, host_tabs in hosts.discover(steps).items()}
+    bench._reset_caches()
+    return found
+
+
+def check_layout() -> List[str]:
+    """Compare a root laid out like the cheatsheetSources linkFarm with the checkout."""
+    entries = link_farm()
+    if not entries:
+        return [f"{SOURCES_MODULE}: no cheatsheetSources linkFarm found"]
+    failures = []
+    for name, target in entries:
+        if name != target:
+            failures.append(f"{SOURCES_MODULE}: linkFarm entry {name} points at {target}, "
+                            "not at the same path in the repo")
+    expected = _layout_outputs(config_root())
+    with tempfile.TemporaryDirectory(prefix="keybinds-layout-") as root:
+        for name, target in entries:
+            link = os.path.join(root, name)
+            os.makedirs(os.path.dirname(link), exist_ok=True)
+            os.symlink(config_path(target), link)
+        actual = _layout_outputs(root)
+    for part in expected:
+        if actual[part] != expected[part]:
+            failures.append(f"linkFarm layout: {part} differ from the checkout\n    " + "\n    ".join(
+                _diff(json.dumps(expected[part]), json.dumps(actual[part]))))
+    print(f"layout: {len(entries)} linkFarm entries, {'FAILED' if failures else 'ok'}")
+    return failures
+
+
+def check_antiquotes() -> List[str]:
+    """Resolve the names of ANTIQUOTE_MODULE; the texts have to be ANTIQUOTE_TEXTS."""
+    with tempfile.TemporaryDirectory(prefix="keybinds-antiquotes-") as root:
+        path = os.path.join(root, hyprland.NIX_KEYBINDS_FILE)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as file:
+            file.write(ANTIQUOTE_MODULE)
+        with using_root(root):
+            bench._reset_caches()
+            texts = hyprland.read_nix_blocks(path)
+    bench._reset_caches()
+    failures = []
+    if texts != ANTIQUOTE_TEXTS:
+        failures.append("antiquotes: config texts differ from ANTIQUOTE_TEXTS\n    " + "\n    ".join(
+            difflib.unified_diff("\n".join(ANTIQUOTE_TEXTS).splitlines(), "\n".join(texts).splitlines(),
+                                 "expected", "actual", lineterm="")))
+    print(f"antiquotes: {len(ANTIQUOTE_TEXTS)} config texts, {'FAILED' if failures else 'ok'}")
+    return failures
+
+
+def _flat_binds(tree: Dict[str, Any], path: Tuple[str, ...] = ()) -> List[Tuple[Tuple[str, ...], Dict]]:
+    """(section path, bind) of every bind of a decoded tree, in order."""
+    found = [(path, keybind) for keybind in tree["keybinds"]]
+    for child in tree["children"]:
+        found.extend(_flat_binds(child, path + (child["name"],)))
+    return found
+
+
+def check_fixture() -> List[str]:
+    """Ingest FIXTURE; with FIXTURE_VARIABLES expanded, the Nix sources'
+    tree has to be the same."""
+    resolver = variables.Resolver()
+    for name, value in FIXTURE_VARIABLES.items():
+        resolver.define(name, value)
+    bench._reset_caches()
+    expected = [(path, {field: resolver.expand(value) if isinstance(value, str) else value
+                        for field, value in keybind.items()})
+                for path, keybind in _flat_binds(json.loads(records.dumps(hyprland.build_tree())))]
+    actual = _flat_binds(json.loads(records.dumps(ingest.load(FIXTURE))))
+    failures = []
+    if actual != expected:
+        failures.append(f"{os.path.relpath(FIXTURE, checkout_root())}: ingested binds differ from the Nix sources; "
+                        "if the config changed, record it again with `hyprctl binds -j`\n    " + "\n    ".join(
+                            _diff(json.dumps(expected), json.dumps(actual))))
+    print(f"fixture: {len(actual)} ingested binds, {'FAILED' if failures else 'ok'}")
+    return failures
+
+
+def candidates() -> Dict[str, Callable[[str], str]]:
+    """Implementation name -> function of Hyprland config text to the JSON of
+    its tree, each to equal the JSON of reference.parse_hyprland_config(text).
+
+    A faster parser is added here. "SectionCache incremental" keeps one SectionCache
+    across the fuzzed texts, so sections unchanged by an edit are reused.
+    """
+    sections = hyprland.SectionCache()
+    return {
+        "parse_hyprland_config": lambda text: records.dumps(hyprland.parse_hyprland_config(text)),
+        "iter_hyprland_json": lambda text: "".join(hyprland.iter_hyprland_json(text)),
+        "SectionCache": lambda text: records.dumps(hyprland.SectionCache().parse(text)),
+        "SectionCache incremental": lambda text: records.dumps(sections.parse(text)),
+    }
+
+
+def _bind_line(rng: random.Random) -> str:
+    mods = rng.choice(_MODS)
+    key = rng.choice(_KEYS)
+    dispatcher, params = rng.choice(_ACTIONS)
+    spacing = rng.choice([" = ", "=", "  =  ", " =\t"])
+    if rng.random() < 0.25:
+        fields = [mods, key, rng.choice(["Described action", "", "Open, then focus"]), dispatcher, params]
+        kind = rng.choice(_DESCRIBED_KINDS)
+    else:
+        fields = [mods, key, dispatcher, params]
+        kind = rng.choice(_BIND_KINDS)
+    if rng.random() < 0.1:
+        # Too few fields: not a bind
+        fields = fields[:rng.randint(1, 3)]
+    line = kind + spacing + rng.choice([", ", ",", " , "]).join(fields) + rng.choice(_COMMENTS)
+    if rng.random() < 0.15:
+        # Documented-only bind, shown but never bound
+        line = rng.choice(["#/# ", "#/#", "#/#  "]) + line
+    return line
+
+
+def _heading(rng: random.Random, depth: int) -> str:
+    name = rng.choice(["Apps", "Window management", "", "Media / Volume", "  Padded  ", "Apps", "#!x"])
+    return "#" * depth + "!" + rng.choice([" ", "", "  "]) + name
+
+
+def gen_config(rng: random.Random) -> str:
+    """Random Hyprland config text (see module docstring)."""
+    lines = []
+    depth = 0
+    for _ in range(rng.randint(0, 60)):
+        kind = rng.random()
+        if kind < 0.18:
+            # Any depth: deeper by several levels, back to the top, or the same
+            depth = rng.randint(1, max(depth + 3, 1))
+            line = _heading(rng, depth)
+        elif kind < 0.8:
+            line = _bind_line(rng)
+        else:
+            line = rng.choice(_NOISE)
+        lines.append(rng.choice(["", "", "    ", "\t"]) + line + rng.choice(["", "", " ", "\t"]))
+    return rng.choice(["\n", "\n", "\r\n"]).join(lines) + rng.choice(["", "\n"])
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    """`text` with a few lines inserted, removed, replaced or swapped."""
+    lines = text.splitlines()
+    for _ in range(rng.randint(1, 3)):
+        index = rng.randrange(len(lines) + 1)
+        kind = rng.random()
+        if kind < 0.3 or not lines:
+            lines.insert(index, _bind_line(rng) if rng.random() < 0.7 else _heading(rng, rng.randint(1, 4)))
+        elif index == len(lines):
+            continue
+        elif kind < 0.5:
+            del lines[index]
+        elif kind < 0.8:
+            lines[index] = _bind_line(rng)
+        else:
+            other = rng.randrange(len(lines))
+            lines[index], lines[other] = lines[other], lines[index]
+    return "\n".join(lines)
+
+
+def _violations(text: str, output: str) -> List[str]:
+    """Properties the reference output of `text` has to have."""
+    tree = json.loads(output)
+    found = []
+    sections = 0
+    stack = [tree]
+    while stack:
+        section = stack.pop()
+        stack.extend(section["children"])
+        sections += len(section["children"])
+        found.extend(f"[hidden] bind shown: {keybind}" for keybind in section["keybinds"]
+                     if keybind["comment"].startswith(hyprland.HIDE_COMMENT))
+    headings = sum(1 for line in text.splitlines()
+                   if line.strip().startswith("#") and hyprland.TITLE_PATTERN.match(line.strip()))
+    if sections != headings:
+        found.append(f"{sections} sections for {headings} headings")
+    return found
+
+
+def _failures(text: str, implementations: Dict[str, Callable[[str], str]]) -> List[str]:
+    """How `text` is parsed differently from the reference, or breaks its properties."""
+    expected = json.dumps(reference.parse_hyprland_config(text))
+    failures = _violations(text, expected)
+    for name, parse in implementations.items():
+        try:
+            output = parse(text)
+        except Exception as error:
+            failures.append(f"{name}: {type(error).__name__}: {error}")
+            continue
+        if output != expected:
+            failures.append(f"{name}: output differs from the reference\n    "
+                            + "\n    ".join(_diff(expected, output)))
+    return failures
+
+
+def _kitty_line(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.15:
+        return rng.choice(_KITTY_HEADINGS)
+    if kind < 0.3:
+        return rng.choice(_KITTY_NOISE)
+    action, args = rng.choice(_KITTY_ACTIONS)
+    spacing = rng.choice([" ", "  ", "\t"])
+    return spacing.join(["map", rng.choice(_KITTY_KEYS), action] + ([args] if args else [])) + rng.choice(_KITTY_COMMENTS)
+
+
+def _grab_line(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.15:
+        return rng.choice(_GRAB_HEADINGS)
+    if kind < 0.25:
+        return rng.choice(_KITTY_NOISE)
+    return f"map {rng.choice(['h', 'Escape', 'Return', 'ctrl+u', 'shift+v', 'w', 'b'])} {rng.choice(_GRAB_ACTIONS)}"
+
+
+def gen_kitty(rng: random.Random) -> str:
+    """Random kitty.nix text with an extraConfig and a grab.conf (see module docstring)."""
+    def block(lines: List[str], indent: str) -> List[str]:
+        return [indent + line + rng.choice(["", "", " "]) if line else "" for line in lines]
+    lines = ["{ pkgs, ... }:", "{", "  programs.kitty = {", "    enable = true;", '    font.name = "JetBrains Mono";']
+    if rng.random() < 0.9:
+        lines += ["    extraConfig = ''"] + block([_kitty_line(rng) for _ in range(rng.randint(0, 30))], "      ")
+        lines.append("    '';")
+    lines.append("  };")
+    if rng.random() < 0.8:
+        lines.append('  home.file.".config/kitty/grab.conf".text = \'\'')
+        lines += block([_grab_line(rng) for _ in range(rng.randint(0, 20))], rng.choice(["    ", ""]))
+        lines.append("  '';")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def gen_aliases(rng: random.Random) -> str:
+    """Random Nix module text with flat shellAliases sets (see module docstring)."""
+    lines = ["{ config, pkgs, ... }:", "{"]
+    for _ in range(rng.randint(0, 4)):
+        if rng.random() < 0.3:
+            lines.append("  " + rng.choice(_ALIAS_NOISE))
+            continue
+        entries = []
+        for _ in range(rng.randint(0, 8)):
+            if rng.random() < 0.1:
+                entries.append("# " + rng.choice(["Navigation", "git", "Nix"]))
+                continue
+            spacing = rng.choice([" = ", "=", "  =  "])
+            entries.append(f'{rng.choice(_ALIAS_NAMES)}{spacing}"{rng.choice(_ALIAS_COMMANDS)}"{rng.choice([";", " ;"])}')
+        if rng.random() < 0.3:
+            # The set inside programs.zsh = { ... }
+            lines += ["  programs.zsh = {", "    enable = true;", "    shellAliases = {"]
+            lines += ["      " + entry for entry in entries] + ["    };", "  };"]
+        else:
+            lines.append(f"  {rng.choice(_ALIAS_PATHS)} = {{")
+            lines += ["    " + entry for entry in entries] + ["  };"]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _compare(name: str, expected: object, run: Callable[[], object]) -> List[str]:
+    """A failure if `run` raises or returns something else than `expected`."""
+    try:
+        actual = run()
+    except Exception as error:
+        return [f"{name}: {type(error).__name__}: {error}"]
+    expected_json, actual_json = json.dumps(expected), json.dumps(actual)
+    if actual_json != expected_json:
+        return [f"{name}: output differs from the reference\n    " + "\n    ".join(_diff(expected_json, actual_json))]
+    return []
+
+
+def _kitty_dicts(keybinds: List[records.TerminalKeyBinding]) -> List[Dict[str, Any]]:
+    """Kitty keybind records as the reference parsers return them."""
+    return [{"mods": list(keybind.mods), "key": keybind.key, "action": keybind.action,
+             "comment": keybind.comment, "section": keybind.section} for keybind in keybinds]
+
+
+def _kitty_failures(text: str) -> List[str]:
+    return (_compare("parse_kitty_keybinds", reference.parse_kitty_keybinds(text),
+                     lambda: _kitty_dicts(terminal.parse_kitty_keybinds(text)))
+            + _compare("parse_kitty_grab_keybinds", reference.parse_kitty_grab_keybinds(text),
+                       lambda: _kitty_dicts(terminal.parse_kitty_grab_keybinds(text))))
+
+
+def _first_aliases(aliases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The first alias of each name, the ones the terminal tab lists."""
+    seen = set()
+    found = []
+    for alias in aliases:
+        if alias["name"] not in seen:
+            seen.add(alias["name"])
+            found.append(alias)
+    return found
+
+
+def _alias_failures(text: str) -> List[str]:
+    return _compare("parse_shell_aliases", _first_aliases(reference.parse_shell_aliases(text, "ZSH")),
+                    lambda: _first_aliases(terminal.parse_shell_aliases(text, "ZSH")))
+
+
+# Fuzzed input -> (text generator, text mutator or None)
+FUZZ_INPUTS: Dict[str, Tuple[Callable[[random.Random], str], Optional[Callable[[str, random.Random], str]]]] = {
+    "hyprland": (gen_config, mutate),
+    "kitty": (gen_kitty, None),
+    "aliases": (gen_aliases, None),
+}
+
+
+def checks() -> Dict[str, Callable[[str], List[str]]]:
+    """Fuzzed input -> function of a generated text to its failures, with
+    fresh incremental parser state."""
+    implementations = candidates()
+    return {
+        "hyprland": lambda text: _failures(text, implementations),
+        "kitty": _kitty_failures,
+        "aliases": _alias_failures,
+    }
+
+
+def reduce(text: str, fails: Callable[[str], bool]) -> str:
+    """A subset of the lines of `text` on which `fails` still holds, with no
+    single line removable."""
+    lines = text.splitlines()
+    index = 0
+    while index < len(lines):
+        candidate = lines[:index] + lines[index + 1:]
+        if fails("\n".join(candidate)):
+            lines = candidate
+        else:
+            index += 1
+    return "\n".join(lines)
+
+
+def fuzz(iterations: int, seed: int) -> List[str]:
+    """Diff the current parsers against the reference on `iterations`
+    generated texts of each FUZZ_INPUTS kind."""
+    found = checks()
+    for kind, (generate, edit) in FUZZ_INPUTS.items():
+        rng = random.Random(seed)
+        text = ""
+        for iteration in range(iterations):
+            text = edit(text, rng) if edit and text and rng.random() < 0.4 else generate(rng)
+            failures = found[kind](text)
+            if failures:
+                # Reduced with fresh parser state; a difference that needs the
+                # incremental state of earlier texts is reported unreduced
+                reduced = reduce(text, lambda other: bool(checks()[kind](other)))
+                reduced_failures = checks()[kind](reduced)
+                if reduced_failures:
+                    failures, text = reduced_failures, reduced
+                return [f"{kind}, seed {seed}, iteration {iteration}: " + failure for failure in failures] + [
+                    "input:\n    " + "\n    ".join(repr(line) for line in text.splitlines())]
+    return []
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Check the keybind parsers against the original ones, '
+                                                 'their latency budgets and fuzzed input')
+    parser.add_argument('--parser', action='append', choices=PARSERS,
+                        help='parser to time against its budget (repeatable; default: all, '
+                             'and the tabs and linkFarm layout are checked as well)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per budget case (default: %(default)s)')
+    parser.add_argument('--path', type=str, default=None,
+                        help='config root to read (default: the checkout of these scripts)')
+    parser.add_argument('--golden', type=str, default=GOLDEN_FILE, help='golden file (default: %(default)s)')
+    parser.add_argument('--update', action='store_true',
+                        help='record the budget ratios anew (the reviewed deltas are kept as they are)')
+    parser.add_argument('--fuzz', type=int, default=300, metavar='N',
+                        help='fuzzed inputs of each kind to diff the parsers on (default: %(default)s; 0: none)')
+    parser.add_argument('--seed', type=int, default=0, help='fuzzing seed (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    root = resolve_root(args.path) if args.path is not None else checkout_root()
+    if root is None:
+        print(f"[keybinds.golden] --path {args.path}: not a config root", file=sys.stderr)
+        return 1
+    set_config_root(root)
+
+    golden = load_golden(args.golden)
+    if args.update:
+        golden = {"version": GOLDEN_VERSION, "deltas": golden.get("deltas", {}), "cases": golden.get("cases", {})}
+    elif not golden:
+        print(f"No golden file of version {GOLDEN_VERSION} at {args.golden}", file=sys.stderr)
+        return 1
+
+    failures = []
+    if not args.parser:
+        failures.extend(check_deltas(golden))
+    failures.extend(check_budgets(cases(args.parser or PARSERS), golden, args.repeat, args.update))
+
+    if args.update:
+        with open(args.golden, "w") as file:
+            json.dump(golden, file, indent=1, ensure_ascii=False)
+            file.write("\n")
+        print(f"Budgets written to {args.golden}", file=sys.stderr)
+
+    if not args.parser:
+        failures.extend(check_antiquotes())
+        if root == checkout_root():
+            failures.extend(check_fixture())
+        failures.extend(check_layout())
+
+    if args.fuzz > 0:
+        fuzz_failures = fuzz(args.fuzz, args.seed)
+        print(f"fuzz: {args.fuzz} inputs each of {', '.join(FUZZ_INPUTS)}, {len(candidates())} Hyprland candidates, "
+              f"{'FAILED' if fuzz_failures else 'ok'}")
+        failures.extend(fuzz_failures)
+
+    if failures:
+        print("\nGOLDEN MISMATCH", file=sys.stderr)
+        for line in failures:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
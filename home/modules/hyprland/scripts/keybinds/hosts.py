@@ -0,0 +1,226 @@
+"""
+One cheatsheet per host (get_all_keybinds.py --hosts DIR).
+
+Not every machine imports every module: GNOME hosts get home/minimal.nix
+(no Hyprland, no kitty) instead of home/base.nix, gaming hosts add
+home/gaming.nix, and headless hosts have no home-manager at all. This
+mirrors lib/host-builders.nix to find each host's effective sources:
+
+    hosts/<host>/meta.nix      usesGnome, isGaming, isHeadless
+    entry points               hosts/<host> (and the profiles/ it imports),
+                               plus the host's home configs
+    reachable files            the `imports` lists and `import <path>`
+                               expressions, followed recursively (a
+                               directory is its default.nix)
+
+A tab is in a host's cheatsheet if one of its source files is reachable.
+Every reachable source file is parsed once, however many hosts share it,
+on a process pool; the results are put into the tab modules' memos and
+each host's trees are built from them. DIR/<host>.json is what
+get_all_keybinds.py prints for that host (with --format, in that format).
+"""
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from keybinds import nixlex, profiling, tabs
+from keybinds.common import config_path, config_root, read_file
+
+HOSTS_DIR = "hosts"
+HOME_DIR = "home"
+META_FILE = "meta.nix"
+
+# (memo step, source file relative to the config root, parse function) of
+# one tab (its file_steps())
+Step = Tuple[str, str, Callable[[str], Any]]
+
+
+def host_names() -> List[str]:
+    """Hosts with a NixOS module (hosts/<host>/default.nix), sorted."""
+    directory = config_path(HOSTS_DIR)
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(name for name in names if os.path.isfile(os.path.join(directory, name, "default.nix")))
+
+
+def host_meta(host: str) -> Dict[str, Any]:
+    """The literal top-level values of hosts/<host>/meta.nix ({} if it has none)."""
+    try:
+        found = nixlex.bindings(read_file(config_path(os.path.join(HOSTS_DIR, host, META_FILE))))
+    except nixlex.NixLexError:
+        return {}
+    return {binding.path[0]: binding.value for binding in found if len(binding.path) == 1}
+
+
+def entry_points(host: str, meta: Dict[str, Any]) -> List[str]:
+    """Files relative to the config root a host's configuration starts from
+    (mkNixosConfiguration / mkHeadlessConfiguration in lib/host-builders.nix)."""
+    entries = [os.path.join(HOSTS_DIR, host, "default.nix")]
+    if meta.get("isHeadless"):
+        return entries
+    entries.append(os.path.join(HOME_DIR, "minimal.nix" if meta.get("usesGnome") else "base.nix"))
+    if meta.get("isGaming"):
+        entries.append(os.path.join(HOME_DIR, "gaming.nix"))
+    return entries
+
+
+def _import_paths(value: Any) -> List[str]:
+    """Path literals in the value of an `imports` binding.
+
+    Paths with antiquotations (../../users/${username}/...) depend on
+    arguments and are skipped.
+    """
+    if isinstance(value, nixlex.Opaque):
+        texts = [value.text]
+    elif isinstance(value, list):
+        texts = [item.text for item in value if isinstance(item, nixlex.Opaque)]
+    else:
+        return []
+    paths = []
+    for text in texts:
+        tokens = list(nixlex.tokenize(text))
+        for index, token in enumerate(tokens):
+            if token.kind != "path":
+                continue
+            joined = (index > 0 and tokens[index - 1].end == token.start
+                      or index + 1 < len(tokens) and tokens[index + 1].start == token.end)
+            if not joined:
+                paths.append(token.value)
+    return paths
+
+
+def _import_expressions(text: str) -> List[str]:
+    """Path literals after `import` anywhere in `text` (e.g. a shared alias
+    set: `sharedAliases = import ../shell-aliases.nix { ... };`)."""
+    tokens = list(nixlex.tokenize(text))
+    return [following.value for token, following in zip(tokens, tokens[1:])
+            if token.kind == "id" and token.value == "import" and following.kind == "path"
+            and "${" not in text[following.end:following.end + 2]]
+
+
+def _imports(relative: str) -> List[str]:
+    """Files (relative to the config root) imported by one Nix file."""
+    root = config_root()
+    path = config_path(relative)
+    text = read_file(path)
+    if "import" not in text:
+        # Most modules import nothing; skip lexing them
+        return []
+    try:
+        literals = _import_expressions(text)
+        for binding in nixlex.bindings(text):
+            if binding.path[-1:] == ("imports",):
+                literals.extend(_import_paths(binding.value))
+    except nixlex.NixLexError as error:
+        print(f"[keybinds.hosts] {path}: {error}", file=sys.stderr)
+        return []
+    files = []
+    for literal in literals:
+        target = os.path.normpath(os.path.join(os.path.dirname(path), literal))
+        if os.path.isdir(target):
+            target = os.path.join(target, "default.nix")
+        target = os.path.relpath(target, root)
+        if os.path.isfile(config_path(target)) and not target.startswith(os.pardir) and target not in files:
+            files.append(target)
+    return files
+
+
+def reachable(entries: List[str], known: Optional[Dict[str, List[str]]] = None) -> Set[str]:
+    """Every file reachable from `entries` through imports; `known` keeps the
+    imports of files already read, across hosts."""
+    known = {} if known is None else known
+    seen: Set[str] = set()
+    stack = [entry for entry in entries if os.path.isfile(config_path(entry))]
+    while stack:
+        relative = stack.pop()
+        if relative in seen:
+            continue
+        seen.add(relative)
+        if relative not in known:
+            known[relative] = _imports(relative)
+        stack.extend(known[relative])
+    return seen
+
+
+def discover(steps: Dict[str, List[Step]]) -> Dict[str, Dict[str, List[Step]]]:
+    """host -> tab -> the tab's `steps` whose source file the host reaches.
+
+    Tabs a host reaches none of the sources of are left out, as are hosts
+    without any tab.
+    """
+    known: Dict[str, List[str]] = {}
+    found: Dict[str, Dict[str, List[Step]]] = {}
+    for host in host_names():
+        files = reachable(entry_points(host, host_meta(host)), known)
+        host_tabs = {tab: [step for step in tab_steps if step[1] in files] for tab, tab_steps in steps.items()}
+        host_tabs = {tab: tab_steps for tab, tab_steps in host_tabs.items() if tab_steps}
+        if host_tabs:
+            found[host] = host_tabs
+        else:
+            print(f"[keybinds.hosts] {host}: no cheatsheet sources (headless?)", file=sys.stderr)
+    return found
+
+
+def _parse(job: Tuple[str, Callable[[str], Any]]) -> Any:
+    """Run one parse step in a worker process."""
+    relative, parse = job
+    return parse(config_path(relative))
+
+
+def parse_all(jobs: List[Tuple[str, Step]], workers: Optional[int] = None) -> None:
+    """Parse every (tab, step) job once and put the results into the tab
+    modules' memos, so build_tree() uses them."""
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    work = [(relative, parse) for _, (_, relative, parse) in jobs]
+    with profiling.stage("hosts.parse"):
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            # Workers are forked after the root is selected, so they read the same checkout
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_parse, work))
+        else:
+            results = [_parse(job) for job in work]
+    for (tab, (step, relative, _)), value in zip(jobs, results):
+        tabs.load(tab)._memo.put(step, config_path(relative), value)
+
+
+def write(directory: str, selected: List[str], fmt: str = "tree", workers: Optional[int] = None) -> List[str]:
+    """Write DIR/<host>.json for every host; returns the files written."""
+    steps = {tab: tabs.load(tab).file_steps() for tab in selected}
+    with profiling.stage("hosts.discover"):
+        found = discover(steps)
+    jobs: List[Tuple[str, Step]] = []
+    for host_tabs in found.values():
+        for tab, tab_steps in host_tabs.items():
+            for step in tab_steps:
+                if (tab, step) not in jobs:
+                    jobs.append((tab, step))
+    if jobs:
+        parse_all(jobs, workers)
+    if profiling.ENABLED:
+        profiling.count("hosts", len(found))
+        profiling.count("hosts.jobs", len(jobs))
+
+    os.makedirs(directory, exist_ok=True)
+    # Hosts with the same sources for a tab share its encoded tree
+    encoded: Dict[Tuple[str, Tuple[Step, ...]], str] = {}
+    written = []
+    for host, host_tabs in found.items():
+        parts = {}
+        for tab, tab_steps in host_tabs.items():
+            key = (tab, tuple(tab_steps))
+            if key not in encoded:
+                module = tabs.load(tab)
+                if len(tab_steps) == len(steps[tab]):
+                    tree = module.build_tree()
+                else:
+                    tree = module.build_tree([relative for _, relative, _ in tab_steps])
+                encoded[key] = tabs.encode(tree, fmt)
+            parts[tab] = encoded[key]
+        path = os.path.join(directory, f"{host}.json")
+        with open(path, "w") as file:
+            file.write(tabs.combine(parts) + "\n")
+        written.append(path)
+    return written
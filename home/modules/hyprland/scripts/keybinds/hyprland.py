@@ -0,0 +1,608 @@
+"""
+Hyprland keybind parser for Nix-generated configurations.
+Reads keybinds from the hyprland/*.nix modules for the quickshell cheatsheet:
+the extraConfig of keybinds.nix, and the bind lists
+(wayland.windowManager.hyprland.settings.bind, bindm, binde, bindl, ...) and
+extraConfig of every other module, merged into one tree.
+Used by get_keybinds.py and get_all_keybinds.py.
+"""
+import hashlib
+import os
+import re
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Tuple
+
+from keybinds.cache import FileMemo
+from keybinds import nixlex, profiling, variables
+from keybinds.common import config_path, read_file
+from keybinds.records import (KeyBinding, Section, encode_record, iter_bindings, iterencode,
+                              mods as shared_mods)
+
+TITLE_REGEX = "#+!"
+TITLE_PATTERN = re.compile(TITLE_REGEX)
+HIDE_COMMENT = "[hidden]"
+MOD_SEPARATORS = ['+', ' ']
+COMMENT_BIND_PATTERN = "#/#"
+
+# The Nix source files, relative to the config root (--path selects another
+# checkout): keybinds.nix first, then every other module in its directory
+NIX_KEYBINDS_FILE = "home/modules/hyprland/keybinds.nix"
+NIX_HYPRLAND_DIR = os.path.dirname(NIX_KEYBINDS_FILE)
+
+# Attribute path of the Hyprland settings, whose bind* lists hold binds
+SETTINGS_PATH = ("wayland", "windowManager", "hyprland", "settings")
+BIND_KEYWORD_PATTERN = re.compile(r"bind[a-z]*")
+# A module without a bind list setting or extraConfig is not lexed at all
+# (the `binds = { ... }` settings category is not a bind list)
+BIND_LIST_PATTERN = re.compile(r"\bbind[a-z]*\s*=\s*\[")
+# ##! headings among the Nix comments of a bind list
+HEADING_LINE_PATTERN = re.compile(r"^[ \t]*(#+!.*?)[ \t]*$", re.MULTILINE)
+
+TAB = "hyprland"
+
+# Parse results reused across rebuilds in daemon/watch mode, revalidated with
+# the files their variables come from (_dependencies() is defined below)
+_memo = FileMemo(depends=lambda path: _dependencies(path))
+# Hyprland variables defined by each module (see module_resolver())
+_definitions = FileMemo()
+
+
+def _settings_lines(keyword: str, source: str) -> List[str]:
+    """Config lines of one settings bind list, whose Nix source is `source`.
+
+    Each string becomes a `<keyword> = <entry>` line, as home-manager writes
+    it to hyprland.conf, and the ##! headings among the list's comments are
+    kept in place, so the entries get the same sections as extraConfig lines.
+    """
+    items = [(token.start, f"{keyword} = {' '.join(token.value.split())}")
+             for token in nixlex.tokenize(source, marked=True) if token.kind in ("str", "istr")]
+    items.extend((match.start(), match.group(1)) for match in HEADING_LINE_PATTERN.finditer(source))
+    return [line for _, line in sorted(items)]
+
+
+@profiling.timed("hyprland.extract")
+def read_nix_blocks(path: str) -> List[str]:
+    """The Hyprland config texts a Nix module contributes, in one pass over it.
+
+    Each settings bind list is one text (home-manager writes settings before
+    extraConfig, so they come first), and the module's extraConfig blocks,
+    joined, are the last. Headings do not carry over from one text to the
+    next. A module with neither, or that does not lex, has none.
+
+    Nix names and Hyprland variables the module defines or imports are
+    expanded (see keybinds.variables), so bind params and comments show
+    their values; an escaped antiquote (''${name}) is kept as written.
+    """
+    content = read_file(path)
+    if "extraConfig" not in content and not BIND_LIST_PATTERN.search(content):
+        return []
+
+    try:
+        found = nixlex.bindings(content, marked=True)
+    except nixlex.NixLexError:
+        return []
+    texts: List[str] = []
+    extra: List[str] = []
+    for binding in found:
+        if binding.path[-1:] == ("extraConfig",) and isinstance(binding.value, str):
+            extra.append(binding.value)
+        elif binding.path[-5:-1] == SETTINGS_PATH and BIND_KEYWORD_PATTERN.fullmatch(binding.path[-1]):
+            texts.append("\n".join(_settings_lines(binding.path[-1], content[binding.start:binding.end])))
+    if extra:
+        texts.append("\n".join(extra))
+
+    with profiling.stage("hyprland.resolve"):
+        resolver = module_resolver(path)
+        return [nixlex.unmark(resolver.expand(text)) for text in texts]
+
+
+def _read_definitions(path: str) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """The Hyprland variables a module defines: its "$name" settings and the
+    `$name = value` lines of its extraConfig, with its Nix names expanded."""
+    content = read_file(path)
+    if "$" not in content:
+        return [], []
+    try:
+        found = nixlex.bindings(content, marked=True)
+    except nixlex.NixLexError:
+        return [], []
+    settings: List[Tuple[str, str]] = []
+    extra: List[Tuple[str, str]] = []
+    for binding in found:
+        if not isinstance(binding.value, str):
+            continue
+        if binding.path[-5:-1] == SETTINGS_PATH and binding.path[-1].startswith("$"):
+            settings.append((binding.path[-1][1:], binding.value))
+        elif binding.path[-1:] == ("extraConfig",):
+            extra.extend(variables.definitions(binding.value))
+    if settings or extra:
+        scope = variables.module_resolver(path)
+        settings = [(name, scope.expand(value)) for name, value in settings]
+        extra = [(name, scope.expand(value)) for name, value in extra]
+    return settings, extra
+
+
+def _defining_modules(path: str) -> List[str]:
+    """Modules whose Hyprland variables the binds of module `path` can use:
+    all of them (hyprland.conf is one file), and `path` itself."""
+    paths = [config_path(relative) for relative in module_files()]
+    return paths if path in paths else paths + [path]
+
+
+def module_resolver(path: str) -> variables.Resolver:
+    """The symbol table of the binds of module `path`: its own Nix names, and
+    the Hyprland variables of every module, in hyprland.conf order (all
+    settings variables first, as home-manager writes them, then extraConfig)."""
+    resolver = variables.module_resolver(path)
+    found = [_definitions.get("definitions", module, _read_definitions) for module in _defining_modules(path)]
+    for settings, _ in found:
+        for name, value in settings:
+            resolver.define(name, value)
+    for _, extra in found:
+        for name, value in extra:
+            resolver.define(name, value)
+    return resolver
+
+
+def _dependencies(path: str) -> List[str]:
+    """Files besides `path` its parse result is read from: the variables files
+    it imports and the other modules that define Hyprland variables."""
+    files = variables.variable_files(path)
+    for module in _defining_modules(path):
+        if module != path and any(_definitions.get("definitions", module, _read_definitions)):
+            files.append(module)
+    return files
+
+
+@profiling.timed("hyprland.autogenerate_comment")
+def autogenerate_comment(dispatcher: str, params: str = "") -> str:
+    match dispatcher:
+        case "resizewindow":
+            return "Resize window"
+
+        case "movewindow":
+            if params == "":
+                return "Move window"
+            else:
+                return "Window: move in {} direction".format({
+                    "l": "left",
+                    "r": "right",
+                    "u": "up",
+                    "d": "down",
+                }.get(params, "null"))
+
+        case "pin":
+            return "Window: pin (show on all workspaces)"
+
+        case "splitratio":
+            return "Window split ratio {}".format(params)
+
+        case "togglefloating":
+            return "Float/unfloat window"
+
+        case "resizeactive":
+            return "Resize window by {}".format(params)
+
+        case "killactive":
+            return "Close window"
+
+        case "fullscreen":
+            return "Toggle {}".format(
+                {
+                    "0": "fullscreen",
+                    "1": "maximization",
+                    "2": "fullscreen on Hyprland's side",
+                }.get(params, "null")
+            )
+
+        case "fakefullscreen":
+            return "Toggle fake fullscreen"
+
+        case "workspace":
+            if params == "+1":
+                return "Workspace: focus right"
+            elif params == "-1":
+                return "Workspace: focus left"
+            return "Focus workspace {}".format(params)
+
+        case "movefocus":
+            return "Window: move focus {}".format(
+                {
+                    "l": "left",
+                    "r": "right",
+                    "u": "up",
+                    "d": "down",
+                }.get(params, "null")
+            )
+
+        case "swapwindow":
+            return "Window: swap in {} direction".format(
+                {
+                    "l": "left",
+                    "r": "right",
+                    "u": "up",
+                    "d": "down",
+                }.get(params, "null")
+            )
+
+        case "movetoworkspace":
+            if params == "+1":
+                return "Window: move to right workspace (non-silent)"
+            elif params == "-1":
+                return "Window: move to left workspace (non-silent)"
+            return "Window: move to workspace {} (non-silent)".format(params)
+
+        case "movetoworkspacesilent":
+            if params == "+1":
+                return "Window: move to right workspace"
+            elif params == "-1":
+                return "Window: move to right workspace"
+            return "Window: move to workspace {}".format(params)
+
+        case "togglespecialworkspace":
+            return "Workspace: toggle special"
+
+        case "exec":
+            return "Execute: {}".format(params)
+
+        case _:
+            return ""
+
+
+def parse_bind_line(line: str, keep_hidden: bool = False) -> Optional[KeyBinding]:
+    """Parse one `bind... = mods, key, dispatcher, params # comment` line.
+
+    Returns None for lines that are not binds or are marked [hidden]; with
+    `keep_hidden`, hidden binds are returned with their comment, which
+    starts with HIDE_COMMENT (see keybinds.ingest).
+    """
+    line = line.strip()
+
+    # Handle the line starting after any comment pattern prefix
+    if line.startswith(COMMENT_BIND_PATTERN):
+        line = line[len(COMMENT_BIND_PATTERN):].lstrip()
+
+    # Split on first = to separate bind type from the rest
+    if '=' not in line:
+        return None
+    bind_type, keys = line.split("=", 1)
+    bind_type = bind_type.strip()
+    keys, *comment = keys.split("#", 1)
+
+    # Bind types with 'd' have an extra description field: bindd/bindld/bindde = Mods, Key, Description, Dispatcher, Params
+    # Regular bind types: bind/bindl/binde/bindm/bindr/bindn/bindp = Mods, Key, Dispatcher, Params
+    # The 'd' can appear anywhere after 'bind', e.g.: bindd, bindld, binddle, bindrde
+    is_bindd = 'd' in bind_type[4:] if len(bind_type) > 4 else False
+
+    if is_bindd:
+        parts = list(map(str.strip, keys.split(",", 5)))
+        if len(parts) < 4:
+            return None
+        mods, key, description, dispatcher, *params = parts
+        params = ", ".join(map(str.strip, params))
+    else:
+        parts = list(map(str.strip, keys.split(",", 4)))
+        if len(parts) < 3:
+            return None
+        mods, key, dispatcher, *params = parts
+        params = ", ".join(map(str.strip, params))
+        description = ""
+
+    # Remove empty spaces from comment
+    comment = list(map(str.strip, comment))
+    # Add comment if it exists, else use description or generate it
+    if comment:
+        comment = comment[0]
+        if comment.startswith(HIDE_COMMENT) and not keep_hidden:
+            if profiling.ENABLED:
+                profiling.count("hyprland.binds_hidden")
+            return None
+    elif description:
+        comment = description
+    else:
+        comment = autogenerate_comment(dispatcher, params)
+
+    if mods:
+        modstring = mods + MOD_SEPARATORS[0]  # Add separator at end to ensure last mod is read
+        mod_names = []
+        p = 0
+        for index, char in enumerate(modstring):
+            if char in MOD_SEPARATORS:
+                if index - p > 1:
+                    mod_names.append(modstring[p:index])
+                p = index + 1
+        mods = shared_mods(mod_names)
+    else:
+        mods = shared_mods(())
+
+    return KeyBinding(mods, key, dispatcher, params, comment)
+
+
+# Events of iter_hyprland_events()
+OPEN_SECTION = "open"
+KEYBIND = "bind"
+COMMENT_KEYBIND = "comment bind"
+CLOSE_SECTION = "close"
+
+
+def iter_hyprland_events(text: str, keep_hidden: bool = False) -> Iterator[tuple]:
+    """Parse Hyprland config text into a flat stream of section events.
+
+    Yields (OPEN_SECTION, name), (KEYBIND, KeyBinding) and (CLOSE_SECTION,)
+    in file order. `##! Name` headings open a section; the number of `#` is
+    its depth, and a heading at the same or a shallower depth closes the open
+    sections first. Open depths are kept on an explicit stack, so nesting is
+    unbounded and nothing is held between calls. Every section opened is
+    closed before the stream ends.
+
+    With `keep_hidden` (keybinds.ingest), binds marked [hidden] are yielded
+    too, and comment binds (#/#, which Hyprland never sees) are yielded as
+    (COMMENT_KEYBIND, KeyBinding).
+    """
+    # Heading depth of every open section, innermost last; 0 is the root
+    depths = [0]
+    lines = text.splitlines()
+    binds = 0
+
+    for line in lines:
+        stripped_line = line.strip()
+
+        # Only comment lines can be headings; skip the regex for the rest
+        if stripped_line.startswith("#") and TITLE_PATTERN.match(stripped_line):
+            # Determine scope - count # before !
+            heading_scope = stripped_line.find('!')
+            # Lower or equal scope? Close sections back to the parent
+            while depths[-1] >= heading_scope:
+                depths.pop()
+                yield (CLOSE_SECTION,)
+            depths.append(heading_scope)
+            yield (OPEN_SECTION, stripped_line[(heading_scope + 1):].strip())
+
+        elif stripped_line.startswith(COMMENT_BIND_PATTERN):
+            keybind = parse_bind_line(stripped_line)
+            if keybind is not None:
+                binds += 1
+                yield (COMMENT_KEYBIND if keep_hidden else KEYBIND, keybind)
+
+        elif stripped_line.startswith("bind"):
+            keybind = parse_bind_line(stripped_line, keep_hidden)
+            if keybind is not None:
+                binds += 1
+                yield (KEYBIND, keybind)
+
+    for _ in depths[1:]:
+        yield (CLOSE_SECTION,)
+
+    if profiling.ENABLED:
+        profiling.count("hyprland.lines", len(lines))
+        # One TITLE_PATTERN match per comment line
+        profiling.count("hyprland.regex_calls", sum(1 for line in lines if line.lstrip().startswith("#")))
+        profiling.count("hyprland.binds", binds)
+
+
+def parse_hyprland_config(text: str) -> Section:
+    """Parse Hyprland config text into a tree of sections."""
+    root = Section([], [], "")
+    stack = [root]
+    for event in iter_hyprland_events(text):
+        if event[0] == KEYBIND:
+            stack[-1].keybinds.append(event[1])
+        elif event[0] == OPEN_SECTION:
+            section = Section([], [], event[1])
+            stack[-1].children.append(section)
+            stack.append(section)
+        else:
+            stack.pop()
+    return root
+
+
+def _split_sections(text: str) -> Iterator[Tuple[Optional[str], List[str]]]:
+    """(heading line, body lines) of every ##! section of `text`, in file order.
+
+    The lines before the first heading come first, with heading None.
+    """
+    heading = None
+    body: List[str] = []
+    for line in text.splitlines():
+        stripped_line = line.strip()
+        if stripped_line.startswith("#") and TITLE_PATTERN.match(stripped_line):
+            yield heading, body
+            heading, body = stripped_line, []
+        else:
+            body.append(stripped_line)
+    yield heading, body
+
+
+def _parse_section_body(lines: List[str]) -> List[KeyBinding]:
+    keybinds = []
+    for line in lines:
+        if line.startswith(COMMENT_BIND_PATTERN) or line.startswith("bind"):
+            keybind = parse_bind_line(line)
+            if keybind is not None:
+                keybinds.append(keybind)
+    return keybinds
+
+
+class SectionCache:
+    """Incremental parsing: the binds of each ##! section body, by content hash.
+
+    parse() builds the same tree as parse_hyprland_config(), but a section
+    whose text is unchanged since the previous call reuses its parsed
+    KeyBindings (the same objects, so keybinds.diff skips them cheaply).
+    Only the hashes of the latest text of each `source` (file) are kept.
+    """
+
+    def __init__(self) -> None:
+        self._keybinds: Dict[str, Dict[bytes, List[KeyBinding]]] = {}
+
+    def clear(self) -> None:
+        self._keybinds = {}
+
+    def parse(self, text: str, source: str = "") -> Section:
+        root = Section([], [], "")
+        stack = [root]
+        depths = [0]
+        previous = self._keybinds.get(source, {})
+        current: Dict[bytes, List[KeyBinding]] = {}
+        reparsed = 0
+        for heading, body in _split_sections(text):
+            if heading is not None:
+                heading_scope = heading.find('!')
+                while depths[-1] >= heading_scope:
+                    depths.pop()
+                    stack.pop()
+                section = Section([], [], heading[(heading_scope + 1):].strip())
+                stack[-1].children.append(section)
+                stack.append(section)
+                depths.append(heading_scope)
+
+            digest = hashlib.blake2b("\n".join(body).encode(), digest_size=16).digest()
+            keybinds = current.get(digest)
+            if keybinds is None:
+                keybinds = previous.get(digest)
+                if keybinds is None:
+                    keybinds = _parse_section_body(body)
+                    reparsed += 1
+                current[digest] = keybinds
+            stack[-1].keybinds.extend(keybinds)
+        self._keybinds[source] = current
+        if profiling.ENABLED:
+            profiling.count("hyprland.sections_reparsed", reparsed)
+        return root
+
+
+# Per-section results a changed file is re-parsed with (see build_tree())
+_sections = SectionCache()
+
+
+def _close_section(keybinds: List[str], name: str) -> str:
+    return '], "keybinds": [' + ", ".join(keybinds) + '], "name": ' + encode_basestring_ascii(name) + "}"
+
+
+def iter_hyprland_json(text: str) -> Iterator[str]:
+    """Encode the tree of `text` like records.dumps(parse_hyprland_config(text)), incrementally.
+
+    A section's children come before its keybinds in the output, so only the
+    encoded keybinds of the sections still open are buffered; everything
+    else is yielded as soon as it is parsed.
+    """
+    # Per open section: encoded keybinds, name, whether a child was written
+    keybinds: List[List[str]] = [[]]
+    names = [""]
+    has_children = [False]
+
+    yield '{"children": ['
+    for event in iter_hyprland_events(text):
+        if event[0] == KEYBIND:
+            keybinds[-1].append(encode_record(event[1]))
+        elif event[0] == OPEN_SECTION:
+            yield (", " if has_children[-1] else "") + '{"children": ['
+            has_children[-1] = True
+            keybinds.append([])
+            names.append(event[1])
+            has_children.append(False)
+        else:
+            has_children.pop()
+            yield _close_section(keybinds.pop(), names.pop())
+    yield _close_section(keybinds[0], names[0])
+
+
+@profiling.timed("hyprland.parse")
+def parse_keys(path: str) -> Section:
+    return merge_trees([parse_hyprland_config(text) for text in read_nix_blocks(path)])
+
+
+@profiling.timed("hyprland.reparse")
+def reparse_keys(path: str) -> Section:
+    """parse_keys(), re-parsing only the sections changed since the last call."""
+    return merge_trees([_sections.parse(text, f"{path}#{index}")
+                        for index, text in enumerate(read_nix_blocks(path))])
+
+
+def merge_trees(trees: List[Section]) -> Section:
+    """One tree of the binds of several modules.
+
+    Sections are indexed by their path of names, so a `##! Apps` section in
+    two modules is one section, placed where it first appears; binds keep
+    module order. Unnamed sections (a bare `#!`) are looked through, so a
+    module's `##! Apps` also finds the Apps under keybinds.nix's `#!`. A
+    single non-empty tree is returned as is.
+    """
+    trees = [tree for tree in trees if tree.children or tree.keybinds]
+    if len(trees) <= 1:
+        return trees[0] if trees else Section([], [], "")
+    root = Section([], [], "")
+    # Full name path -> section, and for named sections also the path
+    # without unnamed levels
+    index: Dict[Tuple[str, ...], Section] = {(): root}
+    # Explicit stack of (merged section, section to merge into it, full path)
+    stack = [(root, tree, ()) for tree in reversed(trees)]
+    while stack:
+        target, source, path = stack.pop()
+        target.keybinds.extend(source.keybinds)
+        pending = []
+        for child in source.children:
+            child_path = path + (child.name,)
+            named_path = tuple(name for name in child_path if name)
+            merged = index.get(child_path)
+            if merged is None and child.name:
+                merged = index.get(named_path)
+            if merged is None:
+                merged = Section([], [], child.name)
+                target.children.append(merged)
+            index.setdefault(child_path, merged)
+            if child.name:
+                index.setdefault(named_path, merged)
+            pending.append((merged, child, child_path))
+        stack.extend(reversed(pending))
+    return root
+
+
+def module_files() -> List[str]:
+    """keybinds.nix, then the other modules in its directory (sorted), relative
+    to the config root."""
+    try:
+        names = os.listdir(config_path(NIX_HYPRLAND_DIR))
+    except OSError:
+        names = []
+    others = sorted(os.path.join(NIX_HYPRLAND_DIR, name) for name in names if name.endswith(".nix"))
+    return [NIX_KEYBINDS_FILE] + [relative for relative in others if relative != NIX_KEYBINDS_FILE]
+
+
+def sources() -> List[str]:
+    """Files whose contents determine the output of build_tree(): the modules
+    and the variables files they import."""
+    paths = [config_path(relative) for relative in module_files()]
+    for path in list(paths):
+        paths.extend(other for other in variables.variable_files(path) if other not in paths)
+    return paths
+
+
+def file_steps() -> List[Tuple[str, str, Callable[[str], Any]]]:
+    """(memo step, source file relative to the config root, parse function) of
+    every source, for parsing them elsewhere (keybinds.hosts)."""
+    return [("keys", relative, reparse_keys) for relative in module_files()]
+
+
+def build_tree(files: Optional[Collection[str]] = None) -> Section:
+    """The merged tree of every module, or of the relative paths in `files`
+    (a host's modules, see keybinds.hosts). Each module's tree is memoized
+    by its file's signature."""
+    return merge_trees([_memo.get("keys", config_path(relative), reparse_keys)
+                        for relative in module_files() if files is None or relative in files])
+
+
+def iter_json() -> Iterator[str]:
+    """The JSON of build_tree(), in chunks.
+
+    A section can get binds from every module (see merge_trees()), so none
+    is complete before the last module is parsed; the merged tree, memoized
+    per module like build_tree()'s, is encoded while it is written.
+    """
+    return iterencode(build_tree())
+
+
+def iter_chords() -> Iterator[Tuple[str, Tuple[str, ...], KeyBinding]]:
+    """(layer, section path, keybind) of every bind, for keybinds.conflicts."""
+    for path, keybind in iter_bindings(build_tree()):
+        yield TAB, path, keybind
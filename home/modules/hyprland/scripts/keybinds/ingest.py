@@ -0,0 +1,240 @@
+"""
+Hyprland binds from a structured dump instead of the Nix sources
+(get_keybinds.py --binds FILE).
+
+The Nix parser only sees the binds written out in hyprland/*.nix; binds
+that exist only after evaluation (generated lists, other modules, values
+from functions) are missing. Hyprland itself knows all of them. This reads
+
+    hyprctl binds -j    a JSON list of bind objects (modmask, key, keycode,
+                        dispatcher, arg, description, ...)
+    hyprland.conf       the rendered config, e.g. ~/.config/hypr/hyprland.conf
+
+from a file, or stdin ("-"); no running compositor is needed (a dump can be
+recorded once; keybinds.golden checks the one in fixtures/). The binds are
+placed into the tree of the Nix sources through a chord index
+(keybinds.chords): a bind whose chord is bound in hyprland/*.nix takes that
+bind's place (section, order, spelling, comment), and is left out if it is
+marked [hidden] there; the comment binds (#/#) of the Nix sources are kept.
+When a chord is bound several times, binds with the same dispatcher and
+params are paired first, then the same dispatcher, then the rest in order.
+Binds the Nix sources do not have go into a trailing UNMATCHED_SECTION, with
+their description or a generated comment.
+"""
+import json
+import sys
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from keybinds import chords, hyprland, profiling, variables
+from keybinds.common import config_path
+from keybinds.records import KeyBinding, Section, mods as shared_mods
+
+STDIN = "-"
+UNMATCHED_SECTION = "Other"
+
+# Modifier bits of a hyprctl modmask (wlroots' WLR_MODIFIER_*), in the order
+# the names are written
+MODMASK_NAMES = [
+    (64, "Super"),
+    (4, "Ctrl"),
+    (8, "Alt"),
+    (1, "Shift"),
+    (2, "Caps"),
+    (16, "Mod2"),
+    (32, "Mod3"),
+    (128, "Mod5"),
+]
+
+# An ingested bind and whether the dump marks it hidden
+Bind = Tuple[KeyBinding, bool]
+# A Nix bind: [section of the Nix tree, slot in its keybinds, bind, hidden,
+# already paired]
+Entry = List[Any]
+# (chord, dispatcher, params), (chord, dispatcher) and (chord,) -> the Nix
+# binds with them, last in source order first (so pop() takes the first)
+Index = Dict[tuple, List[Entry]]
+
+
+def read_input(path: str) -> str:
+    """The text of `path`, or of stdin for STDIN."""
+    if path == STDIN:
+        return sys.stdin.read()
+    with open(path, "r") as file:
+        return file.read()
+
+
+def mask_mods(modmask: int) -> Tuple[str, ...]:
+    """Modifier names of a hyprctl modmask."""
+    return shared_mods(name for bit, name in MODMASK_NAMES if modmask & bit)
+
+
+def parse_hyprctl(text: str) -> List[Bind]:
+    """The binds of `hyprctl binds -j` output.
+
+    Raises ValueError if `text` is not such a list.
+    """
+    entries = json.loads(text)
+    if not isinstance(entries, list):
+        raise ValueError("expected a JSON list of binds")
+    binds = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError("expected a JSON list of binds")
+        key = entry.get("key") or ""
+        if not key and entry.get("keycode"):
+            key = f"code:{entry['keycode']}"
+        description = entry.get("description", "") if entry.get("has_description") else ""
+        binds.append((KeyBinding(mask_mods(entry.get("modmask", 0)), key, entry.get("dispatcher", ""),
+                                 entry.get("arg", ""), description), False))
+    return binds
+
+
+def parse_conf(text: str) -> List[Bind]:
+    """The binds of a rendered hyprland.conf, with its $variables expanded."""
+    resolver = variables.Resolver()
+    for name, value in variables.definitions(text):
+        resolver.define(name, value)
+    binds = []
+    for line in resolver.expand(text).splitlines():
+        line = line.strip()
+        # Comment binds (#/#) are comments to Hyprland; the Nix sources supply them
+        if line.startswith("bind"):
+            keybind = hyprland.parse_bind_line(line, keep_hidden=True)
+            if keybind is not None:
+                binds.append((keybind, keybind.comment.startswith(hyprland.HIDE_COMMENT)))
+    return binds
+
+
+@profiling.timed("ingest.parse")
+def parse(text: str) -> List[Bind]:
+    """The binds of a dump in either format; JSON is told by its leading
+    bracket (a hyprland.conf line never starts with one)."""
+    if text.lstrip()[:1] in ("[", "{"):
+        return parse_hyprctl(text)
+    return parse_conf(text)
+
+
+@lru_cache(maxsize=4096)
+def _chord(mods: Tuple[str, ...], key: str) -> chords.Chord:
+    # Mods are shared tuples, and most chords repeat between dump and sources
+    return chords.hyprland(mods, key)
+
+
+def _annotations() -> Tuple[List[Section], Index]:
+    """The trees of the Nix config texts, and their binds by chord.
+
+    Sections keep their comment binds (#/#, which Hyprland never sees), and
+    hold a None slot in place of every bind, filled in by build_tree().
+    Hidden binds are indexed too, so the dump's copies can be left out.
+    """
+    trees = []
+    index: Index = {}
+    for relative in hyprland.module_files():
+        for text in hyprland.read_nix_blocks(config_path(relative)):
+            # As hyprland.parse_hyprland_config() builds its tree
+            root = Section([], [], "")
+            stack = [root]
+            for event in hyprland.iter_hyprland_events(text, keep_hidden=True):
+                kind = event[0]
+                if kind == hyprland.KEYBIND:
+                    keybind = event[1]
+                    section = stack[-1]
+                    hidden = keybind.comment.startswith(hyprland.HIDE_COMMENT)
+                    entry = [section, len(section.keybinds), keybind, hidden, False]
+                    for key in _keys(_chord(keybind.mods, keybind.key), keybind):
+                        queue = index.get(key)
+                        if queue is None:
+                            index[key] = [entry]
+                        else:
+                            queue.append(entry)
+                    section.keybinds.append(None)
+                elif kind == hyprland.COMMENT_KEYBIND:
+                    stack[-1].keybinds.append(event[1])
+                elif kind == hyprland.OPEN_SECTION:
+                    section = Section([], [], event[1])
+                    stack[-1].children.append(section)
+                    stack.append(section)
+                else:
+                    stack.pop()
+            trees.append(root)
+    for queue in index.values():
+        queue.reverse()
+    return trees, index
+
+
+def _fill(trees: List[Section]) -> None:
+    """Drop the slots no bind of the dump was paired with."""
+    stack = list(trees)
+    while stack:
+        section = stack.pop()
+        section.keybinds[:] = [keybind for keybind in section.keybinds if keybind is not None]
+        stack.extend(section.children)
+
+
+def _keys(chord: chords.Chord, keybind: KeyBinding) -> Tuple[tuple, tuple, tuple]:
+    """Index keys of a bind, most specific first."""
+    return (chord, keybind.dispatcher, keybind.params), (chord, keybind.dispatcher), (chord,)
+
+
+def _pair(index: Index, keybind: KeyBinding) -> Optional[Entry]:
+    """The Nix bind of the same chord `keybind` is paired with, if one is left.
+
+    Paired entries are dropped from the other queues as they are met, so
+    every entry is looked at a bounded number of times.
+    """
+    for key in _keys(_chord(keybind.mods, keybind.key), keybind):
+        queue = index.get(key)
+        while queue:
+            entry = queue.pop()
+            if not entry[4]:
+                entry[4] = True
+                return entry
+    return None
+
+
+def _comment(keybind: KeyBinding, source: Optional[KeyBinding]) -> str:
+    """The comment of an ingested bind: the Nix bind's, unless that one was
+    generated from its own params, then the dump's, else a generated one."""
+    if source is not None and source.comment != hyprland.autogenerate_comment(source.dispatcher, source.params):
+        return source.comment
+    return keybind.comment or hyprland.autogenerate_comment(keybind.dispatcher, keybind.params)
+
+
+@profiling.timed("ingest.merge")
+def build_tree(binds: List[Bind]) -> Section:
+    """The tree of ingested `binds`, in the sections and order of the Nix
+    sources (see the module docstring)."""
+    trees, index = _annotations()
+    unmatched = Section([], [], UNMATCHED_SECTION)
+    for keybind, hidden in binds:
+        entry = _pair(index, keybind)
+        if entry is None:
+            if not hidden:
+                unmatched.keybinds.append(KeyBinding(keybind.mods, keybind.key, keybind.dispatcher,
+                                                     keybind.params, _comment(keybind, None)))
+            continue
+        section, slot, source, source_hidden, _ = entry
+        if hidden or source_hidden:
+            continue
+        if source.dispatcher == keybind.dispatcher and source.params == keybind.params:
+            # Unchanged by evaluation: the Nix bind as the parser reports it
+            section.keybinds[slot] = source
+        else:
+            section.keybinds[slot] = KeyBinding(source.mods, source.key, keybind.dispatcher,
+                                                keybind.params, _comment(keybind, source))
+    _fill(trees)
+    if unmatched.keybinds:
+        trees.append(Section([unmatched], [], ""))
+    if profiling.ENABLED:
+        profiling.count("ingest.binds", len(binds))
+        profiling.count("ingest.unmatched", len(unmatched.keybinds))
+    return hyprland.merge_trees(trees)
+
+
+def load(path: str) -> Section:
+    """build_tree() of the dump in `path` (STDIN: standard input).
+
+    Raises OSError if it cannot be read, ValueError if it is not valid JSON.
+    """
+    return build_tree(parse(read_input(path)))
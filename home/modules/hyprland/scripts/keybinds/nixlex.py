@@ -0,0 +1,470 @@
+"""
+Single-pass lexer for the parts of Nix the cheatsheet parsers care about.
+
+Nix files are tokenized once, left to right. Strings are decoded the way Nix
+does it: escapes in "..." strings, the '''/''$/''\\x escapes of indented
+''...'' strings, and the common-indentation stripping of indented strings.
+Antiquotations (${...}) cannot be evaluated here and are kept verbatim, but
+they are skipped correctly even when they contain braces or strings.
+Callers that substitute names into decoded strings themselves (see
+keybinds.variables) can ask for escaped antiquotations (''${ and \\${) to be
+marked, so they are told apart from real ones, and unmark() the result.
+
+On top of the token stream, bindings() reports every `attr.path = value;`
+binding with its full attribute path (including the attribute sets it is nested
+in), so callers can pick out e.g. every `extraConfig` or
+`home.file."<name>".text` block without re-scanning the file. Literal values
+(strings, numbers, booleans, lists and attribute sets) are read into Python
+values; anything that would need evaluation is kept as Opaque source text.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+from keybinds import profiling
+
+
+class Token(NamedTuple):
+    kind: str   # "id", "str", "istr", "anti", "num", "path", "uri", "punct", "other"
+    value: str  # identifier/punctuation text, decoded string contents, or raw ${...}
+    start: int
+    end: int
+
+
+class Binding(NamedTuple):
+    path: Tuple[str, ...]  # full attribute path, e.g. ("programs", "kitty", "extraConfig")
+    value: Any             # str, list, AttrSet, bool, int/float, None or Opaque
+    start: int             # offset of the value in the source
+    end: int
+
+
+class AttrSet(dict):
+    """A literal attribute set; dotted attribute paths become nested AttrSets."""
+
+    def __init__(self, start: int) -> None:
+        super().__init__()
+        self.start = start
+
+
+class Opaque(NamedTuple):
+    """An expression that cannot be evaluated here (variables, calls, operators)."""
+    text: str
+    start: int  # offset in the source
+
+
+class NixLexError(ValueError):
+    pass
+
+
+_TOKEN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>\#[^\n]*|/\*.*?\*/)
+  | (?P<istr>'')
+  | (?P<str>")
+  | (?P<anti>\$\{)
+  | (?P<path>(?:~|[A-Za-z0-9._+\-]*)(?:/[A-Za-z0-9._+\-]+)+/?|<[A-Za-z0-9._+\-/]+>)
+  | (?P<uri>[A-Za-z][A-Za-z0-9+\-.]*:[A-Za-z0-9%/?:@&=+$,\-_.!~*']+)
+  | (?P<id>[A-Za-z_][A-Za-z0-9_'\-]*)
+  | (?P<num>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+  | (?P<punct>\.\.\.|==|!=|<=|>=|&&|\|\||->|//|\+\+|[{}\[\]();:=.,@?!<>+\-*/])
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+_DSTR_PIECE = re.compile(r'[^"\\$]+|\\(.)|\$\{|\$|"', re.DOTALL)
+_ISTR_PIECE = re.compile(r"[^'$]+|'''|''\$|''\\(.)|''|'|\$\{|\$", re.DOTALL)
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+# Stand-in for escapes and antiquotations while stripping indentation: they
+# count as line content, and must not be stripped themselves
+_SENTINEL = "\0"
+
+# The `$` of an escaped antiquotation in strings decoded with marked=True
+ESCAPED_DOLLAR = "\ue024"
+
+
+def _skip_antiquote(text: str, pos: int) -> int:
+    """Return the offset just past the `}` closing an antiquote opened before `pos`."""
+    depth = 0
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        kind = match.lastgroup
+        if kind == "istr":
+            _, pos = _scan_indented(text, match.end())
+            continue
+        if kind == "str":
+            _, pos = _scan_double(text, match.end())
+            continue
+        if kind == "anti":
+            depth += 1
+        elif kind == "punct":
+            if match.group() == "{":
+                depth += 1
+            elif match.group() == "}":
+                if depth == 0:
+                    return match.end()
+                depth -= 1
+        pos = match.end()
+    raise NixLexError("unterminated antiquotation")
+
+
+def _escaped_dollar(text: str, end: int, marked: bool) -> str:
+    """The `$` of an escape ending at `end`, marked if it starts a literal ${."""
+    return ESCAPED_DOLLAR if marked and text.startswith("{", end) else "$"
+
+
+def unmark(text: str) -> str:
+    """`text` decoded with marked=True, as it would have been without."""
+    return text.replace(ESCAPED_DOLLAR, "$") if ESCAPED_DOLLAR in text else text
+
+
+def _scan_double(text: str, pos: int, marked: bool = False) -> Tuple[str, int]:
+    """Decode a "..." string whose opening quote ends at `pos`."""
+    parts = []
+    while pos < len(text):
+        match = _DSTR_PIECE.match(text, pos)
+        piece = match.group()
+        if piece == '"':
+            return "".join(parts), match.end()
+        if piece == "${":
+            end = _skip_antiquote(text, match.end())
+            parts.append(text[pos:end])
+            pos = end
+            continue
+        if match.group(1) == "$":
+            parts.append(_escaped_dollar(text, match.end(), marked))
+        elif match.group(1) is not None:
+            parts.append(_ESCAPES.get(match.group(1), match.group(1)))
+        else:
+            parts.append(piece)
+        pos = match.end()
+    raise NixLexError("unterminated string")
+
+
+def _scan_indented(text: str, pos: int, marked: bool = False) -> Tuple[str, int]:
+    """Decode an ''...'' string whose opening quotes end at `pos`."""
+    raw = []      # literal text, with _SENTINEL for escapes/antiquotes
+    special = []  # replacement text for each _SENTINEL, in order
+    while pos < len(text):
+        match = _ISTR_PIECE.match(text, pos)
+        piece = match.group()
+        if piece == "''":
+            return _strip_indentation("".join(raw), special), match.end()
+        if piece == "${":
+            end = _skip_antiquote(text, match.end())
+            raw.append(_SENTINEL)
+            special.append(text[pos:end])
+            pos = end
+            continue
+        if piece == "'''":
+            raw.append(_SENTINEL)
+            special.append("''")
+        elif piece == "''$":
+            raw.append(_SENTINEL)
+            special.append(_escaped_dollar(text, match.end(), marked))
+        elif match.group(1) is not None:
+            raw.append(_SENTINEL)
+            special.append(_ESCAPES.get(match.group(1), match.group(1)))
+        else:
+            raw.append(piece)
+        pos = match.end()
+    raise NixLexError("unterminated indented string")
+
+
+def _strip_indentation(raw: str, special: List[str]) -> str:
+    """Apply Nix's indented-string rules, then substitute escapes/antiquotes.
+
+    The smallest indentation (in spaces) of any line with content is removed
+    from every line, a first line containing only spaces is dropped, and a
+    last line containing only spaces becomes empty.
+    """
+    lines = raw.split("\n")
+    indent: Optional[int] = None
+    for line in lines:
+        stripped = line.lstrip(" ")
+        if stripped:
+            width = len(line) - len(stripped)
+            if indent is None or width < indent:
+                indent = width
+    indent = indent or 0
+
+    out = []
+    for line in lines:
+        width = len(line) - len(line.lstrip(" "))
+        out.append(line[min(width, indent):])
+    if len(out) > 1 and out[0].strip(" ") == "":
+        out.pop(0)
+    if out and out[-1].strip(" ") == "":
+        out[-1] = ""
+
+    result = "\n".join(out)
+    if special:
+        pieces = result.split(_SENTINEL)
+        result = pieces[0] + "".join(s + p for s, p in zip(special, pieces[1:]))
+    return result
+
+
+def scan_string(text: str, pos: int, opener: str) -> Tuple[str, int]:
+    """Decode the string whose opener ('"' or "''") ends at `pos`; return
+    (value, end). For scanners that match most of a file with their own
+    patterns instead of tokenizing it."""
+    return _scan_indented(text, pos) if opener == "''" else _scan_double(text, pos)
+
+
+def tokenize(text: str, marked: bool = False) -> Iterator[Token]:
+    """Yield the significant tokens of `text` (whitespace and comments dropped).
+
+    With `marked`, the `$` of escaped antiquotations in strings is
+    ESCAPED_DOLLAR (see unmark()).
+    """
+    pos = 0
+    length = len(text)
+    while pos < length:
+        match = _TOKEN.match(text, pos)
+        kind = match.lastgroup
+        if kind in ("ws", "comment"):
+            pos = match.end()
+            continue
+        if kind == "istr":
+            value, end = _scan_indented(text, match.end(), marked)
+            yield Token("istr", value, pos, end)
+            pos = end
+            continue
+        if kind == "str":
+            value, end = _scan_double(text, match.end(), marked)
+            yield Token("str", value, pos, end)
+            pos = end
+            continue
+        if kind == "anti":
+            end = _skip_antiquote(text, match.end())
+            yield Token("anti", text[pos:end], pos, end)
+            pos = end
+            continue
+        yield Token(kind, match.group(), pos, match.end())
+        pos = match.end()
+
+
+_NAME_KINDS = ("id", "str", "anti")
+_CLOSERS = ("}", "]", ")")
+_CONSTANTS = {"true": True, "false": False, "null": None}
+
+
+class _Parser:
+    """Recursive-descent reader for literal Nix values over one token list."""
+
+    def __init__(self, text: str, marked: bool = False) -> None:
+        self.text = text
+        self.tokens = list(tokenize(text, marked))
+
+    def _is(self, index: int, value: str) -> bool:
+        return index < len(self.tokens) and self.tokens[index].kind == "punct" \
+            and self.tokens[index].value == value
+
+    def _skip_balanced(self, index: int) -> int:
+        """Skip from an opening bracket at `index` to just past its closer."""
+        depth = 0
+        while index < len(self.tokens):
+            token = self.tokens[index]
+            if token.kind == "punct":
+                if token.value in ("{", "[", "("):
+                    depth += 1
+                elif token.value in _CLOSERS:
+                    depth -= 1
+                    if depth == 0:
+                        return index + 1
+            index += 1
+        return index
+
+    def _skip_expression(self, index: int) -> int:
+        """Skip to the `;` (or enclosing closer) that ends the expression at `index`."""
+        while index < len(self.tokens):
+            token = self.tokens[index]
+            if token.kind == "punct":
+                if token.value == ";" or token.value in _CLOSERS:
+                    return index
+                if token.value in ("{", "[", "("):
+                    index = self._skip_balanced(index)
+                    continue
+            index += 1
+        return index
+
+    def _opaque(self, start: int, end: int) -> Opaque:
+        if start >= end:
+            return Opaque("", self.tokens[start].start if start < len(self.tokens) else len(self.text))
+        return Opaque(self.text[self.tokens[start].start:self.tokens[end - 1].end], self.tokens[start].start)
+
+    def primary(self, index: int) -> Tuple[Any, int]:
+        """Read one primary expression (a list element); return (value, next index)."""
+        token = self.tokens[index]
+        if token.kind in ("str", "istr"):
+            return token.value, index + 1
+        if token.kind == "num":
+            number = float(token.value) if "." in token.value or "e" in token.value.lower() else int(token.value)
+            return number, index + 1
+        if token.kind == "punct" and token.value == "[":
+            return self.list(index)
+        if token.kind == "punct" and token.value == "{":
+            return self.attrset(index)
+        if token.kind == "id" and token.value == "rec" and self._is(index + 1, "{"):
+            return self.attrset(index + 1)
+        if token.kind == "id" and token.value in _CONSTANTS and not self._is(index + 1, "."):
+            return _CONSTANTS[token.value], index + 1
+        if token.kind == "punct" and token.value == "(":
+            end = self._skip_balanced(index)
+            return self._opaque(index, end), end
+        # Variable or attribute selection (pkgs.foo, cfg."a".b)
+        end = index + 1
+        while self._is(end, ".") and end + 1 < len(self.tokens) and self.tokens[end + 1].kind in _NAME_KINDS:
+            end += 2
+        return self._opaque(index, end), end
+
+    def value(self, index: int) -> Tuple[Any, int]:
+        """Read a binding's value up to (not including) its `;`."""
+        value, end = self.primary(index)
+        if end < len(self.tokens) and not (self._is(end, ";") or self.tokens[end].value in _CLOSERS):
+            # Function application, operator, lambda, ...
+            end = self._skip_expression(end)
+            value = self._opaque(index, end)
+        return value, end
+
+    def list(self, index: int) -> Tuple[list, int]:
+        items = []
+        index += 1
+        while index < len(self.tokens) and not self._is(index, "]"):
+            if self.tokens[index].value in ("}", ")") and self.tokens[index].kind == "punct":
+                break  # unbalanced; let the caller recover
+            item, index = self.primary(index)
+            items.append(item)
+        return items, index + 1
+
+    def attrpath(self, index: int) -> Tuple[Optional[List[str]], int]:
+        names = []
+        while index < len(self.tokens) and self.tokens[index].kind in _NAME_KINDS:
+            names.append(self.tokens[index].value)
+            index += 1
+            if not self._is(index, "."):
+                break
+            index += 1
+        return (names or None), index
+
+    def attrset(self, index: int) -> Tuple[Any, int]:
+        result = AttrSet(self.tokens[index].start)
+        start = index
+        index += 1
+        while index < len(self.tokens) and not self._is(index, "}"):
+            token = self.tokens[index]
+            if token.kind == "id" and token.value == "inherit":
+                index = self._skip_expression(index)
+                index += 1
+                continue
+            names, index = self.attrpath(index)
+            if names is None or not self._is(index, "="):
+                # Not a literal set (e.g. function arguments { pkgs, ... })
+                end = self._skip_balanced(start)
+                return self._opaque(start, end), end
+            value, index = self.value(index + 1)
+            target = result
+            for name in names[:-1]:
+                inner = target.get(name)
+                if not isinstance(inner, AttrSet):
+                    inner = target[name] = AttrSet(token.start)
+                target = inner
+            target[names[-1]] = value
+            if self._is(index, ";"):
+                index += 1
+        return result, index + 1
+
+    def bindings(self) -> List[Binding]:
+        """Every binding in the file whose value is not an attribute set.
+
+        Attribute sets bound directly to an attribute path are flattened into
+        the paths of their bindings. Everything else (function headers,
+        `let`, `with`, calls) is walked through token by token, so bindings
+        nested inside arbitrary expressions are still found.
+        """
+        bindings = []
+        # Attribute path prefix of every enclosing `{`; () for sets whose own
+        # path is unknown (function arguments, list elements, the module body)
+        frames: List[Tuple[str, ...]] = [()]
+        path: List[str] = []       # dotted attribute path being read
+        tokens = self.tokens
+        index = 0
+
+        while index < len(tokens):
+            token = tokens[index]
+            if token.kind in _NAME_KINDS:
+                if not (path and index > 0 and self._is(index - 1, ".")):
+                    path = []
+                path.append(token.value)
+            elif token.kind == "punct" and token.value == "." and path:
+                pass
+            elif token.kind == "punct" and token.value == "=" and path:
+                assigned = frames[-1] + tuple(path)
+                path = []
+                index += 1
+                if index >= len(tokens):
+                    break
+                value_token = tokens[index]
+                if value_token.kind == "punct" and value_token.value == "{":
+                    frames.append(assigned)
+                elif value_token.kind in ("str", "istr", "num") or \
+                        (value_token.kind == "punct" and value_token.value == "["):
+                    value, end = self.primary(index)
+                    if self._is(end, ";"):
+                        bindings.append(Binding(assigned, value, value_token.start, tokens[end - 1].end))
+                    index = end
+                    continue
+                elif value_token.kind == "id" and value_token.value in _CONSTANTS and self._is(index + 1, ";"):
+                    bindings.append(Binding(assigned, _CONSTANTS[value_token.value],
+                                            value_token.start, value_token.end))
+                    index += 1
+                    continue
+                else:
+                    continue
+            else:
+                if token.kind == "punct":
+                    if token.value == "{":
+                        frames.append(())
+                    elif token.value == "}" and len(frames) > 1:
+                        frames.pop()
+                path = []
+            index += 1
+
+        return bindings
+
+
+@lru_cache(maxsize=16)
+@profiling.timed("nixlex.bindings")
+def bindings(text: str, marked: bool = False) -> Tuple[Binding, ...]:
+    """All non-attrset bindings in `text` with their full attribute paths, in source order.
+
+    Cached on the text, so several parsers reading the same file share one
+    lexer pass. `marked` is passed on to tokenize().
+    """
+    return tuple(_Parser(text, marked).bindings())
+
+
+def string_bindings(text: str) -> List[Binding]:
+    """The bindings of `text` whose value is a string."""
+    return [b for b in bindings(text) if isinstance(b.value, str)]
+
+
+def find_strings(text: str, attr: str) -> List[str]:
+    """Decoded values of every string binding whose attribute path ends with `attr`.
+
+    `attr` may be dotted ("options.desc") or a single name ("extraConfig");
+    quoted components are matched by their decoded name.
+    """
+    suffix = tuple(attr.split("."))
+    return [b.value for b in string_bindings(text) if b.path[-len(suffix):] == suffix]
+
+
+def find_home_file_text(text: str, name: str) -> List[str]:
+    """Decoded values of `home.file."<name>".text` bindings."""
+    wanted = ("home", "file", name, "text")
+    return [b.value for b in string_bindings(text) if b.path[-4:] == wanted]
+
+
+def line_of(text: str, offset: int) -> int:
+    """1-based line number of `offset` in `text`."""
+    return text.count("\n", 0, offset) + 1
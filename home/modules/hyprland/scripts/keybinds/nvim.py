@@ -0,0 +1,390 @@
+"""
+Neovim keybind parser for nixvim configurations.
+Reads keybinds from nixvim.nix keymaps section for the quickshell cheatsheet.
+Used by get_nvim_keybinds.py and get_all_keybinds.py.
+"""
+import hashlib
+import re
+import sys
+from typing import Callable, Dict, Iterator, List, Any, Tuple
+
+from keybinds import nixlex, profiling
+from keybinds.cache import FileMemo
+from keybinds.common import config_path, read_file
+from keybinds.records import VimKeyBinding, dumps, iterencode, mods as shared_mods
+
+NIX_NIXVIM_FILE = "home/modules/nixvim.nix"
+
+TAB = "nvim"
+
+# Parse results reused across rebuilds in daemon/watch mode
+_memo = FileMemo()
+
+# One modifier of a key like <C-s>, <S-Tab>, <C-S-x>
+VIM_MOD_PATTERN = re.compile(r'^<([CSAM])-(.+)>$')
+
+
+# Display order of the well-known modes; others follow in order of appearance
+MODE_NAMES = {
+    'n': "Normal Mode",
+    'i': "Insert Mode",
+    't': "Terminal Mode",
+    'v': "Visual Mode",
+    'x': "Visual Block Mode",
+}
+
+# Attributes of plugins.<name> that hold keymaps, and the mode their entries
+# apply to when they do not name one (cmp's `mapping` is for insert mode)
+PLUGIN_KEYMAP_ATTRS = {
+    "keymaps": "n",
+    "mapping": "i",
+    "mappings": "n",
+}
+
+# Group names inside a plugin keymap block that select a mode
+# (e.g. telescope's settings.defaults.mappings.i)
+MODE_GROUPS = set(MODE_NAMES) | {"s", "o", "c"}
+
+# The single modes a nixvim mode applies in ("" is :map, "v" is :vmap)
+MODE_LAYERS = {"": "nxso", "v": "xs", "!": "ic", "l": "icl"}
+
+
+def _keymap_entries(entry: Any, default_mode: str = "") -> Tuple[List[Tuple[str, VimKeyBinding]], str]:
+    """Turn one `keymaps` list element into (mode, keybind) pairs.
+
+    Returns ([], reason) if the entry cannot be shown on the cheatsheet.
+    """
+    if not isinstance(entry, nixlex.AttrSet):
+        return [], "not an attribute set"
+
+    key = entry.get("key")
+    if not isinstance(key, str):
+        return [], "key is missing or not a string"
+
+    action = entry.get("action")
+    if isinstance(action, nixlex.AttrSet) and isinstance(action.get("__raw"), str):
+        action = action["__raw"]
+    if not isinstance(action, str):
+        return [], f"{key}: action is missing or not a string"
+
+    # nixvim's default mode "" is :map (normal, visual, operator-pending)
+    modes = entry.get("mode", default_mode)
+    if isinstance(modes, str):
+        modes = [modes]
+    if not isinstance(modes, list) or not all(isinstance(m, str) for m in modes):
+        return [], f"{key}: mode is not a string or list of strings"
+
+    options = entry.get("options")
+    desc = options.get("desc", "") if isinstance(options, dict) else ""
+    if not isinstance(desc, str):
+        desc = ""
+
+    # Parse the key into mods and key
+    mods, main_key = parse_vim_key(key)
+    keybind = VimKeyBinding(shared_mods(mods), main_key, action, desc)
+    return [(mode, keybind) for mode in modes], ""
+
+
+def _plugin_keymap_entries(block: Any, default_mode: str, prefix: str = ""
+                           ) -> Tuple[List[Tuple[str, VimKeyBinding]], List[Tuple[Any, str]]]:
+    """Read a plugins.<name> keymap block into (mode, keybind) pairs.
+
+    Blocks are either lists of full keymap entries, or attribute sets mapping
+    a key to an action (a string, or a set with action/desc/mode). Nested
+    sets without an action are groups (lsp's lspBuf/diagnostic, or a mode
+    such as telescope's mappings.i). Returns the pairs and the (node,
+    reason) of every entry that was skipped.
+    """
+    entries: List[Tuple[str, VimKeyBinding]] = []
+    skipped: List[Tuple[Any, str]] = []
+
+    if isinstance(block, list):
+        for entry in block:
+            pairs, reason = _keymap_entries(entry, default_mode)
+            if reason:
+                skipped.append((entry, f"{prefix}{reason}"))
+            entries.extend(pairs)
+        return entries, skipped
+
+    if not isinstance(block, nixlex.AttrSet):
+        return entries, skipped
+
+    for name, value in block.items():
+        if isinstance(value, str) or (isinstance(value, nixlex.AttrSet) and "__raw" in value):
+            value = {"action": value}
+        elif isinstance(value, (list, nixlex.AttrSet)) and not (
+                isinstance(value, nixlex.AttrSet) and "action" in value):
+            mode = name if name in MODE_GROUPS else default_mode
+            inner, inner_skipped = _plugin_keymap_entries(value, mode, f"{prefix}{name}.")
+            entries.extend(inner)
+            skipped.extend(inner_skipped)
+            continue
+        elif not isinstance(value, nixlex.AttrSet):
+            # Block-wide options such as `keymaps.silent = true`
+            continue
+
+        entry = nixlex.AttrSet(getattr(value, "start", block.start))
+        entry.update(value)
+        entry["key"] = name
+        if "desc" in entry and "options" not in entry:
+            entry["options"] = {"desc": entry["desc"]}
+        pairs, reason = _keymap_entries(entry, default_mode)
+        if reason:
+            skipped.append((entry, f"{prefix}{reason}"))
+        entries.extend(pairs)
+    return entries, skipped
+
+
+@profiling.timed("nvim.extract")
+def extract_keymaps(content: str) -> Tuple[Dict[str, List[VimKeyBinding]],
+                                           Dict[str, Dict[str, List[VimKeyBinding]]], List[str]]:
+    """Collect the keymaps of a nixvim config, grouped by mode.
+
+    Returns (top-level keymaps by mode, plugin keymaps by mode and plugin,
+    skipped entries). Both come from one walk over the file's bindings: the
+    top-level `keymaps = [ ... ]` list, and every keymap block under
+    `plugins.<name>` (see PLUGIN_KEYMAP_ATTRS).
+
+    Entries may list their attributes in any order and over any number of
+    lines, use `mode = [ "n" "v" ]`, `action.__raw` and `options = { ... }`.
+    Entries that cannot be read (e.g. a key computed by a function) are
+    returned as "line N: reason" strings.
+    """
+    mode_keybinds: Dict[str, List[VimKeyBinding]] = {mode: [] for mode in MODE_NAMES}
+    plugin_keybinds: Dict[str, Dict[str, List[VimKeyBinding]]] = {}
+    skipped = []
+
+    def skip(node: Any, fallback: int, reason: str) -> None:
+        start = getattr(node, "start", fallback)
+        skipped.append(f"line {nixlex.line_of(content, start)}: {reason}")
+
+    # (plugin, keymap attr) -> block rebuilt from its flattened bindings,
+    # in order of first appearance
+    plugin_blocks: Dict[Tuple[str, str], nixlex.AttrSet] = {}
+
+    for binding in nixlex.bindings(content):
+        path = binding.path
+        if "plugins" in path:
+            plugins_index = path.index("plugins")
+            attr_index = next((i for i in range(plugins_index + 2, len(path))
+                               if path[i] in PLUGIN_KEYMAP_ATTRS), None)
+            if attr_index is None:
+                continue
+            plugin, attr = path[plugins_index + 1], path[attr_index]
+            rest = path[attr_index + 1:]
+            if not rest:
+                # The whole block is one literal value (a list of entries)
+                block = binding.value
+                if isinstance(block, list):
+                    plugin_blocks[(plugin, attr)] = block
+                continue
+            target = plugin_blocks.setdefault((plugin, attr), nixlex.AttrSet(binding.start))
+            if not isinstance(target, nixlex.AttrSet):
+                continue
+            for name in rest[:-1]:
+                inner = target.get(name)
+                if not isinstance(inner, nixlex.AttrSet):
+                    inner = target[name] = nixlex.AttrSet(binding.start)
+                target = inner
+            target[rest[-1]] = binding.value
+            continue
+
+        if path[-1:] != ("keymaps",):
+            continue
+        if not isinstance(binding.value, list):
+            skip(binding.value, binding.start, "keymaps is not a list")
+            continue
+        for entry in binding.value:
+            entries, reason = _keymap_entries(entry)
+            if reason:
+                skip(entry, binding.start, reason)
+            for mode, keybind in entries:
+                mode_keybinds.setdefault(mode, []).append(keybind)
+
+    for (plugin, attr), block in plugin_blocks.items():
+        entries, block_skipped = _plugin_keymap_entries(block, PLUGIN_KEYMAP_ATTRS[attr])
+        for node, reason in block_skipped:
+            skip(node, getattr(block, "start", 0), f"plugins.{plugin}.{attr}: {reason}")
+        for mode, keybind in entries:
+            # Plugin maps rarely carry a description; the action name is the
+            # most readable fallback (e.g. lsp's "definition")
+            keybind.comment = keybind.comment or keybind.action
+            plugin_keybinds.setdefault(mode, {}).setdefault(plugin, []).append(keybind)
+
+    return mode_keybinds, plugin_keybinds, skipped
+
+
+def mode_name(mode: str) -> str:
+    return MODE_NAMES.get(mode, f"{mode.upper()} Mode" if mode else "Normal, Visual & Operator Mode")
+
+
+def iter_mode_sections(content: str) -> Iterator[Dict[str, Any]]:
+    """Yield one section per mode, with the keymaps of each plugin as a subsection."""
+    try:
+        mode_keybinds, plugin_keybinds, skipped = extract_keymaps(content)
+    except nixlex.NixLexError as error:
+        print(f"[keybinds.nvim] {error}", file=sys.stderr)
+        return
+    for reason in skipped:
+        print(f"[keybinds.nvim] skipped keymap at {reason}", file=sys.stderr)
+    if profiling.ENABLED:
+        profiling.count("nvim.lines", content.count("\n") + 1)
+        profiling.count("nvim.keymaps", sum(map(len, mode_keybinds.values())) + sum(
+            len(keybinds) for plugins in plugin_keybinds.values() for keybinds in plugins.values()))
+        profiling.count("nvim.skipped", len(skipped))
+
+    for mode in plugin_keybinds:
+        mode_keybinds.setdefault(mode, [])
+    for mode, keybinds in mode_keybinds.items():
+        plugins = plugin_keybinds.get(mode, {})
+        if keybinds or plugins:
+            yield {
+                "name": mode_name(mode),
+                "keybinds": keybinds,
+                "children": [
+                    {"name": plugin, "keybinds": plugin_binds, "children": []}
+                    for plugin, plugin_binds in plugins.items()
+                ]
+            }
+
+
+def parse_nixvim_keybinds(content: str) -> Dict[str, Any]:
+    """Parse nixvim.nix content and extract keybinds from keymaps section."""
+    return {"children": list(iter_mode_sections(content))}
+
+
+class ModeGroups:
+    """Content hash of each mode section, across rebuilds of the tree.
+
+    A nixvim keymap names its mode, so a mode group is not one span of the
+    file and the file is always lexed whole. A group whose content hash is
+    unchanged keeps its previous section object, though, so keybinds.diff
+    skips it without comparing its keymaps. Only the latest groups are kept.
+    """
+
+    def __init__(self) -> None:
+        self._groups: Dict[str, Tuple[bytes, Dict[str, Any]]] = {}
+
+    def clear(self) -> None:
+        self._groups = {}
+
+    def reuse(self, sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        current: Dict[str, Tuple[bytes, Dict[str, Any]]] = {}
+        for index, section in enumerate(sections):
+            digest = hashlib.blake2b(dumps(section).encode(), digest_size=16).digest()
+            previous = self._groups.get(section["name"])
+            if previous is not None and previous[0] == digest:
+                sections[index] = section = previous[1]
+            current[section["name"]] = (digest, section)
+        self._groups = current
+        return sections
+
+
+_groups = ModeGroups()
+
+
+@profiling.timed("nvim.parse_vim_key")
+def parse_vim_key(key: str) -> tuple:
+    """Parse a vim key notation into mods and main key."""
+    mods = []
+    main_key = key
+
+    # Handle <leader> prefix
+    if key.startswith("<leader>"):
+        mods.append("Leader")
+        main_key = key[8:]  # Remove <leader>
+
+    # Handle modifier keys like <C-s>, <S-Tab>, <C-S-x>
+    match = VIM_MOD_PATTERN.match(main_key)
+    while match:
+        mod_char = match.group(1)
+        if mod_char == 'C':
+            mods.append('Ctrl')
+        elif mod_char == 'S':
+            mods.append('Shift')
+        elif mod_char == 'A':
+            mods.append('Alt')
+        elif mod_char == 'M':
+            mods.append('Meta')
+        main_key = match.group(2)
+        # Check if there are more modifiers
+        if main_key.startswith('<'):
+            match = VIM_MOD_PATTERN.match(main_key)
+        else:
+            break
+
+    # Handle special keys
+    special_keys = {
+        '<Tab>': 'Tab',
+        '<S-Tab>': 'Shift+Tab',
+        '<CR>': 'Enter',
+        '<Esc>': 'Esc',
+        '<Space>': 'Space',
+        '<BS>': 'Backspace',
+    }
+
+    if main_key in special_keys:
+        main_key = special_keys[main_key]
+    elif main_key.startswith('<') and main_key.endswith('>'):
+        # Remove angle brackets for other special keys
+        main_key = main_key[1:-1]
+
+    return mods, main_key
+
+
+def sources() -> List[str]:
+    """Files whose contents determine the output of build_tree()."""
+    return [config_path(NIX_NIXVIM_FILE)]
+
+
+def file_steps() -> List[Tuple[str, str, Callable[[str], Any]]]:
+    """(memo step, source file relative to the config root, parse function) of
+    every source, for parsing them elsewhere (keybinds.hosts)."""
+    return [("keymaps", NIX_NIXVIM_FILE, reparse_nixvim_file)]
+
+
+def parse_nixvim_file(path: str) -> Dict[str, Any]:
+    content = read_file(path)
+    if not content:
+        return {"children": []}
+    return parse_nixvim_keybinds(content)
+
+
+def reparse_nixvim_file(path: str) -> Dict[str, Any]:
+    """parse_nixvim_file(), keeping the mode sections that did not change."""
+    tree = parse_nixvim_file(path)
+    _groups.reuse(tree["children"])
+    return tree
+
+
+def build_tree() -> Dict[str, Any]:
+    return _memo.get("keymaps", config_path(NIX_NIXVIM_FILE), reparse_nixvim_file)
+
+
+def iter_json() -> Iterator[str]:
+    """The JSON of build_tree(), written one mode section at a time."""
+    return iterencode({"children": iter_mode_sections(read_file(config_path(NIX_NIXVIM_FILE)))})
+
+
+def _chord_entries(path: str) -> List[Tuple[str, Tuple[str, ...], VimKeyBinding]]:
+    try:
+        mode_keybinds, plugin_keybinds, _ = extract_keymaps(read_file(path))
+    except nixlex.NixLexError:
+        return []  # Reported by build_tree()
+    entries = []
+    for mode, keybinds in mode_keybinds.items():
+        entries.extend((mode, (mode_name(mode),), keybind) for keybind in keybinds)
+    for mode, plugins in plugin_keybinds.items():
+        for plugin, keybinds in plugins.items():
+            entries.extend((mode, (mode_name(mode), plugin), keybind) for keybind in keybinds)
+    return entries
+
+
+def iter_chords() -> Iterator[Tuple[str, Tuple[str, ...], VimKeyBinding]]:
+    """(layer, section path, keymap) of every keymap, for keybinds.conflicts.
+
+    The layer is "nvim:" followed by the single modes the map applies in,
+    e.g. "nvim:nxso" for a map with mode "".
+    """
+    for mode, path, keybind in _memo.get("chords", config_path(NIX_NIXVIM_FILE), _chord_entries):
+        yield f"{TAB}:{MODE_LAYERS.get(mode, mode)}", path, keybind
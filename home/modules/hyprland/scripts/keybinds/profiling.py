@@ -0,0 +1,158 @@
+"""
+Opt-in stage profiling for the keybind scripts.
+
+Set KEYBINDS_PROFILE to enable it without changing the command line the QML
+runs: "1" (or "stderr") writes the report to stderr, any other value is a
+log file the report is appended to. Each run writes one JSON line:
+
+    {"script": "get_all_keybinds.py", "argv": [...], "source": "parse",
+     "startup_ms": ..., "imports_ms": ..., "total_ms": ...,
+     "stages": {"hyprland.parse": {"ms": ..., "calls": ...}, ...},
+     "counts": {"hyprland.lines": ..., "bytes_read": ..., ...},
+     "peak_rss_kib": {"hyprland": ..., ..., "exit": ...}}
+
+startup_ms is the time from process start to the first keybinds import
+(interpreter startup, with the kernel's clock-tick resolution), imports_ms
+the time from there to the start of main(). keybinds/__init__.py imports
+this module first, so its clock starts with the package. Stage times are inclusive
+(hyprland.parse contains hyprland.autogenerate_comment). "source" says where
+the output came from: snapshot, daemon, cache or parse.
+
+With the variable unset every hook is a no-op: timed() returns the function
+itself, and counters are only updated behind a check of ENABLED. This module
+is imported on every run, snapshot reads included, so it only imports what
+the disabled case needs (and builtin generics instead of typing).
+"""
+import os
+import sys
+import time
+
+PROFILE_ENV = "KEYBINDS_PROFILE"
+
+_target = os.environ.get(PROFILE_ENV, "")
+ENABLED = _target not in ("", "0")
+
+_IMPORTED = time.perf_counter()
+_stages: dict[str, list] = {}
+_counts: dict[str, int] = {}
+_peaks: dict[str, int] = {}
+_notes: dict[str, object] = {}
+_imports_ms: float | None = None
+
+
+def _process_age_ms() -> float | None:
+    """Milliseconds since this process started (Linux only)."""
+    try:
+        with open("/proc/self/stat") as file:
+            # Field 22, counted after the parenthesized command name
+            start_ticks = int(file.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as file:
+            uptime = float(file.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(0.0, (uptime - start_ticks / os.sysconf("SC_CLK_TCK")) * 1000)
+
+
+_STARTUP_MS = _process_age_ms() if ENABLED else None
+
+
+def _peak_rss_kib() -> int:
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def add_time(stage: str, start: float) -> None:
+    """Add the time since perf_counter() value `start` to `stage`."""
+    entry = _stages.setdefault(stage, [0.0, 0])
+    entry[0] += time.perf_counter() - start
+    entry[1] += 1
+
+
+def count(name: str, amount: int = 1) -> None:
+    _counts[name] = _counts.get(name, 0) + amount
+
+
+def note(name: str, value: object) -> None:
+    """Add a top-level field to the report (e.g. "source")."""
+    if ENABLED:
+        _notes[name] = value
+
+
+def peak(name: str) -> None:
+    """Record the peak RSS so far under `name` (e.g. after a tab is parsed)."""
+    _peaks[name] = _peak_rss_kib()
+
+
+def timed(name: str):
+    """Decorator adding each call's duration to stage `name`, if profiling is enabled."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        import functools
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_time(name, start)
+        return wrapper
+    return decorate
+
+
+class stage:
+    """Context manager timing the enclosed block as `name`; a no-op when disabled."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        if ENABLED:
+            self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        if ENABLED:
+            add_time(self.name, self.start)
+
+
+def started_main() -> None:
+    """Mark the end of imports; called first thing in cli.main()."""
+    global _imports_ms
+    if ENABLED and _imports_ms is None:
+        _imports_ms = round((time.perf_counter() - _IMPORTED) * 1000, 3)
+
+
+def report() -> dict[str, object]:
+    peaks = dict(_peaks, exit=_peak_rss_kib())
+    return {
+        "script": os.path.basename(sys.argv[0]),
+        "argv": sys.argv[1:],
+        **_notes,
+        "startup_ms": None if _STARTUP_MS is None else round(_STARTUP_MS, 1),
+        "imports_ms": _imports_ms,
+        "total_ms": round((time.perf_counter() - _IMPORTED) * 1000, 3),
+        "stages": {name: {"ms": round(seconds * 1000, 3), "calls": calls}
+                   for name, (seconds, calls) in _stages.items()},
+        "counts": dict(_counts),
+        "peak_rss_kib": peaks,
+    }
+
+
+def _emit() -> None:
+    import json
+    line = json.dumps(report())
+    if _target in ("1", "stderr"):
+        print(line, file=sys.stderr)
+        return
+    try:
+        with open(os.path.expanduser(_target), "a") as file:
+            file.write(line + "\n")
+    except OSError as error:
+        print(f"[keybinds.profiling] {_target}: {error}", file=sys.stderr)
+
+
+if ENABLED:
+    import atexit
+    atexit.register(_emit)
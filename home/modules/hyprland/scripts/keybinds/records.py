@@ -0,0 +1,237 @@
+"""
+Compact records for parsed keybinds.
+
+A large config yields tens of thousands of bindings, and the daemon keeps
+them resident. Records therefore use __slots__ instead of a per-instance
+dict, and modifiers are interned: every distinct combination of modifiers
+is one shared tuple of interned strings (see mods()).
+
+Trees mix records with plain dicts and lists. Encode them with dumps(),
+which writes each record as an object with its FIELDS in order, so the
+output is byte-identical to the dict-based trees the parsers used to build
+(the shared mods tuples encode as JSON lists). iterencode() produces the
+same text incrementally, and also accepts generators in place of lists, so
+a tree can be written while it is still being parsed.
+"""
+import json
+import sys
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from keybinds import chords, profiling
+
+# Joins the names of nested sections in search hits and conflict reports
+SECTION_SEPARATOR = " / "
+
+_MOD_TABLE: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def mods(names: Iterable[str]) -> Tuple[str, ...]:
+    """The shared, frozen tuple for a combination of modifier names."""
+    key = tuple(names)
+    shared = _MOD_TABLE.get(key)
+    if shared is None:
+        shared = _MOD_TABLE[key] = tuple(sys.intern(name) for name in key)
+    return shared
+
+
+NO_MODS = mods(())
+
+
+class Record:
+    """Base for slotted records; FIELDS are the serialized slots, in order.
+
+    FLAT records only hold strings, mods tuples and scalars, so they can be
+    encoded in one step (encode_record).
+    """
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    FLAT = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class KeyBinding(Record):
+    """A Hyprland bind."""
+    __slots__ = ("mods", "key", "dispatcher", "params", "comment")
+    FIELDS = __slots__
+
+    def __init__(self, mods: Tuple[str, ...], key: str, dispatcher: str, params: str, comment: str) -> None:
+        self.mods = mods
+        self.key = key
+        self.dispatcher = dispatcher
+        self.params = params
+        self.comment = comment
+
+    def chord(self) -> chords.Chord:
+        return chords.hyprland(self.mods, self.key)
+
+
+class Section(Record):
+    """A ##! section of the Hyprland config."""
+    __slots__ = ("children", "keybinds", "name")
+    FIELDS = __slots__
+    FLAT = False
+
+    def __init__(self, children: List["Section"], keybinds: List[KeyBinding], name: str) -> None:
+        self.children = children
+        self.keybinds = keybinds
+        self.name = name
+
+
+class VimKeyBinding(Record):
+    """A nixvim keymap."""
+    __slots__ = ("mods", "key", "action", "comment")
+    FIELDS = __slots__
+
+    def __init__(self, mods: Tuple[str, ...], key: str, action: str, comment: str) -> None:
+        self.mods = mods
+        self.key = key
+        self.action = action
+        self.comment = comment
+
+    def chord(self) -> chords.Chord:
+        return chords.vim(self.mods, self.key)
+
+
+class TerminalKeyBinding(Record):
+    """A kitty map or shell alias; action and section are not serialized."""
+    __slots__ = ("mods", "key", "comment", "action", "section")
+    FIELDS = ("mods", "key", "comment")
+
+    def __init__(self, mods: Tuple[str, ...], key: str, comment: str,
+                 action: str = "", section: str = "General") -> None:
+        self.mods = mods
+        self.key = key
+        self.comment = comment
+        self.action = action
+        self.section = section
+
+    def chord(self) -> chords.Chord:
+        return chords.kitty(self.mods, self.key)
+
+
+def node_parts(node: Any) -> Tuple[str, list, list]:
+    """(name, children, keybinds) of a Section record or a decoded tree dict."""
+    if isinstance(node, Record):
+        return node.name, node.children, node.keybinds
+    return node.get("name", ""), node.get("children", []), node.get("keybinds", [])
+
+
+def binding_items(binding: Any) -> Iterable[Tuple[str, Any]]:
+    """Serialized (field, value) pairs of a binding record or decoded dict."""
+    if isinstance(binding, Record):
+        return ((name, getattr(binding, name)) for name in binding.FIELDS)
+    return binding.items()
+
+
+def iter_bindings(tree: Any) -> Iterator[Tuple[Tuple[str, ...], Any]]:
+    """(section path, binding) for every binding of `tree`, in document order."""
+    stack: List[Tuple[Any, Tuple[str, ...]]] = [(tree, ())]
+    while stack:
+        node, path = stack.pop()
+        name, children, keybinds = node_parts(node)
+        if name:
+            path = path + (name,)
+        for binding in keybinds:
+            yield path, binding
+        stack.extend((child, path) for child in reversed(children))
+
+
+def to_json(value: Any) -> Any:
+    """json `default` hook: records encode as their FIELDS."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@profiling.timed("encode")
+def dumps(tree: Any) -> str:
+    """json.dumps() for trees containing records."""
+    return json.dumps(tree, default=to_json)
+
+
+# Encoded form of each shared mods tuple
+_MODS_JSON: Dict[Tuple[str, ...], str] = {}
+
+# Encoded `"field": ` prefixes per record class
+_FIELD_PREFIXES: Dict[type, Tuple[str, ...]] = {}
+
+# Aggregate encoder output into writes of about this many characters
+CHUNK_SIZE = 16384
+
+
+def _encode_leaf(value: Any) -> str:
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if isinstance(value, tuple):
+        encoded = _MODS_JSON.get(value)
+        if encoded is None:
+            encoded = _MODS_JSON[value] = json.dumps(value)
+        return encoded
+    return json.dumps(value, default=to_json)
+
+
+def encode_record(record: Record) -> str:
+    """JSON text of a record whose fields are all strings, mods tuples or scalars."""
+    prefixes = _FIELD_PREFIXES.get(type(record))
+    if prefixes is None:
+        prefixes = _FIELD_PREFIXES[type(record)] = tuple(
+            encode_basestring_ascii(name) + ": " for name in record.FIELDS)
+    return "{" + ", ".join([prefix + _encode_leaf(getattr(record, name))
+                            for prefix, name in zip(prefixes, record.FIELDS)]) + "}"
+
+
+def _encode(value: Any) -> Iterator[str]:
+    if isinstance(value, (str, tuple, int, float, type(None))):
+        yield _encode_leaf(value)
+    elif isinstance(value, Record):
+        if value.FLAT:
+            yield encode_record(value)
+        else:
+            yield from _encode(value.to_dict())
+    elif isinstance(value, dict):
+        yield "{"
+        for index, (key, item) in enumerate(value.items()):
+            yield (", " if index else "") + encode_basestring_ascii(key) + ": "
+            yield from _encode(item)
+        yield "}"
+    else:
+        # Lists, and generators that are still producing items
+        yield "["
+        for index, item in enumerate(value):
+            if index:
+                yield ", "
+            if isinstance(item, Record) and item.FLAT:
+                yield encode_record(item)
+            else:
+                yield from _encode(item)
+        yield "]"
+
+
+def chunked(pieces: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Join small pieces of text into chunks of roughly `size` characters."""
+    buffer: List[str] = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def iterencode(tree: Any) -> Iterator[str]:
+    """Encode `tree` like dumps(), yielding the text in chunks as it is produced."""
+    return chunked(_encode(tree))
@@ -0,0 +1,756 @@
+"""
+The parsers of the original get_keybinds.py, get_nvim_keybinds.py and
+get_terminal_keybinds.py, as the reference keybinds.golden holds the
+current ones to.
+
+Nothing here is used to build the cheatsheet. The tabs these parsers
+produce are the golden outputs: the current output of each tab has to
+equal them up to the reviewed deltas recorded in golden.json. The kitty,
+kitty_grab and alias parsers are also the oracle the fuzzer diffs the
+current ones against, on inputs in the grammar these regexes accept.
+
+The code is kept as it was; only the fixed /etc/nixos paths (now relative
+to the config root) and the argument parsing are gone. Do not fix bugs
+here: an intended change in the output is a delta in golden.json.
+"""
+import os
+import re
+from typing import Any, Callable, Dict, List
+
+from keybinds.common import config_path
+
+NIX_KEYBINDS_FILE = "home/modules/hyprland/keybinds.nix"
+NIX_NIXVIM_FILE = "home/modules/nixvim.nix"
+NIX_BASE_DIR = "home/modules"
+
+
+# get_keybinds.py
+
+TITLE_REGEX = "#+!"
+HIDE_COMMENT = "[hidden]"
+MOD_SEPARATORS = ['+', ' ']
+COMMENT_BIND_PATTERN = "#/#"
+content_lines = []
+reading_line = 0
+
+
+class KeyBinding(dict):
+    def __init__(self, mods, key, dispatcher, params, comment) -> None:
+        self["mods"] = mods
+        self["key"] = key
+        self["dispatcher"] = dispatcher
+        self["params"] = params
+        self["comment"] = comment
+
+
+class Section(dict):
+    def __init__(self, children, keybinds, name) -> None:
+        self["children"] = children
+        self["keybinds"] = keybinds
+        self["name"] = name
+
+
+def read_nix_extraconfig(path: str) -> str:
+    """Read a Nix file and extract the content from extraConfig = ''...''"""
+    expanded_path = os.path.expanduser(os.path.expandvars(path))
+    if not os.access(expanded_path, os.R_OK):
+        return "error"
+
+    with open(expanded_path, "r") as file:
+        content = file.read()
+
+    # Find extraConfig = '' and extract content until closing '';
+    # Handle the Nix multiline string format
+    match = re.search(r"extraConfig\s*=\s*''(.*?)'';", content, re.DOTALL)
+    if match:
+        return match.group(1)
+    return "error"
+
+
+def autogenerate_comment(dispatcher: str, params: str = "") -> str:
+    match dispatcher:
+        case "resizewindow":
+            return "Resize window"
+
+        case "movewindow":
+            if params == "":
+                return "Move window"
+            else:
+                return "Window: move in {} direction".format({
+                    "l": "left",
+                    "r": "right",
+                    "u": "up",
+                    "d": "down",
+                }.get(params, "null"))
+
+        case "pin":
+            return "Window: pin (show on all workspaces)"
+
+        case "splitratio":
+            return "Window split ratio {}".format(params)
+
+        case "togglefloating":
+            return "Float/unfloat window"
+
+        case "resizeactive":
+            return "Resize window by {}".format(params)
+
+        case "killactive":
+            return "Close window"
+
+        case "fullscreen":
+            return "Toggle {}".format(
+                {
+                    "0": "fullscreen",
+                    "1": "maximization",
+                    "2": "fullscreen on Hyprland's side",
+                }.get(params, "null")
+            )
+
+        case "fakefullscreen":
+            return "Toggle fake fullscreen"
+
+        case "workspace":
+            if params == "+1":
+                return "Workspace: focus right"
+            elif params == "-1":
+                return "Workspace: focus left"
+            return "Focus workspace {}".format(params)
+
+        case "movefocus":
+            return "Window: move focus {}".format(
+                {
+                    "l": "left",
+                    "r": "right",
+                    "u": "up",
+                    "d": "down",
+                }.get(params, "null")
+            )
+
+        case "swapwindow":
+            return "Window: swap in {} direction".format(
+                {
+                    "l": "left",
+                    "r": "right",
+                    "u": "up",
+                    "d": "down",
+                }.get(params, "null")
+            )
+
+        case "movetoworkspace":
+            if params == "+1":
+                return "Window: move to right workspace (non-silent)"
+            elif params == "-1":
+                return "Window: move to left workspace (non-silent)"
+            return "Window: move to workspace {} (non-silent)".format(params)
+
+        case "movetoworkspacesilent":
+            if params == "+1":
+                return "Window: move to right workspace"
+            elif params == "-1":
+                return "Window: move to right workspace"
+            return "Window: move to workspace {}".format(params)
+
+        case "togglespecialworkspace":
+            return "Workspace: toggle special"
+
+        case "exec":
+            return "Execute: {}".format(params)
+
+        case _:
+            return ""
+
+
+def get_keybind_at_line(line_number, line_start=0):
+    global content_lines
+    line = content_lines[line_number].strip()
+
+    # Handle the line starting after any comment pattern prefix
+    if line.startswith(COMMENT_BIND_PATTERN):
+        line = line[len(COMMENT_BIND_PATTERN):].lstrip()
+
+    # Split on first = to separate bind type from the rest
+    if '=' not in line:
+        return None
+    bind_type, keys = line.split("=", 1)
+    bind_type = bind_type.strip()
+    keys, *comment = keys.split("#", 1)
+
+    # Bind types with 'd' have an extra description field: bindd/bindld/bindde = Mods, Key, Description, Dispatcher, Params
+    # Regular bind types: bind/bindl/binde/bindm/bindr/bindn/bindp = Mods, Key, Dispatcher, Params
+    # The 'd' can appear anywhere after 'bind', e.g.: bindd, bindld, binddle, bindrde
+    is_bindd = 'd' in bind_type[4:] if len(bind_type) > 4 else False
+
+    if is_bindd:
+        parts = list(map(str.strip, keys.split(",", 5)))
+        if len(parts) < 4:
+            return None
+        mods, key, description, dispatcher, *params = parts
+        params = ", ".join(map(str.strip, params))
+    else:
+        parts = list(map(str.strip, keys.split(",", 4)))
+        if len(parts) < 3:
+            return None
+        mods, key, dispatcher, *params = parts
+        params = ", ".join(map(str.strip, params))
+        description = ""
+
+    # Remove empty spaces from comment
+    comment = list(map(str.strip, comment))
+    # Add comment if it exists, else use description or generate it
+    if comment:
+        comment = comment[0]
+        if comment.startswith("[hidden]"):
+            return None
+    elif description:
+        comment = description
+    else:
+        comment = autogenerate_comment(dispatcher, params)
+
+    if mods:
+        modstring = mods + MOD_SEPARATORS[0]  # Add separator at end to ensure last mod is read
+        mods = []
+        p = 0
+        for index, char in enumerate(modstring):
+            if char in MOD_SEPARATORS:
+                if index - p > 1:
+                    mods.append(modstring[p:index])
+                p = index + 1
+    else:
+        mods = []
+
+    return KeyBinding(mods, key, dispatcher, params, comment)
+
+
+def get_binds_recursive(current_content, scope):
+    global content_lines
+    global reading_line
+
+    while reading_line < len(content_lines):
+        line = content_lines[reading_line]
+        stripped_line = line.strip()
+        heading_search_result = re.search(TITLE_REGEX, stripped_line)
+
+        if (heading_search_result is not None) and (heading_search_result.start() == 0):
+            # Determine scope - count # before !
+            heading_scope = stripped_line.find('!')
+            # Lower or equal scope? Return to parent
+            if heading_scope <= scope:
+                reading_line -= 1
+                return current_content
+
+            section_name = stripped_line[(heading_scope + 1):].strip()
+            reading_line += 1
+            current_content["children"].append(get_binds_recursive(Section([], [], section_name), heading_scope))
+
+        elif stripped_line.startswith(COMMENT_BIND_PATTERN):
+            keybind = get_keybind_at_line(reading_line, line_start=len(COMMENT_BIND_PATTERN))
+            if keybind is not None:
+                current_content["keybinds"].append(keybind)
+
+        elif stripped_line == "" or not stripped_line.startswith("bind"):
+            pass
+
+        else:
+            keybind = get_keybind_at_line(reading_line)
+            if keybind is not None:
+                current_content["keybinds"].append(keybind)
+
+        reading_line += 1
+
+    return current_content
+
+
+def parse_keys(path: str) -> Dict[str, List[KeyBinding]]:
+    global content_lines
+    global reading_line
+    reading_line = 0
+
+    raw_content = read_nix_extraconfig(path)
+    if raw_content == "error":
+        return {"children": [], "keybinds": [], "name": ""}
+
+    content_lines = raw_content.splitlines()
+    return get_binds_recursive(Section([], [], ""), 0)
+
+
+def parse_hyprland_config(text: str) -> Dict[str, Any]:
+    """parse_keys() of Hyprland config text instead of a file."""
+    global content_lines
+    global reading_line
+    reading_line = 0
+    content_lines = text.splitlines()
+    return get_binds_recursive(Section([], [], ""), 0)
+
+
+def hyprland_tree() -> Dict[str, Any]:
+    """The hyprland tab, as get_keybinds.py printed it."""
+    return parse_keys(config_path(NIX_KEYBINDS_FILE))
+
+
+# get_nvim_keybinds.py
+
+def read_file(path: str) -> str:
+    """Read a file and return its content."""
+    expanded_path = os.path.expanduser(os.path.expandvars(path))
+    if not os.access(expanded_path, os.R_OK):
+        return ""
+    with open(expanded_path, "r") as file:
+        return file.read()
+
+
+def parse_nixvim_keybinds(content: str) -> Dict[str, Any]:
+    """Parse nixvim.nix content and extract keybinds from keymaps section."""
+    result = {
+        "children": []
+    }
+
+    # Pattern to match nixvim keymap entries:
+    # { mode = "n"; key = "<leader>cc"; action = "<cmd>...<CR>"; options.desc = "..."; }
+    keymap_pattern = r'\{\s*mode\s*=\s*"([^"]+)";\s*key\s*=\s*"([^"]+)";\s*action\s*=\s*"([^"]+)";\s*options\.desc\s*=\s*"([^"]+)";\s*\}'
+
+    # Group keybinds by mode
+    mode_keybinds = {
+        'n': [],
+        'i': [],
+        't': [],
+        'v': [],
+        'x': [],
+    }
+
+    for match in re.finditer(keymap_pattern, content):
+        mode = match.group(1)
+        key = match.group(2)
+        action = match.group(3)
+        desc = match.group(4)
+
+        # Parse the key into mods and key
+        mods, main_key = parse_vim_key(key)
+
+        keybind = {
+            "mods": mods,
+            "key": main_key,
+            "action": action,
+            "comment": desc
+        }
+
+        if mode in mode_keybinds:
+            mode_keybinds[mode].append(keybind)
+        else:
+            mode_keybinds[mode] = [keybind]
+
+    # Build result structure
+    mode_names = {
+        'n': "Normal Mode",
+        'i': "Insert Mode",
+        't': "Terminal Mode",
+        'v': "Visual Mode",
+        'x': "Visual Block Mode",
+    }
+
+    for mode, keybinds in mode_keybinds.items():
+        if keybinds:
+            mode_name = mode_names.get(mode, f"{mode.upper()} Mode")
+            result["children"].append({
+                "name": mode_name,
+                "keybinds": keybinds,
+                "children": []
+            })
+
+    return result
+
+
+def parse_vim_key(key: str) -> tuple:
+    """Parse a vim key notation into mods and main key."""
+    mods = []
+    main_key = key
+
+    # Handle <leader> prefix
+    if key.startswith("<leader>"):
+        mods.append("Leader")
+        main_key = key[8:]  # Remove <leader>
+
+    # Handle modifier keys like <C-s>, <S-Tab>, <C-S-x>
+    mod_pattern = r'^<([CSAM])-(.+)>$'
+    match = re.match(mod_pattern, main_key)
+    while match:
+        mod_char = match.group(1)
+        if mod_char == 'C':
+            mods.append('Ctrl')
+        elif mod_char == 'S':
+            mods.append('Shift')
+        elif mod_char == 'A':
+            mods.append('Alt')
+        elif mod_char == 'M':
+            mods.append('Meta')
+        main_key = match.group(2)
+        # Check if there are more modifiers
+        if main_key.startswith('<'):
+            match = re.match(mod_pattern, main_key)
+        else:
+            break
+
+    # Handle special keys
+    special_keys = {
+        '<Tab>': 'Tab',
+        '<S-Tab>': 'Shift+Tab',
+        '<CR>': 'Enter',
+        '<Esc>': 'Esc',
+        '<Space>': 'Space',
+        '<BS>': 'Backspace',
+    }
+
+    if main_key in special_keys:
+        main_key = special_keys[main_key]
+    elif main_key.startswith('<') and main_key.endswith('>'):
+        # Remove angle brackets for other special keys
+        main_key = main_key[1:-1]
+
+    return mods, main_key
+
+
+def nvim_tree() -> Dict[str, Any]:
+    """The nvim tab, as get_nvim_keybinds.py printed it."""
+    content = read_file(config_path(NIX_NIXVIM_FILE))
+    if not content:
+        return {"children": []}
+    return parse_nixvim_keybinds(content)
+
+
+# get_terminal_keybinds.py
+
+def parse_kitty_keybinds(content: str) -> List[Dict[str, Any]]:
+    """Parse kitty.nix extraConfig for keybinds."""
+    keybinds = []
+
+    # Find extraConfig section
+    extra_match = re.search(r"extraConfig\s*=\s*''(.*?)'';", content, re.DOTALL)
+    if not extra_match:
+        return keybinds
+
+    extra_content = extra_match.group(1)
+    current_section = "General"
+
+    for line in extra_content.split('\n'):
+        line = line.strip()
+
+        # Check for section comments
+        if line.startswith('#') and not line.startswith('#map'):
+            section_text = line.lstrip('#').strip()
+            if section_text and len(section_text) < 30:
+                current_section = section_text
+            continue
+
+        # Parse map statements
+        # Format: map <key> <action> [args]
+        map_match = re.match(r'^map\s+(\S+)\s+(\S+)(.*)$', line)
+        if map_match:
+            key = map_match.group(1)
+            action = map_match.group(2)
+            args = map_match.group(3).strip() if map_match.group(3) else ""
+
+            # Check for inline comment
+            comment = ""
+            if '#' in args:
+                args, comment = args.split('#', 1)
+                args = args.strip()
+                comment = comment.strip()
+
+            # Generate description if no comment
+            if not comment:
+                comment = format_kitty_action(action, args)
+
+            mods, main_key = parse_kitty_key(key)
+
+            keybinds.append({
+                "mods": mods,
+                "key": main_key,
+                "action": action,
+                "comment": comment,
+                "section": current_section
+            })
+
+    return keybinds
+
+
+def parse_kitty_key(key: str) -> tuple:
+    """Parse kitty key notation into mods and main key."""
+    mods = []
+    parts = key.split('+')
+
+    mod_map = {
+        'ctrl': 'Ctrl',
+        'shift': 'Shift',
+        'alt': 'Alt',
+        'super': 'Super',
+    }
+
+    main_key = parts[-1]
+    for part in parts[:-1]:
+        mod = mod_map.get(part.lower(), part)
+        mods.append(mod)
+
+    return mods, main_key
+
+
+def parse_kitty_grab_keybinds(content: str) -> List[Dict[str, Any]]:
+    """Parse kitty_grab keybinds from grab.conf defined in kitty.nix."""
+    keybinds = []
+
+    # Find grab.conf content in home.file definition
+    grab_match = re.search(
+        r'home\.file\.".config/kitty/grab\.conf"\.text\s*=\s*\'\'(.*?)\'\';',
+        content,
+        re.DOTALL
+    )
+    if not grab_match:
+        return keybinds
+
+    grab_content = grab_match.group(1)
+    current_section = "General"
+
+    for line in grab_content.split('\n'):
+        line = line.strip()
+
+        # Check for section comments
+        if line.startswith('#') and not line.startswith('# '):
+            continue
+        if line.startswith('# '):
+            section_text = line[2:].strip()
+            if section_text and len(section_text) < 30:
+                current_section = section_text
+            continue
+
+        # Parse map statements: map <key> <action> [args...]
+        map_match = re.match(r'^map\s+(\S+)\s+(.+)$', line)
+        if map_match:
+            key = map_match.group(1)
+            action_full = map_match.group(2).strip()
+
+            # Generate description
+            comment = format_grab_action(action_full)
+
+            mods, main_key = parse_kitty_key(key)
+
+            keybinds.append({
+                "mods": mods,
+                "key": main_key,
+                "action": action_full,
+                "comment": comment,
+                "section": current_section
+            })
+
+    return keybinds
+
+
+def format_grab_action(action: str) -> str:
+    """Generate human-readable description for kitty_grab actions."""
+    action_map = {
+        'quit': 'Quit without copying',
+        'confirm': 'Copy selection and quit',
+        'move left': 'Move left',
+        'move down': 'Move down',
+        'move up': 'Move up',
+        'move right': 'Move right',
+        'move word': 'Move to next word',
+        'move word_end': 'Move to word end',
+        'move word_end left': 'Move to previous word',
+        'move first': 'Move to line start',
+        'move last': 'Move to line end',
+        'move top': 'Move to top',
+        'move bottom': 'Move to bottom',
+        'move page up': 'Page up',
+        'move page down': 'Page down',
+        'set_mode visual': 'Enter visual mode',
+        'set_mode block': 'Enter block select mode',
+        'select stream left first': 'Select entire line',
+        'scroll up': 'Scroll up',
+        'scroll down': 'Scroll down',
+    }
+
+    return action_map.get(action, action.replace('_', ' ').title())
+
+
+def format_kitty_action(action: str, args: str) -> str:
+    """Generate human-readable description for kitty actions."""
+    action_map = {
+        'paste_from_selection': 'Paste from selection',
+        'scroll_line_up': 'Scroll up one line',
+        'scroll_line_down': 'Scroll down one line',
+        'scroll_page_up': 'Scroll page up',
+        'scroll_page_down': 'Scroll page down',
+        'scroll_home': 'Scroll to top',
+        'scroll_end': 'Scroll to bottom',
+        'show_scrollback': 'Show scrollback',
+        'new_window_with_cwd': 'New window (same dir)',
+        'new_os_window': 'New OS window',
+        'close_window': 'Close window',
+        'next_window': 'Next window',
+        'previous_window': 'Previous window',
+        'move_window_forward': 'Move window forward',
+        'move_window_backward': 'Move window backward',
+        'move_window_to_top': 'Move window to top',
+        'first_window': 'Go to window 1',
+        'second_window': 'Go to window 2',
+        'third_window': 'Go to window 3',
+        'fourth_window': 'Go to window 4',
+        'fifth_window': 'Go to window 5',
+        'sixth_window': 'Go to window 6',
+        'seventh_window': 'Go to window 7',
+        'eighth_window': 'Go to window 8',
+        'ninth_window': 'Go to window 9',
+        'tenth_window': 'Go to window 10',
+        'next_tab': 'Next tab',
+        'previous_tab': 'Previous tab',
+        'new_tab': 'New tab',
+        'close_tab': 'Close tab',
+        'next_layout': 'Next layout',
+        'move_tab_forward': 'Move tab forward',
+        'move_tab_backward': 'Move tab backward',
+        'increase_font_size': 'Increase font size',
+        'decrease_font_size': 'Decrease font size',
+        'restore_font_size': 'Restore font size',
+    }
+
+    if action in action_map:
+        return action_map[action]
+
+    if action == 'launch':
+        if '--location=hsplit' in args:
+            return 'Horizontal split'
+        elif '--location=vsplit' in args:
+            return 'Vertical split'
+        return f'Launch: {args}'
+
+    if action == 'kitten':
+        if 'kitty_grab' in args:
+            return 'Vim-style visual selection'
+        if 'kitty_scrollback' in args:
+            return 'Browse scrollback in Neovim'
+        return f'Kitten: {args}'
+
+    if action == 'kitty_scrollback_nvim':
+        return 'Browse scrollback in Neovim'
+
+    return action.replace('_', ' ').title()
+
+
+def parse_shell_aliases(content: str, source_name: str) -> List[Dict[str, Any]]:
+    """Parse shellAliases from a Nix file."""
+    aliases = []
+
+    # Find shellAliases blocks
+    patterns = [
+        r'shellAliases\s*=\s*\{([^}]+)\}',
+        r'home\.shellAliases\s*=\s*\{([^}]+)\}',
+    ]
+
+    for pattern in patterns:
+        for match in re.finditer(pattern, content, re.DOTALL):
+            block = match.group(1)
+
+            # Parse each alias
+            alias_pattern = r'(\w+(?:-\w+)*)\s*=\s*"([^"]+)"'
+            for alias_match in re.finditer(alias_pattern, block):
+                name = alias_match.group(1)
+                command = alias_match.group(2)
+
+                aliases.append({
+                    "name": name,
+                    "command": command,
+                    "source": source_name
+                })
+
+    return aliases
+
+
+def group_keybinds_by_section(keybinds: List[Dict]) -> List[Dict]:
+    """Group keybinds by their section."""
+    sections = {}
+    for kb in keybinds:
+        section = kb.get('section', 'General')
+        if section not in sections:
+            sections[section] = []
+        sections[section].append({
+            "mods": kb['mods'],
+            "key": kb['key'],
+            "comment": kb['comment']
+        })
+
+    return [{"name": name, "keybinds": kbs, "children": []} for name, kbs in sections.items()]
+
+
+def terminal_tree() -> Dict[str, Any]:
+    """The terminal tab, as get_terminal_keybinds.py printed it."""
+    NIX_BASE_PATH = config_path(NIX_BASE_DIR)
+    result = {"children": []}
+
+    # Parse kitty keybinds
+    kitty_content = read_file(f"{NIX_BASE_PATH}/kitty.nix")
+    if kitty_content:
+        kitty_keybinds = parse_kitty_keybinds(kitty_content)
+        if kitty_keybinds:
+            kitty_sections = group_keybinds_by_section(kitty_keybinds)
+            result["children"].append({
+                "name": "Kitty",
+                "keybinds": [],
+                "children": kitty_sections
+            })
+
+        # Parse kitty_grab keybinds from same file
+        grab_keybinds = parse_kitty_grab_keybinds(kitty_content)
+        if grab_keybinds:
+            grab_sections = group_keybinds_by_section(grab_keybinds)
+            result["children"].append({
+                "name": "Kitty Grab (Alt+G)",
+                "keybinds": [],
+                "children": grab_sections
+            })
+
+    # Parse shell aliases from various sources
+    all_aliases = []
+
+    alias_sources = [
+        (f"{NIX_BASE_PATH}/zsh/default.nix", "ZSH"),
+        (f"{NIX_BASE_PATH}/eza.nix", "Eza"),
+        (f"{NIX_BASE_PATH}/claude.nix", "Claude"),
+    ]
+
+    for path, source in alias_sources:
+        content = read_file(path)
+        if content:
+            aliases = parse_shell_aliases(content, source)
+            all_aliases.extend(aliases)
+
+    if all_aliases:
+        # Deduplicate aliases by name (keep first occurrence)
+        seen = set()
+        unique_aliases = []
+        for alias in all_aliases:
+            if alias['name'] not in seen:
+                seen.add(alias['name'])
+                unique_aliases.append(alias)
+
+        # Convert aliases to keybind-like format for display
+        alias_keybinds = []
+        for alias in unique_aliases:
+            alias_keybinds.append({
+                "mods": [],
+                "key": alias['name'],
+                "comment": alias['command']
+            })
+
+        result["children"].append({
+            "name": "Shell Aliases",
+            "keybinds": alias_keybinds,
+            "children": []
+        })
+
+    return result
+
+
+TABS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "hyprland": hyprland_tree,
+    "nvim": nvim_tree,
+    "terminal": terminal_tree,
+}
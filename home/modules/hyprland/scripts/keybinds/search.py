@@ -0,0 +1,211 @@
+"""
+Search index over the keybinds, aliases and keymaps of the cheatsheet tabs.
+
+Each tab gets its own SearchIndex, built from its parsed tree and saved next
+to the tree: as <tab>.search.json in the build-time snapshot, and as a
+"<tab>-search" entry in the on-disk cache. The daemon keeps the indexes in
+memory, so a query as the user types only touches the candidate entries.
+
+Every entry is indexed by the trigrams of its searchable fields (chord, key,
+modifiers, comment, section, dispatcher/params or action) and by the one-
+and two-character prefixes of their words. A query is split into terms;
+each term narrows the candidates through the trigram postings (or the prefix
+postings for terms shorter than a trigram), and the survivors are ranked by
+how well and in which fields the terms match: an exact field beats a word
+prefix beats a substring, weighted by FIELD_WEIGHTS.
+"""
+import heapq
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from keybinds.records import SECTION_SEPARATOR, binding_items, iter_bindings
+
+SEARCH_VERSION = 1
+DEFAULT_LIMIT = 20
+
+# Weight of a match in each field; "chord" is mods and key as "super+shift+q"
+FIELD_WEIGHTS = {
+    "chord": 8,
+    "key": 6,
+    "comment": 5,
+    "mods": 3,
+    "dispatcher": 2,
+    "action": 2,
+    "section": 1,
+    "params": 1,
+}
+
+# Multipliers for how a term matches a field value
+EXACT, WORD_PREFIX, SUBSTRING = 4, 2, 1
+
+_WORD = re.compile(r"\w+")
+
+
+def iter_entries(tab: str, tree: Any) -> Iterator[Dict[str, Any]]:
+    """One entry per binding of `tree` (records or decoded JSON), in document order."""
+    for path, binding in iter_bindings(tree):
+        entry: Dict[str, Any] = {"tab": tab, "section": SECTION_SEPARATOR.join(path)}
+        for field, value in binding_items(binding):
+            entry[field] = list(value) if field == "mods" else value
+        # Kitty maps keep their raw action outside the serialized fields
+        action = getattr(binding, "action", "")
+        if action and "action" not in entry:
+            entry["action"] = action
+        yield entry
+
+
+def _fields(entry: Dict[str, Any]) -> List[Tuple[int, str, List[str]]]:
+    """(weight, lowercased text, words) of each field an entry is searched by."""
+    mods = [mod.lower() for mod in entry.get("mods", [])]
+    key = entry.get("key", "").lower()
+    fields = [("chord", "+".join(mods + [key])), ("key", key), ("mods", " ".join(mods))]
+    for field in ("comment", "section", "dispatcher", "params", "action"):
+        value = entry.get(field)
+        if value:
+            fields.append((field, value.lower()))
+    # Keys like "," or "+" have no word characters; they are their own word
+    return [(FIELD_WEIGHTS[field], text, _WORD.findall(text) or [text])
+            for field, text in fields if text]
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Trigram and word-prefix postings over the entries of one tab.
+
+    Trigram postings are in document order. Prefix postings are ranked by
+    the score of their prefix, so a one-term query of one or two characters
+    (the first keystrokes) just takes the head of one list.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]],
+                 trigrams: Optional[Dict[str, List[int]]] = None,
+                 prefixes: Optional[Dict[str, List[int]]] = None) -> None:
+        self.entries = entries
+        self._fields = [_fields(entry) for entry in entries]
+        if trigrams is None or prefixes is None:
+            trigrams, prefixes = self._build()
+        self.trigrams = trigrams
+        self.prefixes = prefixes
+
+    def _build(self) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+        trigrams: Dict[str, List[int]] = {}
+        ranked: Dict[str, List[Tuple[int, int]]] = {}
+        for index, fields in enumerate(self._fields):
+            grams: Set[str] = set()
+            starts: Set[str] = set()
+            for _, text, words in fields:
+                grams |= _trigrams(text)
+                for word in words:
+                    starts.add(word[:1])
+                    starts.add(word[:2])
+            # Sorted, so the saved index does not depend on string hashing
+            for gram in sorted(grams):
+                trigrams.setdefault(gram, []).append(index)
+            for start in sorted(starts):
+                ranked.setdefault(start, []).append((-self._score(index, [start]), index))
+        prefixes = {start: [index for _, index in sorted(hits)] for start, hits in ranked.items()}
+        return trigrams, prefixes
+
+    def _candidates(self, term: str) -> Iterable[int]:
+        if len(term) < 3:
+            return self.prefixes.get(term, ())
+        postings = []
+        for gram in _trigrams(term):
+            posting = self.trigrams.get(gram)
+            if posting is None:
+                return ()
+            postings.append(posting)
+        postings.sort(key=len)
+        found = set(postings[0])
+        for posting in postings[1:]:
+            found.intersection_update(posting)
+            if not found:
+                break
+        return found
+
+    def _score(self, index: int, terms: List[str]) -> int:
+        """Sum of each term's best field match; terms shorter than a trigram
+        only match at the start of a word."""
+        total = 0
+        fields = self._fields[index]
+        for term in terms:
+            best = 0
+            substring = SUBSTRING if len(term) >= 3 else 0
+            for weight, text, words in fields:
+                if term not in text:
+                    continue
+                if text == term:
+                    match = EXACT * weight
+                else:
+                    for word in words:
+                        if word.startswith(term):
+                            match = WORD_PREFIX * weight
+                            break
+                    else:
+                        match = substring * weight
+                if match > best:
+                    best = match
+            if not best:
+                return 0  # Every term has to match somewhere
+            total += best
+        return total
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Tuple[int, int]]:
+        """(score, entry index) of the best matches, best first."""
+        terms = query.lower().split()
+        if not terms:
+            return []
+        if len(terms) == 1 and len(terms[0]) < 3:
+            return [(self._score(index, terms), index) for index in self.prefixes.get(terms[0], ())[:limit]]
+        candidates: Optional[Set[int]] = None
+        # Most selective (longest) terms first
+        for term in sorted(terms, key=len, reverse=True):
+            found = self._candidates(term)
+            candidates = set(found) if candidates is None else candidates.intersection(found)
+            if not candidates:
+                return []
+        # Negated scores, so ties keep document order
+        scored = ((-self._score(index, terms), index) for index in candidates)
+        return [(-negated, index) for negated, index in heapq.nsmallest(
+            limit, (hit for hit in scored if hit[0]))]
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "version": SEARCH_VERSION,
+            "entries": self.entries,
+            "trigrams": self.trigrams,
+            "prefixes": self.prefixes,
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: str) -> Optional["SearchIndex"]:
+        """Load a saved index; None if it is unreadable or from another version."""
+        try:
+            data = json.loads(text)
+            if data["version"] != SEARCH_VERSION:
+                return None
+            return cls(data["entries"], data["trigrams"], data["prefixes"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+
+def build(tab: str, tree: Any) -> SearchIndex:
+    return SearchIndex(list(iter_entries(tab, tree)))
+
+
+def search(indexes: List[SearchIndex], query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """Ranked hits across several tabs' indexes, each entry with its score."""
+    hits = []
+    for order, index in enumerate(indexes):
+        hits.extend((-score, order, entry) for score, entry in index.search(query, limit))
+    hits.sort()
+    return [dict(indexes[order].entries[entry], score=-negated)
+            for negated, order, entry in hits[:limit]]
+
+
+def dumps(hits: List[Dict[str, Any]]) -> str:
+    return json.dumps(hits)
@@ -0,0 +1,99 @@
+"""
+Build-time cheatsheet snapshots.
+
+quickshell.nix runs `get_all_keybinds.py --snapshot DIR` inside the
+quickshell-config-merged derivation, with KEYBINDS_CONFIG_ROOT pointing at a
+store copy of the Nix sources. Each tab's JSON is written to
+DIR/v<SNAPSHOT_VERSION>/<tab>.json, with its search index (keybinds.search)
+next to it as <tab>.search.json. At runtime the scripts stream those files
+verbatim (no parsing, no JSON decoding) unless live parsing of /etc/nixos is
+requested with --live or KEYBINDS_LIVE=1. Snapshots always hold trees;
+--format flat converts them when they are read. Streaming a tree is the
+startup path of every cheatsheet open, so the encoders and the search index
+are only imported by the functions that need them.
+"""
+import os
+
+from keybinds import profiling, tabs
+
+SNAPSHOT_VERSION = 1
+LIVE_ENV = "KEYBINDS_LIVE"
+
+# get_*_keybinds.py live next to the keybinds package; snapshots next to them
+DEFAULT_SNAPSHOT_BASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "keybinds-snapshot")
+
+
+def live_requested() -> bool:
+    return os.environ.get(LIVE_ENV, "") not in ("", "0")
+
+
+def snapshot_dir(base: str | None = None) -> str:
+    return os.path.join(base or DEFAULT_SNAPSHOT_BASE, f"v{SNAPSHOT_VERSION}")
+
+
+def write(base: str, selected: list[str]) -> None:
+    """Parse `selected` tabs and write one snapshot file per tab."""
+    from keybinds import records, search
+    directory = snapshot_dir(base)
+    os.makedirs(directory, exist_ok=True)
+    for tab in selected:
+        tree = tabs.load(tab).build_tree()
+        with open(os.path.join(directory, f"{tab}.json"), "w") as file:
+            file.write(records.dumps(tree))
+        with open(os.path.join(directory, f"{tab}.search.json"), "w") as file:
+            file.write(search.build(tab, tree).to_json())
+
+
+def _read(name: str, base: str | None) -> str | None:
+    try:
+        with open(os.path.join(snapshot_dir(base), name), "r") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def read(tab: str, base: str | None = None) -> str | None:
+    return _read(f"{tab}.json", base)
+
+
+def read_index(tab: str, base: str | None = None):
+    """The tab's saved search index; built from its tree if the file is missing."""
+    from keybinds import search
+    text = _read(f"{tab}.search.json", base)
+    index = search.SearchIndex.from_json(text) if text is not None else None
+    if index is None:
+        tree = read(tab, base)
+        if tree is None:
+            return None
+        import json
+        index = search.build(tab, json.loads(tree))
+    return index
+
+
+@profiling.timed("snapshot.load")
+def load(selected: list[str], single: bool = False, base: str | None = None,
+         fmt: str = "tree") -> str | None:
+    """Prebuilt output for `selected`, shaped like tabs.produce(), or None."""
+    parts = {}
+    for tab in selected:
+        text = read(tab, base)
+        if text is None:
+            return None
+        if fmt == "flat":
+            from keybinds import flat
+            text = flat.convert(text)
+        parts[tab] = text
+    if single:
+        return parts[selected[0]]
+    return tabs.combine(parts)
+
+
+def load_indexes(selected: list[str], base: str | None = None) -> list | None:
+    """Saved search indexes for `selected`, or None if any tab has no snapshot."""
+    indexes = []
+    for tab in selected:
+        index = read_index(tab, base)
+        if index is None:
+            return None
+        indexes.append(index)
+    return indexes
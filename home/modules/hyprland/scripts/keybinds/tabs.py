@@ -0,0 +1,167 @@
+"""
+Registry of cheatsheet tabs and their parser modules.
+
+Every parser module exposes the same small interface:
+    TAB            tab name used on the command line and by the daemon
+    sources()      source files whose contents determine the tree
+    build_tree()   the parsed tree (records, dicts and lists; see keybinds.records)
+    iter_json()    the tree's JSON in chunks, produced while parsing
+    iter_chords()  (layer, section path, binding) for keybinds.conflicts
+    file_steps()   (memo step, source file, parse function) for keybinds.hosts
+    _memo          per-file FileMemo reused by long-running modes
+
+Reading a build-time snapshot only needs the registry, so the parser,
+encoder, cache and search modules are imported by the functions using them.
+"""
+import os
+import sys
+
+from keybinds import profiling
+
+TAB_MODULES = {
+    "hyprland": "keybinds.hyprland",
+    "nvim": "keybinds.nvim",
+    "terminal": "keybinds.terminal",
+}
+ALL_TABS = list(TAB_MODULES)
+
+# Output formats: nested trees, or string table plus arrays (keybinds.flat)
+FORMATS = ["tree", "flat"]
+
+# Helper modules shared by the parsers; their code also shapes the output
+SHARED_MODULES = ["chords.py", "flat.py", "nixlex.py", "records.py", "variables.py"]
+
+
+def load(tab: str):
+    """Import the parser module for `tab` (deferred until it is needed)."""
+    module = sys.modules.get(TAB_MODULES[tab])
+    if module is None:
+        import importlib
+        with profiling.stage(f"{tab}.import"):
+            module = importlib.import_module(TAB_MODULES[tab])
+    return module
+
+
+def build(tab: str):
+    """The parsed tree of `tab`; profiled per tab."""
+    with profiling.stage(f"{tab}.build"):
+        tree = load(tab).build_tree()
+    if profiling.ENABLED:
+        profiling.peak(tab)
+    return tree
+
+
+def _iter_json(tab: str):
+    # The stage includes the time the consumer takes to write each chunk
+    with profiling.stage(f"{tab}.stream"):
+        yield from load(tab).iter_json()
+    if profiling.ENABLED:
+        profiling.peak(tab)
+
+
+def parse_tab_list(value: str) -> list[str]:
+    """Parse a comma-separated --tabs value, keeping order and dropping repeats."""
+    tabs = []
+    for tab in value.split(","):
+        tab = tab.strip()
+        if not tab:
+            continue
+        if tab not in TAB_MODULES:
+            raise ValueError(f"unknown tab '{tab}' (expected one of: {', '.join(ALL_TABS)})")
+        if tab not in tabs:
+            tabs.append(tab)
+    return tabs
+
+
+def sources(tabs: list[str]) -> list[str]:
+    """Union of the source files of `tabs`, in order."""
+    paths = []
+    for tab in tabs:
+        for path in load(tab).sources():
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def code_files(tabs: list[str]) -> list[str]:
+    """Parser module files, so cached output is invalidated by parser changes."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    return [load(tab).__file__ for tab in tabs] + [os.path.join(package_dir, name) for name in SHARED_MODULES]
+
+
+def invalidate(tabs: list[str], paths) -> None:
+    for tab in tabs:
+        load(tab)._memo.invalidate(paths)
+
+
+def _key(tab: str) -> str:
+    # Tab names are plain identifiers (TAB_MODULES), so no escaping is needed
+    return f'"{tab}"'
+
+
+def combine(parts: dict[str, str]) -> str:
+    """Join per-tab JSON documents into one {"tab": tree, ...} document.
+
+    Produces exactly what json.dumps() would for the equivalent dict, without
+    re-serializing trees that are already encoded.
+    """
+    return "{" + ", ".join(f"{_key(tab)}: {tree}" for tab, tree in parts.items()) + "}"
+
+
+def encode(tree, fmt: str = "tree") -> str:
+    """JSON text of a parsed tree in output format `fmt`."""
+    from keybinds import flat, records
+    return flat.dumps(tree) if fmt == "flat" else records.dumps(tree)
+
+
+def produce(tabs: list[str], single: bool = False, fmt: str = "tree") -> str:
+    """Serialize `tabs`: a bare tree if `single`, else the combined document."""
+    if single:
+        return encode(build(tabs[0]), fmt)
+    return combine({tab: encode(build(tab), fmt) for tab in tabs})
+
+
+def search_index(tab: str, use_cache: bool = True):
+    """The tab's search index (a keybinds.search.SearchIndex), saved in the
+    on-disk cache next to its output."""
+    from keybinds import cache, search
+    name = f"{tab}-search"
+    inputs = load(tab).sources() + code_files([tab]) + [search.__file__]
+    if use_cache:
+        text = cache.load(name, inputs)
+        index = search.SearchIndex.from_json(text) if text is not None else None
+        if index is not None:
+            return index
+    index = search.build(tab, build(tab))
+    if use_cache:
+        cache.store(name, inputs, index.to_json())
+    return index
+
+
+def conflict_report(tabs: list[str]) -> str:
+    """The --conflicts report over the bindings of `tabs`."""
+    from keybinds import conflicts
+
+    def entries():
+        for tab in tabs:
+            yield from load(tab).iter_chords()
+    return conflicts.dumps(conflicts.find_conflicts(entries()))
+
+
+def stream(tabs: list[str], single: bool = False, fmt: str = "tree"):
+    """Like produce(), but yields the text in chunks while the tabs are parsed.
+
+    The flat format needs the whole tree before its tables are complete, so
+    it is produced in one piece.
+    """
+    if fmt == "flat":
+        yield produce(tabs, single, fmt)
+        return
+    if single:
+        yield from _iter_json(tabs[0])
+        return
+    yield "{"
+    for index, tab in enumerate(tabs):
+        yield (", " if index else "") + _key(tab) + ": "
+        yield from _iter_json(tab)
+    yield "}"
@@ -0,0 +1,613 @@
+"""
+Terminal keybind and alias parser for Nix configurations.
+Reads keybinds from kitty.nix and aliases from every module under
+home/modules that sets shellAliases, for the quickshell cheatsheet.
+Used by get_terminal_keybinds.py and get_all_keybinds.py.
+"""
+import os
+import re
+from functools import partial
+from typing import Callable, Collection, Dict, Iterator, List, Any, Optional, Tuple
+
+from keybinds.cache import FileMemo, load_state, store_state
+from keybinds import nixlex, profiling
+from keybinds.common import config_path, config_root, read_file, read_files
+from keybinds.records import NO_MODS, TerminalKeyBinding, iterencode, mods as shared_mods
+
+NIX_BASE_DIR = "home/modules"
+
+TAB = "terminal"
+
+# Per-file parse results, reused across rebuilds in daemon/watch mode
+_memo = FileMemo()
+
+# map <key> <action> [args] in kitty.conf, and map <key> <action...> in grab.conf
+KITTY_MAP_PATTERN = re.compile(r'^map\s+(\S+)\s+(\S+)(.*)$')
+GRAB_MAP_PATTERN = re.compile(r'^map\s+(\S+)\s+(.+)$')
+
+
+def _count_lines(stage: str, text: str, maps: int) -> None:
+    """Profiling counters of a kitty config; every non-comment line is one regex match."""
+    lines = [line.strip() for line in text.split('\n')]
+    profiling.count(f"{stage}_lines", len(lines))
+    profiling.count(f"{stage}_regex_calls", sum(1 for line in lines if not line.startswith('#')))
+    profiling.count(f"{stage}_maps", maps)
+
+
+def _nix_strings(content: str, find, name: str) -> List[str]:
+    """Run a nixlex lookup, treating a file that does not lex as having no match."""
+    try:
+        return find(content, name)
+    except nixlex.NixLexError:
+        return []
+
+
+@profiling.timed("terminal.kitty")
+def parse_kitty_keybinds(content: str) -> List[TerminalKeyBinding]:
+    """Parse kitty.nix extraConfig for keybinds."""
+    keybinds = []
+
+    # Find extraConfig section
+    extra_blocks = _nix_strings(content, nixlex.find_strings, "extraConfig")
+    if not extra_blocks:
+        return keybinds
+
+    extra_content = extra_blocks[0]
+    current_section = "General"
+
+    for line in extra_content.split('\n'):
+        line = line.strip()
+
+        # Check for section comments
+        if line.startswith('#') and not line.startswith('#map'):
+            section_text = line.lstrip('#').strip()
+            if section_text and len(section_text) < 30:
+                current_section = section_text
+            continue
+
+        # Parse map statements
+        # Format: map <key> <action> [args]
+        map_match = KITTY_MAP_PATTERN.match(line)
+        if map_match:
+            key = map_match.group(1)
+            action = map_match.group(2)
+            args = map_match.group(3).strip() if map_match.group(3) else ""
+
+            # Check for inline comment
+            comment = ""
+            if '#' in args:
+                args, comment = args.split('#', 1)
+                args = args.strip()
+                comment = comment.strip()
+
+            # Generate description if no comment
+            if not comment:
+                comment = format_kitty_action(action, args)
+
+            mods, main_key = parse_kitty_key(key)
+
+            keybinds.append(TerminalKeyBinding(shared_mods(mods), main_key, comment, action, current_section))
+
+    if profiling.ENABLED:
+        _count_lines("terminal.kitty", extra_content, len(keybinds))
+
+    return keybinds
+
+
+def parse_kitty_key(key: str) -> tuple:
+    """Parse kitty key notation into mods and main key."""
+    mods = []
+    parts = key.split('+')
+
+    mod_map = {
+        'ctrl': 'Ctrl',
+        'shift': 'Shift',
+        'alt': 'Alt',
+        'super': 'Super',
+    }
+
+    main_key = parts[-1]
+    for part in parts[:-1]:
+        mod = mod_map.get(part.lower(), part)
+        mods.append(mod)
+
+    return mods, main_key
+
+
+@profiling.timed("terminal.kitty_grab")
+def parse_kitty_grab_keybinds(content: str) -> List[TerminalKeyBinding]:
+    """Parse kitty_grab keybinds from grab.conf defined in kitty.nix."""
+    keybinds = []
+
+    # Find grab.conf content in home.file definition
+    grab_blocks = _nix_strings(content, nixlex.find_home_file_text, ".config/kitty/grab.conf")
+    if not grab_blocks:
+        return keybinds
+
+    grab_content = grab_blocks[0]
+    current_section = "General"
+
+    for line in grab_content.split('\n'):
+        line = line.strip()
+
+        # Check for section comments
+        if line.startswith('#') and not line.startswith('# '):
+            continue
+        if line.startswith('# '):
+            section_text = line[2:].strip()
+            if section_text and len(section_text) < 30:
+                current_section = section_text
+            continue
+
+        # Parse map statements: map <key> <action> [args...]
+        map_match = GRAB_MAP_PATTERN.match(line)
+        if map_match:
+            key = map_match.group(1)
+            action_full = map_match.group(2).strip()
+
+            # Generate description
+            comment = format_grab_action(action_full)
+
+            mods, main_key = parse_kitty_key(key)
+
+            keybinds.append(TerminalKeyBinding(shared_mods(mods), main_key, comment, action_full, current_section))
+
+    if profiling.ENABLED:
+        _count_lines("terminal.kitty_grab", grab_content, len(keybinds))
+
+    return keybinds
+
+
+def format_grab_action(action: str) -> str:
+    """Generate human-readable description for kitty_grab actions."""
+    action_map = {
+        'quit': 'Quit without copying',
+        'confirm': 'Copy selection and quit',
+        'move left': 'Move left',
+        'move down': 'Move down',
+        'move up': 'Move up',
+        'move right': 'Move right',
+        'move word': 'Move to next word',
+        'move word_end': 'Move to word end',
+        'move word_end left': 'Move to previous word',
+        'move first': 'Move to line start',
+        'move last': 'Move to line end',
+        'move top': 'Move to top',
+        'move bottom': 'Move to bottom',
+        'move page up': 'Page up',
+        'move page down': 'Page down',
+        'set_mode visual': 'Enter visual mode',
+        'set_mode block': 'Enter block select mode',
+        'select stream left first': 'Select entire line',
+        'scroll up': 'Scroll up',
+        'scroll down': 'Scroll down',
+    }
+
+    return action_map.get(action, action.replace('_', ' ').title())
+
+
+def format_kitty_action(action: str, args: str) -> str:
+    """Generate human-readable description for kitty actions."""
+    action_map = {
+        'paste_from_selection': 'Paste from selection',
+        'scroll_line_up': 'Scroll up one line',
+        'scroll_line_down': 'Scroll down one line',
+        'scroll_page_up': 'Scroll page up',
+        'scroll_page_down': 'Scroll page down',
+        'scroll_home': 'Scroll to top',
+        'scroll_end': 'Scroll to bottom',
+        'show_scrollback': 'Show scrollback',
+        'new_window_with_cwd': 'New window (same dir)',
+        'new_os_window': 'New OS window',
+        'close_window': 'Close window',
+        'next_window': 'Next window',
+        'previous_window': 'Previous window',
+        'move_window_forward': 'Move window forward',
+        'move_window_backward': 'Move window backward',
+        'move_window_to_top': 'Move window to top',
+        'first_window': 'Go to window 1',
+        'second_window': 'Go to window 2',
+        'third_window': 'Go to window 3',
+        'fourth_window': 'Go to window 4',
+        'fifth_window': 'Go to window 5',
+        'sixth_window': 'Go to window 6',
+        'seventh_window': 'Go to window 7',
+        'eighth_window': 'Go to window 8',
+        'ninth_window': 'Go to window 9',
+        'tenth_window': 'Go to window 10',
+        'next_tab': 'Next tab',
+        'previous_tab': 'Previous tab',
+        'new_tab': 'New tab',
+        'close_tab': 'Close tab',
+        'next_layout': 'Next layout',
+        'move_tab_forward': 'Move tab forward',
+        'move_tab_backward': 'Move tab backward',
+        'increase_font_size': 'Increase font size',
+        'decrease_font_size': 'Decrease font size',
+        'restore_font_size': 'Restore font size',
+    }
+
+    if action in action_map:
+        return action_map[action]
+
+    if action == 'launch':
+        if '--location=hsplit' in args:
+            return 'Horizontal split'
+        elif '--location=vsplit' in args:
+            return 'Vertical split'
+        return f'Launch: {args}'
+
+    if action == 'kitten':
+        if 'kitty_grab' in args:
+            return 'Vim-style visual selection'
+        if 'kitty_scrollback' in args:
+            return 'Browse scrollback in Neovim'
+        return f'Kitten: {args}'
+
+    if action == 'kitty_scrollback_nvim':
+        return 'Browse scrollback in Neovim'
+
+    return action.replace('_', ' ').title()
+
+
+# Attribute holding a shell's aliases, and the shell the cheatsheet shows
+# them for: programs.<other shell>.shellAliases are skipped, while
+# home.shellAliases and shared sets (shell-aliases.nix) apply to every shell
+ALIAS_ATTR = "shellAliases"
+ALIAS_SHELL = "zsh"
+
+# One step of the alias scanner. A complete `name = "plain string";` entry
+# is a single match, so alias sets cost one match per alias; strings with
+# escapes or antiquotes are decoded by keybinds.nixlex.
+_ATTR_NAME = r"""(?:[A-Za-z_][\w'\-]*|"[^"\\$]*")"""
+ALIAS_SCAN_PATTERN = re.compile(rf"""
+    \s*(?:
+      (?P<entry>(?P<key>{_ATTR_NAME})\s*=\s*"(?P<value>[^"\\$]*)"\s*;)
+    | (?P<comment>\#[^\n]*|/\*.*?\*/)
+    | (?P<string>"|'')
+    | (?P<names>{_ATTR_NAME}(?:\s*\.\s*{_ATTR_NAME})*)
+    | (?P<punct>==|[{{}}()\[\];=])
+    | (?P<other>[^\s{{}}()\[\];="'\#/A-Za-z_]+|.)
+    )""", re.VERBOSE | re.DOTALL)
+ATTR_NAME_PATTERN = re.compile(_ATTR_NAME)
+
+_OPENERS = ("{", "(", "[")
+_CLOSERS = ("}", ")", "]")
+
+
+def _attr_names(text: str) -> List[str]:
+    """'programs.zsh."shellAliases"' -> ["programs", "zsh", "shellAliases"]."""
+    return [name.strip('"') for name in ATTR_NAME_PATTERN.findall(text)]
+
+
+def _alias_shell(path: List[str]) -> Optional[str]:
+    """The shell of programs.<shell>.shellAliases, or None for other paths."""
+    if "programs" in path[:-1]:
+        return path[path.index("programs") + 1]
+    return None
+
+
+@profiling.timed("terminal.aliases")
+def parse_shell_aliases(content: str, source_name: str) -> List[Dict[str, Any]]:
+    """Parse every shellAliases attrset in a Nix file, in one pass.
+
+    The scanner tracks braces and the attribute path they belong to, so
+    `programs.zsh.shellAliases = {`, `programs.zsh = { shellAliases = {`
+    and `home.shellAliases = {` are each found once, however deeply the
+    set nests. Values may be "..." strings with escapes or ''...''
+    strings; entries whose value is not a string are skipped, as are
+    nested sets. A value like `shared // { ... }` or `lib.mkIf cond { ... }`
+    contributes its literal sets.
+    """
+    aliases = []
+    # Attribute path of each open brace, of the binding being read, and the
+    # names just read (the left side of a `=` that may follow)
+    scopes: List[List[str]] = [[]]
+    current: List[str] = []
+    names: List[str] = []
+    # Inside a shellAliases value: its bracket depth, whether its outermost
+    # bracket is an attrset, and whether it is for ALIAS_SHELL
+    in_value = in_set = wanted = False
+    depth = 0
+    # A `name = <string with escapes>;` entry being read: [name, value]
+    entry: List[Any] = []
+
+    def add(name: str, command: str) -> None:
+        if wanted:
+            aliases.append({"name": name, "command": command, "source": source_name})
+
+    pos = 0
+    try:
+        while True:
+            match = ALIAS_SCAN_PATTERN.match(content, pos)
+            if match is None:
+                break
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == "comment":
+                continue
+            if kind == "entry":
+                if in_value and in_set and depth == 1:
+                    add(match.group("key").strip('"'), match.group("value"))
+                elif not in_value:
+                    current = scopes[-1]
+                names, entry = [], []
+                continue
+            if kind == "string":
+                opener = match.group(kind)
+                value, pos = nixlex.scan_string(content, pos, opener)
+                if len(entry) == 1:
+                    # An indented string keeps its final newline
+                    entry.append(value.strip() if opener == "''" else value)
+                else:
+                    entry = []
+                names = []
+                continue
+            if kind == "names":
+                names = _attr_names(match.group(kind))
+                if names in (["let"], ["in"]) and not in_value:
+                    current = scopes[-1]
+                entry = []
+                continue
+            token = match.group(kind)
+            if in_value:
+                if token in _OPENERS:
+                    if depth == 0:
+                        in_set = token == "{"
+                    depth += 1
+                elif token in _CLOSERS:
+                    depth -= 1
+                    if depth < 0:
+                        # The value ended without a `;`; this closes its scope
+                        in_value = False
+                elif token == ";" and depth == 0:
+                    in_value = False
+                    current = scopes[-1]
+                elif token == ";" and depth == 1 and len(entry) == 2:
+                    add(*entry)
+                elif token == "=" and depth == 1 and len(names) == 1:
+                    entry = [names[0]]
+                    names = []
+                    continue
+                if in_value:
+                    names, entry = [], []
+                    continue
+            if token == "{":
+                scopes.append(current)
+            elif token == "}":
+                if len(scopes) > 1:
+                    scopes.pop()
+                current = scopes[-1]
+            elif token == ";":
+                current = scopes[-1]
+            elif token == "=":
+                current = scopes[-1] + names
+                if current[-1:] == [ALIAS_ATTR]:
+                    in_value, in_set, depth = True, False, 0
+                    wanted = _alias_shell(current) in (None, ALIAS_SHELL)
+            names, entry = [], []
+    except nixlex.NixLexError:
+        pass
+
+    if profiling.ENABLED:
+        profiling.count("terminal.aliases", len(aliases))
+    return aliases
+
+
+def group_keybinds_by_section(keybinds: List[TerminalKeyBinding]) -> List[Dict]:
+    """Group keybinds by their section."""
+    sections = {}
+    for kb in keybinds:
+        if kb.section not in sections:
+            sections[kb.section] = []
+        sections[kb.section].append(kb)
+
+    return [{"name": name, "keybinds": kbs, "children": []} for name, kbs in sections.items()]
+
+
+KITTY_FILE = f"{NIX_BASE_DIR}/kitty.nix"
+KITTY_SECTION = "Kitty"
+GRAB_SECTION = "Kitty Grab (Alt+G)"
+
+
+# Alias sources that take precedence, in order: the files the cheatsheet
+# always read (zsh/default.nix with the shared set it imports, eza.nix,
+# claude.nix), so a name they define keeps its command and place
+ALIAS_PRECEDENCE = [
+    f"{NIX_BASE_DIR}/zsh/default.nix",
+    f"{NIX_BASE_DIR}/shell-aliases.nix",
+    f"{NIX_BASE_DIR}/eza.nix",
+    f"{NIX_BASE_DIR}/claude.nix",
+]
+
+
+# Name of the alias scan kept between runs (see alias_files())
+ALIAS_SCAN = "terminal-alias-scan"
+
+# Alias scans by config root, for the daemon and watch modes
+_alias_scans: Dict[str, Dict[str, Any]] = {}
+
+
+def _stat(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _walk_modules() -> Tuple[Dict[str, List[int]], List[str]]:
+    """(mtime and size of every directory, every Nix file) under home/modules,
+    relative to the config root."""
+    root = config_root()
+    directories: Dict[str, List[int]] = {}
+    found = []
+    for directory, subdirectories, names in os.walk(config_path(NIX_BASE_DIR)):
+        subdirectories[:] = [name for name in subdirectories if not name.startswith(".")]
+        directories[os.path.relpath(directory, root)] = _stat(directory)
+        found.extend(os.path.relpath(os.path.join(directory, name), root)
+                     for name in names if name.endswith(".nix"))
+    return directories, sorted(found)
+
+
+@profiling.timed("terminal.alias_scan")
+def _scan_aliases() -> Dict[str, Any]:
+    """Which Nix files under home/modules mention shellAliases.
+
+    The last scan of this config root is reused: the tree is walked again only
+    when a directory's listing changed (its mtime), and only the files whose
+    mtime or size changed since are read again.
+    """
+    root = config_root()
+    scan = _alias_scans.get(root) or load_state(ALIAS_SCAN, root) or {}
+    directories = scan.get("directories")
+    known: Dict[str, List] = scan.get("files", {})
+    changed = not directories or any(
+        _stat(config_path(directory)) != signature for directory, signature in directories.items())
+    if changed:
+        directories, candidates = _walk_modules()
+    else:
+        candidates = list(known)
+
+    files = {}
+    stale = []
+    for relative in candidates:
+        signature = _stat(config_path(relative))
+        previous = known.get(relative)
+        if previous is not None and previous[:2] == signature:
+            files[relative] = previous
+        else:
+            # Stat before reading, so an edit made meanwhile is read next time
+            stale.append(relative)
+            files[relative] = signature
+    for relative, text in zip(stale, read_files([config_path(relative) for relative in stale])):
+        files[relative] = (files[relative] or [None, None]) + [ALIAS_ATTR in text]
+
+    scan = {"directories": directories, "files": files}
+    _alias_scans[root] = scan
+    if changed or stale:
+        store_state(ALIAS_SCAN, root, scan)
+    return scan
+
+
+def alias_files() -> List[str]:
+    """The Nix files under home/modules that set shellAliases, relative to the
+    config root: the ALIAS_PRECEDENCE files first, then the others sorted.
+
+    They are found by content, so a module that starts setting shellAliases
+    is picked up without a list to update here; it comes after the files
+    read before it. See _scan_aliases() for what is read on each call.
+    """
+    files = _scan_aliases()["files"]
+    found = sorted(relative for relative, (_, _, aliases) in files.items() if aliases)
+    return [relative for relative in ALIAS_PRECEDENCE if relative in found] + [
+        relative for relative in found if relative not in ALIAS_PRECEDENCE]
+
+
+def alias_source_name(relative: str) -> str:
+    """"home/modules/zsh/default.nix" -> "zsh", "home/modules/eza.nix" -> "eza"."""
+    directory, name = os.path.split(relative)
+    return os.path.basename(directory) if name == "default.nix" else name[:-len(".nix")]
+
+
+def parse_kitty_file(path: str) -> tuple:
+    """Parse kitty and kitty_grab keybinds from kitty.nix."""
+    content = read_file(path)
+    if not content:
+        return [], []
+    return parse_kitty_keybinds(content), parse_kitty_grab_keybinds(content)
+
+
+def parse_alias_file(path: str, source_name: str) -> List[Dict[str, Any]]:
+    """Parse shellAliases from one Nix file."""
+    content = read_file(path)
+    if not content:
+        return []
+    return parse_shell_aliases(content, source_name)
+
+
+def iter_sections(files: Optional[Collection[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the top-level sections, each as soon as its source file is parsed.
+
+    `files` limits the sources read to those relative paths (a host without
+    kitty, see keybinds.hosts); by default all of them are.
+    """
+    # Parse kitty and kitty_grab keybinds (both live in kitty.nix)
+    kitty_keybinds, grab_keybinds = [], []
+    if files is None or KITTY_FILE in files:
+        kitty_keybinds, grab_keybinds = _memo.get("kitty", config_path(KITTY_FILE), parse_kitty_file)
+    if kitty_keybinds:
+        kitty_sections = group_keybinds_by_section(kitty_keybinds)
+        yield {
+            "name": KITTY_SECTION,
+            "keybinds": [],
+            "children": kitty_sections
+        }
+
+    if grab_keybinds:
+        grab_sections = group_keybinds_by_section(grab_keybinds)
+        yield {
+            "name": GRAB_SECTION,
+            "keybinds": [],
+            "children": grab_sections
+        }
+
+    # Shell aliases from every module that sets some
+    candidates = alias_files()
+    if files is not None:
+        candidates = [relative for relative in candidates if relative in files]
+    aliases: Dict[str, Dict[str, Any]] = {}
+    for relative in candidates:
+        parse = partial(parse_alias_file, source_name=alias_source_name(relative))
+        for alias in _memo.get("aliases", config_path(relative), parse):
+            # The first file (in alias_files() order) defining a name takes precedence
+            aliases.setdefault(alias['name'], alias)
+
+    if aliases:
+        # Convert aliases to keybind-like format for display
+        alias_keybinds = [TerminalKeyBinding(NO_MODS, alias['name'], alias['command'])
+                          for alias in aliases.values()]
+
+        yield {
+            "name": "Shell Aliases",
+            "keybinds": alias_keybinds,
+            "children": []
+        }
+
+
+def build_tree(files: Optional[Collection[str]] = None) -> Dict[str, Any]:
+    return {"children": list(iter_sections(files))}
+
+
+def iter_json() -> Iterator[str]:
+    """The JSON of build_tree(), written one section at a time."""
+    return iterencode({"children": iter_sections()})
+
+
+def sources() -> List[str]:
+    """Files whose contents determine the output of build_tree()."""
+    # Only the alias files: alias_files() notices a module that starts setting
+    # aliases, which changes this list and so the cache entry
+    return [config_path(KITTY_FILE)] + [
+        config_path(relative) for relative in alias_files() if relative != KITTY_FILE]
+
+
+def file_steps() -> List[Tuple[str, str, Callable[[str], Any]]]:
+    """(memo step, source file relative to the config root, parse function) of
+    every source, for parsing them elsewhere (keybinds.hosts)."""
+    return [("kitty", KITTY_FILE, parse_kitty_file)] + [
+        ("aliases", relative, partial(parse_alias_file, source_name=alias_source_name(relative)))
+        for relative in alias_files()]
+
+
+def iter_chords() -> Iterator[Tuple[str, Tuple[str, ...], TerminalKeyBinding]]:
+    """(layer, section path, keybind) of every kitty map, for keybinds.conflicts.
+
+    kitty_grab maps only apply inside the grab overlay, so they are a layer
+    of their own. Shell aliases are not chords.
+    """
+    kitty_keybinds, grab_keybinds = _memo.get("kitty", config_path(KITTY_FILE), parse_kitty_file)
+    for keybind in kitty_keybinds:
+        yield "kitty", (KITTY_SECTION, keybind.section), keybind
+    for keybind in grab_keybinds:
+        yield "kitty-grab", (GRAB_SECTION, keybind.section), keybind
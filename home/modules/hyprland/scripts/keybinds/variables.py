@@ -0,0 +1,213 @@
+"""
+Variable resolution for bind parameters and comments.
+
+A bind line in a Nix module can refer to values defined elsewhere:
+
+    ${terminal}   a Nix name in scope of the module: a binding of its `let`,
+                  or one it inherits from an imported file, e.g.
+                  `inherit (import ../../users/${username}/variables.nix) terminal;`
+    $qsConfig     a Hyprland variable (`$qsConfig = ii` in extraConfig, or
+                  "$qsConfig" in the Hyprland settings)
+
+A Resolver is the symbol table of one module, built once before its binds are
+parsed; expand() then replaces every known name with one dict lookup per
+token, memoized per token text. Unknown names (shell variables, antiquotes
+of expressions like ${pkgs.kitty}) are kept verbatim. Nix strings are read
+with their escaped antiquotes (''${name}) marked (see nixlex.unmark()), so
+those are never replaced.
+
+Module arguments in import paths (${username}) are looked up in the
+top-level string bindings of flake.nix; an argument found nowhere (${host})
+is resolved by the files that exist, if only one matches.
+"""
+import glob
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from keybinds import nixlex
+from keybinds.cache import FileMemo
+from keybinds.common import config_path, read_file
+
+# ${name} (group 1) or $name (group 2)
+TOKEN_PATTERN = re.compile(r"\$\{([A-Za-z_][\w'-]*)\}|\$([A-Za-z_]\w*)")
+# `$name = value` lines of Hyprland config text
+DEFINITION_PATTERN = re.compile(r"^[ \t]*\$(\w+)[ \t]*=[ \t]*(.*?)[ \t]*$", re.MULTILINE)
+# Where the module arguments (username, ...) are bound, relative to the config root
+ARGUMENTS_FILE = "flake.nix"
+
+# (name, string value) bindings and (import path tokens, inherited names) of
+# a module's header `let`
+Header = Tuple[List[Tuple[str, str]], List[Tuple[List[nixlex.Token], List[str]]]]
+
+# Parsed headers and imported files, revalidated by their signatures
+_files = FileMemo()
+
+
+class Resolver:
+    """Symbol table of one module: Nix names and Hyprland variables."""
+
+    def __init__(self) -> None:
+        self.nix: Dict[str, str] = {}
+        self.hyprland: Dict[str, str] = {}
+        # Token text -> its replacement, filled in as tokens are met
+        self._tokens: Dict[str, str] = {}
+
+    def define(self, name: str, value: str) -> None:
+        """Add Hyprland variable `name`; its value is expanded with the
+        variables defined so far, as Hyprland reads it."""
+        self.hyprland[name] = self.expand(value)
+        self._tokens.clear()
+
+    def bind(self, name: str, value: str) -> None:
+        """Add Nix name `name`, expanding the names bound before it."""
+        self.nix[name] = self.expand(value)
+        self._tokens.clear()
+
+    def _replace(self, match: "re.Match[str]") -> str:
+        token = match.group()
+        replacement = self._tokens.get(token)
+        if replacement is None:
+            nix_name, hyprland_name = match.groups()
+            if nix_name is not None:
+                replacement = self.nix.get(nix_name, token)
+            else:
+                replacement = self.hyprland.get(hyprland_name, token)
+            self._tokens[token] = replacement
+        return replacement
+
+    def expand(self, text: str) -> str:
+        """`text` with every known ${name} and $name replaced by its value."""
+        if "$" not in text or not (self.nix or self.hyprland):
+            return text
+        return TOKEN_PATTERN.sub(self._replace, text)
+
+
+def definitions(text: str) -> List[Tuple[str, str]]:
+    """The `$name = value` definitions of Hyprland config text, in order."""
+    if "$" not in text:
+        return []
+    return [(match.group(1), match.group(2)) for match in DEFINITION_PATTERN.finditer(text)]
+
+
+def _read_header(path: str) -> Header:
+    """The bindings and inherits of the `let` a module's body starts with.
+
+    Tokens are read only up to its `in`; a module without a header `let`
+    is not lexed past its argument set.
+    """
+    text = read_file(path)
+    statements: List[List[nixlex.Token]] = []
+    current: List[nixlex.Token] = []
+    depth = 0
+    in_let = seen_colon = closed = False
+    try:
+        for token in nixlex.tokenize(text, marked=True):
+            is_colon = token.kind == "punct" and token.value == ":"
+            if closed and not in_let and not is_colon:
+                break  # An attribute set, not an argument set
+            closed = False
+            if token.kind == "punct" and token.value in ("{", "[", "("):
+                if depth == 0 and seen_colon and not in_let:
+                    break  # The body, without a `let`
+                depth += 1
+            elif token.kind == "punct" and token.value in ("}", "]", ")"):
+                depth -= 1
+                closed = depth == 0
+            elif depth == 0 and is_colon:
+                seen_colon = True
+                continue
+            elif depth == 0 and token.kind == "id" and token.value in ("let", "in"):
+                if token.value == "in":
+                    break
+                in_let = True
+                continue
+            if not in_let:
+                continue
+            if depth == 0 and token.kind == "punct" and token.value == ";":
+                statements.append(current)
+                current = []
+            else:
+                current.append(token)
+    except nixlex.NixLexError:
+        return [], []
+
+    values: List[Tuple[str, str]] = []
+    imports: List[Tuple[List[nixlex.Token], List[str]]] = []
+    for statement in statements:
+        kinds = [token.kind for token in statement]
+        if kinds in (["id", "punct", "str"], ["id", "punct", "istr"]) and statement[1].value == "=":
+            values.append((statement[0].value, statement[2].value))
+        elif (len(statement) > 3 and statement[0].value == "inherit" and statement[1].value == "("
+              and statement[2].value == "import"):
+            close = next((index for index, token in enumerate(statement)
+                          if token.kind == "punct" and token.value == ")"), len(statement))
+            names = [token.value for token in statement[close + 1:] if token.kind == "id"]
+            imports.append((statement[3:close], names))
+    return values, imports
+
+
+def _read_values(path: str) -> Dict[str, str]:
+    """The top-level string bindings of a Nix file (an attribute set, or a
+    `let` such as the one in flake.nix)."""
+    try:
+        found = nixlex.bindings(read_file(path), marked=True)
+    except nixlex.NixLexError:
+        return {}
+    return {binding.path[0]: binding.value for binding in found
+            if len(binding.path) == 1 and isinstance(binding.value, str)}
+
+
+def arguments() -> Dict[str, str]:
+    """Module arguments bound to string literals in flake.nix."""
+    return _files.get("values", config_path(ARGUMENTS_FILE), _read_values)
+
+
+def _import_file(module: str, tokens: List[nixlex.Token]) -> Optional[str]:
+    """The file an `import` path of `module` refers to, or None."""
+    if not tokens or any(token.kind not in ("path", "anti") for token in tokens):
+        return None
+    values = arguments()
+    parts = []
+    for token in tokens:
+        if token.kind == "anti":
+            value = values.get(token.value[2:-1].strip())
+            # An argument not bound in flake.nix matches any file name
+            parts.append("*" if value is None else glob.escape(nixlex.unmark(value)))
+        else:
+            parts.append(glob.escape(token.value))
+    directory = glob.escape(os.path.dirname(module))
+    matches = glob.glob(os.path.normpath(os.path.join(directory, "".join(parts))))
+    if len(matches) != 1:
+        return None
+    found = matches[0]
+    if os.path.isdir(found):
+        found = os.path.join(found, "default.nix")
+    return found if os.path.isfile(found) else None
+
+
+def variable_files(path: str) -> List[str]:
+    """Files the header `let` of the module at `path` imports names from."""
+    files = []
+    for tokens, _ in _files.get("header", path, _read_header)[1]:
+        found = _import_file(path, tokens)
+        if found is not None and found not in files:
+            files.append(found)
+    return files
+
+
+def module_resolver(path: str) -> Resolver:
+    """The Nix names in scope of the bind lines of the module at `path`."""
+    values, imports = _files.get("header", path, _read_header)
+    resolver = Resolver()
+    for tokens, names in imports:
+        found = _import_file(path, tokens)
+        if found is None:
+            continue
+        imported = _files.get("values", found, _read_values)
+        for name in names:
+            if name in imported:
+                resolver.bind(name, imported[name])
+    for name, value in values:
+        resolver.bind(name, value)
+    return resolver
@@ -0,0 +1,152 @@
+"""
+inotify-driven watch mode for the cheatsheet keybind parsers.
+
+The parent directory of every source file is watched (editors usually save by
+renaming a temp file over the original, which a watch on the file itself would
+miss). Sources are also found by content (alias files anywhere under
+home/modules, every hyprland/*.nix module), so directory trees can be watched
+as a whole: any .nix file created or changed in them counts, and directories
+created later are watched as they appear. Bursts of events are debounced, and
+the parser's output is emitted as one JSON line on stdout whenever it actually
+changes. Quickshell's SplitParser consumes that stream line by line.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from typing import Callable, Collection, Dict, List, Optional, Set
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_ATTRIB
+EVENT_HEADER = struct.Struct("iIII")
+DEBOUNCE_SECONDS = 0.2
+# Files of a watched tree that count as sources
+TREE_SUFFIX = ".nix"
+
+
+class Inotify:
+    """Minimal ctypes wrapper around inotify(7); no third-party dependency."""
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # watch descriptor -> (directory, file names of interest, whether
+        # the directory is part of a watched tree)
+        self._watches: Dict[int, tuple] = {}
+
+    def _add(self, directory: str, names: Collection[str], tree: bool) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, directory.encode(), WATCH_MASK)
+        if wd < 0:
+            return  # Directory missing or unreadable; nothing to watch
+        # A directory watched twice has one descriptor; merge what both want
+        _, known, in_tree = self._watches.get(wd, (directory, set(), False))
+        self._watches[wd] = (directory, known | set(names), in_tree or tree)
+
+    def watch_files(self, paths: List[str]) -> None:
+        by_directory: Dict[str, Set[str]] = {}
+        for path in paths:
+            directory, name = os.path.split(os.path.abspath(path))
+            by_directory.setdefault(directory, set()).add(name)
+
+        for directory, names in by_directory.items():
+            self._add(directory, names, False)
+
+    def watch_tree(self, root: str) -> None:
+        """Watch every directory under `root` for TREE_SUFFIX files."""
+        for directory, subdirectories, _ in os.walk(os.path.abspath(root)):
+            subdirectories[:] = [name for name in subdirectories if not name.startswith(".")]
+            self._add(directory, (), True)
+
+    def read_changed(self, timeout: Optional[float]) -> Set[str]:
+        """Wait up to `timeout` seconds and return changed watched paths."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self.fd, 65536)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            directory, names, tree = self._watches.get(wd, (None, (), False))
+            if name in names:
+                changed.add(os.path.join(directory, name))
+            elif tree and mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not name.startswith("."):
+                    # A new directory may already hold sources (moved in)
+                    self.watch_tree(os.path.join(directory, name))
+                    changed.add(os.path.join(directory, name))
+            elif tree and name.endswith(TREE_SUFFIX):
+                changed.add(os.path.join(directory, name))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def emit(line: str) -> None:
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def run(paths: List[str], produce: Callable[[], Optional[str]], on_change: Optional[Callable[[Set[str]], None]] = None,
+        debounce: float = DEBOUNCE_SECONDS, trees: Collection[str] = ()) -> None:
+    """Emit `produce()` now and again after every debounced change to `paths`,
+    or to a TREE_SUFFIX file anywhere under the directories in `trees`.
+
+    `on_change` receives the set of changed paths before `produce()` is called,
+    so callers can drop per-file state for exactly those files. Identical
+    consecutive outputs are not re-emitted, and neither is None (e.g. an
+    empty patch from keybinds.diff).
+    """
+    try:
+        inotify = Inotify()
+    except (OSError, AttributeError) as error:
+        print(f"[keybinds.watch] inotify unavailable: {error}", file=sys.stderr)
+        emit(produce())
+        return
+    # Watch before the first parse so an edit made meanwhile is not lost
+    inotify.watch_files(paths)
+    for root in trees:
+        inotify.watch_tree(root)
+
+    try:
+        last = produce()
+        emit(last)
+        while True:
+            changed = inotify.read_changed(None)
+            if not changed:
+                continue
+            # Debounce: keep collecting until the burst of events settles
+            while True:
+                more = inotify.read_changed(debounce)
+                if not more:
+                    break
+                changed |= more
+
+            if on_change is not None:
+                on_change(changed)
+            output = produce()
+            if output is not None and output != last:
+                last = output
+                emit(output)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass  # Reader (quickshell) went away
+    finally:
+        inotify.close()
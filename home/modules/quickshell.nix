@@ -10,6 +10,64 @@ let
     "${pkgs.kdePackages.syntax-highlighting}/lib/qt-6/qml"
     "${pkgs.kdePackages.kirigami.unwrapped}/lib/qt-6/qml"
   ];
+
+  # Nix sources the cheatsheet is parsed from, laid out like the repo so the
+  # parsers find them at the same relative paths as under /etc/nixos
+  # (keybinds.golden checks that this layout parses like the checkout)
+  cheatsheetSources = pkgs.linkFarm "cheatsheet-sources" [
+    { name = "home/modules"; path = ./.; }
+    # Module arguments (username) and the variables.nix files bind lines
+    # take ${terminal} and friends from
+    { name = "flake.nix"; path = ../../flake.nix; }
+    { name = "home/users"; path = ../users; }
+    # Host entry points, for get_all_keybinds.py --hosts
+    { name = "hosts"; path = ../../hosts; }
+    { name = "home/base.nix"; path = ../base.nix; }
+    { name = "home/minimal.nix"; path = ../minimal.nix; }
+    { name = "home/gaming.nix"; path = ../gaming.nix; }
+  ];
+
+  # Quickshell config from the dots-hyprland flake input with custom overrides
+  quickshellConfig = let
+    baseConfig = "${inputs.dots-hyprland}/dots/.config/quickshell/ii";
+    customScripts = ./hyprland/scripts;
+    customOverrides = ./hyprland/quickshell-overrides;
+  in pkgs.runCommand "quickshell-config-merged" {
+    nativeBuildInputs = [ pkgs.python3 ];
+  } ''
+    # Copy base config
+    cp -rL ${baseConfig} $out
+    chmod -R u+w $out
+
+    # Override with our custom keybind parsers (thin wrappers around the
+    # keybinds package; get_all_keybinds.py emits several tabs in one run)
+    for script in get_keybinds get_nvim_keybinds get_terminal_keybinds get_all_keybinds; do
+      cp ${customScripts}/$script.py $out/scripts/hyprland/$script.py
+      chmod +x $out/scripts/hyprland/$script.py
+    done
+    # Parser library (parsers, parse cache, keybind daemon)
+    cp -r ${customScripts}/keybinds $out/scripts/hyprland/keybinds
+
+    # Parse every cheatsheet tab once, at build time. At runtime the scripts
+    # just print these snapshots; parsing /etc/nixos is opt-in (KEYBINDS_LIVE=1)
+    PYTHONDONTWRITEBYTECODE=1 KEYBINDS_CONFIG_ROOT=${cheatsheetSources} \
+      python3 $out/scripts/hyprland/get_all_keybinds.py \
+      --snapshot $out/scripts/hyprland/keybinds-snapshot
+
+    # Add custom services
+    cp ${customOverrides}/services/NixKeybinds.qml $out/services/NixKeybinds.qml
+    cp ${customOverrides}/services/NvimKeybinds.qml $out/services/NvimKeybinds.qml
+    cp ${customOverrides}/services/TerminalKeybinds.qml $out/services/TerminalKeybinds.qml
+
+    # Override cheatsheet with custom tabs
+    cp ${customOverrides}/modules/ii/cheatsheet/Cheatsheet.qml $out/modules/ii/cheatsheet/Cheatsheet.qml
+    cp ${customOverrides}/modules/ii/cheatsheet/CheatsheetNvim.qml $out/modules/ii/cheatsheet/CheatsheetNvim.qml
+    cp ${customOverrides}/modules/ii/cheatsheet/CheatsheetTerminal.qml $out/modules/ii/cheatsheet/CheatsheetTerminal.qml
+
+    # Override lock screen to include wallpaper background
+    # (WlSessionLockSurface blocks other layers, so wallpaper must be rendered directly)
+    cp ${customOverrides}/modules/ii/lock/LockSurface.qml $out/modules/ii/lock/LockSurface.qml
+  '';
 in
 {
   # Persist GNOME dark mode setting - required for matugen to generate dark colors
@@ -38,6 +96,9 @@ in
   ] ++ lib.optionals config.hostMeta.hasNvidia nvidiaEnv.systemdEnv ++ [
     # Virtual environment for Python scripts
     "ILLOGICAL_IMPULSE_VIRTUAL_ENV=${config.home.homeDirectory}/.local/state/quickshell/.venv"
+    # Uncomment to have the cheatsheet parse /etc/nixos live (and follow edits)
+    # instead of showing the keybinds snapshot taken at build time
+    # "KEYBINDS_LIVE=1"
   ];
 
   # Add session variables
@@ -171,36 +232,28 @@ in
   '';
 
   # Use quickshell config from dots-hyprland flake input with custom overrides
-  home.file.".config/quickshell/default".source = let
-    baseConfig = "${inputs.dots-hyprland}/dots/.config/quickshell/ii";
-    customScripts = ./hyprland/scripts;
-    customOverrides = ./hyprland/quickshell-overrides;
-  in pkgs.runCommand "quickshell-config-merged" {} ''
-    # Copy base config
-    cp -rL ${baseConfig} $out
-    chmod -R u+w $out
-
-    # Override with our custom keybind parsers
-    cp ${customScripts}/get_keybinds.py $out/scripts/hyprland/get_keybinds.py
-    chmod +x $out/scripts/hyprland/get_keybinds.py
-    cp ${customScripts}/get_nvim_keybinds.py $out/scripts/hyprland/get_nvim_keybinds.py
-    chmod +x $out/scripts/hyprland/get_nvim_keybinds.py
-    cp ${customScripts}/get_terminal_keybinds.py $out/scripts/hyprland/get_terminal_keybinds.py
-    chmod +x $out/scripts/hyprland/get_terminal_keybinds.py
-
-    # Add custom services
-    cp ${customOverrides}/services/NvimKeybinds.qml $out/services/NvimKeybinds.qml
-    cp ${customOverrides}/services/TerminalKeybinds.qml $out/services/TerminalKeybinds.qml
+  home.file.".config/quickshell/default".source = quickshellConfig;
 
-    # Override cheatsheet with custom tabs
-    cp ${customOverrides}/modules/ii/cheatsheet/Cheatsheet.qml $out/modules/ii/cheatsheet/Cheatsheet.qml
-    cp ${customOverrides}/modules/ii/cheatsheet/CheatsheetNvim.qml $out/modules/ii/cheatsheet/CheatsheetNvim.qml
-    cp ${customOverrides}/modules/ii/cheatsheet/CheatsheetTerminal.qml $out/modules/ii/cheatsheet/CheatsheetTerminal.qml
+  # Keybind daemon: keeps the parsed cheatsheet trees in memory and answers the
+  # get_*_keybinds.py scripts over a Unix socket. Socket-activated, so it only
+  # starts on the first cheatsheet query; the scripts parse by themselves when
+  # the socket is unavailable.
+  systemd.user.sockets.quickshell-keybinds = {
+    Unit.Description = "Quickshell cheatsheet keybind daemon socket";
+    Socket = {
+      ListenStream = "%t/quickshell-keybinds.sock";
+      SocketMode = "0600";
+    };
+    Install.WantedBy = [ "sockets.target" ];
+  };
 
-    # Override lock screen to include wallpaper background
-    # (WlSessionLockSurface blocks other layers, so wallpaper must be rendered directly)
-    cp ${customOverrides}/modules/ii/lock/LockSurface.qml $out/modules/ii/lock/LockSurface.qml
-  '';
+  systemd.user.services.quickshell-keybinds = {
+    Unit.Description = "Quickshell cheatsheet keybind daemon";
+    Service = {
+      ExecStart = "${pkgs.python3}/bin/python3 -m keybinds.daemon";
+      WorkingDirectory = "${quickshellConfig}/scripts/hyprland";
+    };
+  };
 
   # illogical-impulse config directory structure
   # The translations subdirectory is for AI-generated translations (optional)